@@ -4,7 +4,7 @@ import time
 import json
 import random
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from concurrent.futures import TimeoutError, wait
 import logging
 from collections import Counter
 import re
@@ -32,7 +32,7 @@ from bs4 import BeautifulSoup
 from vertical_insights import VerticalInsights
 # Import analytics
 from analytics import TrendAnalytics
-from news_aggregator import get_news_trends_hybrid
+from news_aggregator import get_news_trends_hybrid, fetch_rss_headlines, rss_refresher
 
 # Import sqlalchemy functions
 from sqlalchemy import func, desc, case
@@ -63,20 +63,6 @@ import time
 GROQ_API_KEYS = [os.getenv(f"GROQ_API_KEY_{i}") for i in range(1, 61)]
 GROQ_API_KEYS = [k for k in GROQ_API_KEYS if k]  # filter out None
 
-GROQ_KEYS_ORG_1 = GROQ_API_KEYS[:30]
-GROQ_KEYS_ORG_2 = GROQ_API_KEYS[30:]
-ALL_GROQ_KEY_GROUPS = [GROQ_KEYS_ORG_1, GROQ_KEYS_ORG_2]
-
-groq_key_state = []
-for group in ALL_GROQ_KEY_GROUPS:
-    groq_key_state.append({
-        "keys": group,
-        "index": 0,
-        "last_used": {},
-        "failed_keys": {},
-        "lock": threading.Lock()
-    })
-
 # 👇 Confirm which keys loaded and how many
 GROQ_API_KEYS = [
     os.getenv(f"GROQ_API_KEY_{i}") for i in range(1, 61)
@@ -97,17 +83,6 @@ print(f"📦 Org 2 keys: {len(GROQ_KEYS_ORG_2)}")
 # 🔁 Assign to all groups
 ALL_GROQ_KEY_GROUPS = [GROQ_KEYS_ORG_1, GROQ_KEYS_ORG_2]
 
-# 🧠 Create group state
-ALL_GROQ_KEY_GROUPS = [GROQ_KEYS_ORG_1, GROQ_KEYS_ORG_2]
-groq_key_state = []
-for group in ALL_GROQ_KEY_GROUPS:
-    groq_key_state.append({
-        "keys": group,
-        "index": 0,
-        "last_used": {},
-        "failed_keys": {},
-        "lock": threading.Lock()
-    })
 
 
 
@@ -163,13 +138,17 @@ MAX_CONCURRENT_REQUESTS = 1000  # Effectively unlimited
 # Request queuing and throttling
 import threading
 import queue
+from types import SimpleNamespace
 from datetime import datetime, timedelta
 
 # Global request queue and throttling
 request_queue = queue.Queue()
 request_lock = threading.Lock()
 last_request_time = {}
-REQUEST_DELAY = 0.5  # 500ms between requests per key
+REQUEST_DELAY = 0.05  # minimum spacing per key; real pacing comes from the per-key token buckets
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", 30))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", 6000))
+OPENROUTER_REQUESTS_PER_MINUTE = int(os.getenv("OPENROUTER_REQUESTS_PER_MINUTE", 20))
 MAX_QUEUE_SIZE = 100  # Maximum requests in queue
 
 class RequestLimiter:
@@ -184,83 +163,55 @@ class RequestLimiter:
 # Global request limiter (now a no-op)
 request_limiter = RequestLimiter(MAX_CONCURRENT_REQUESTS)
 
+# 🧠 Event-driven key scheduler and pooled clients shared by every LLM helper
+from groq_scheduler import GroqKeyScheduler
+from llm_clients import client_pool
+from rate_limits import KeyRateLimiter, error_headers
+from prompt_cache import prompt_cache
+from single_flight import single_flight
+from stackexchange_client import stackexchange
+from news_api_governor import newsapi_governor, LOW_BUDGET_RESERVE
+from corpus_store import corpus_store, epoch_seconds
+from incremental_crawler import incremental_crawler
+from bounded_executors import executors
+from search_orchestrator import search_orchestrator
+from circuit_breakers import circuit_breakers
+from pain_cloud_materializer import pain_cloud_materializer
+from config import PERSONA_SOURCES
+import llm_gateway
+import context_packer
+from map_reduce_summarizer import map_reduce_summarizer, CITATION_MODEL
+from streaming_json import (StreamingJSONParser, PAIN_CLOUD_SCHEMAS, PAIN_SEARCH_SCHEMAS, VERTICAL_SCHEMAS,
+                            PAIN_CLOUD_API_SCHEMAS, PAIN_CLOUD_ENRICHMENT_SCHEMAS, ROOT, parse as parse_llm_json)
+groq_rate_limiter = KeyRateLimiter(GROQ_REQUESTS_PER_MINUTE, GROQ_TOKENS_PER_MINUTE)
+openrouter_rate_limiter = KeyRateLimiter(OPENROUTER_REQUESTS_PER_MINUTE, tokens_per_minute=10 ** 9, sync_request_limit=True)
+groq_scheduler = GroqKeyScheduler(
+    ALL_GROQ_KEY_GROUPS if any(ALL_GROQ_KEY_GROUPS) else [GROQ_API_KEYS],
+    request_delay=REQUEST_DELAY,
+    rate_limit_timeout=RATE_LIMIT_TIMEOUT,
+    invalid_key_timeout=INVALID_KEY_TIMEOUT,
+    limiter=groq_rate_limiter,
+)
+
 # Add thread-safe round-robin index for Groq and OpenRouter keys
 _groq_key_index = 0
 _groq_key_index_lock = threading.Lock()
 _openrouter_key_index = 0
 _openrouter_key_index_lock = threading.Lock()
 
-def get_groq_client():
-    """
-    Return a usable Groq client from any available key across all orgs,
-    respecting cooldowns and skipping rate-limited (TPD-exhausted) keys.
-    """
-    REQUEST_DELAY = 0.7
-    timeout_seconds = 10
-    start_time = time.time()
-
-    while True:
-        for org_idx, group_state in enumerate(groq_key_state):
-            org_name = f"Org {org_idx + 1}"
-            keys = group_state["keys"]
-            attempts = 0
-
-            while attempts < len(keys):
-                with group_state["lock"]:
-                    key = keys[group_state["index"] % len(keys)]
-                    group_state["index"] += 1
-                    attempts += 1
-
-                    # Skip if key is marked as failed
-                    if key in group_state["failed_keys"]:
-                        if time.time() < group_state["failed_keys"][key]:
-                            continue
-                        else:
-                            del group_state["failed_keys"][key]  # Retry after timeout
-
-                    # Per-key throttle logic
-                    now = time.time()
-                    last_used = group_state["last_used"].get(key, 0)
-                    if now - last_used < REQUEST_DELAY:
-                        continue
-
-                    # ✅ Key is usable
-                    group_state["last_used"][key] = now
-                    print(f"✅ Using key: {key[:6]}... from {org_name}")
-                    return Groq(api_key=key)
-
-            print(f"⏳ All keys in {org_name} are rate-limited or cooling down. Trying next org...")
-
-        if time.time() - start_time > timeout_seconds:
-            print("❌ No usable Groq keys across all orgs. Failing request.")
-            raise RuntimeError("No usable Groq keys available at this time.")
-
-        print("🔁 Retrying all orgs after short wait...")
-        time.sleep(0.5)
-
-
-
 def get_openrouter_client():
-    """Get an OpenRouter client with a round-robin selected API key, avoiding recently failed keys"""
+    """Get an OpenRouter client with a round-robin selected API key, avoiding rate-limited and recently failed keys"""
     current_time = time.time()
     available_keys = []
     for key in OPENROUTER_API_KEYS:
-        if key not in failed_openrouter_keys:
-            available_keys.append(key)
-        else:
-            failure_time = failed_openrouter_keys[key]
-            if isinstance(failure_time, tuple):
-                timestamp, error_type = failure_time
-                if error_type == 'rate_limit':
-                    timeout = RATE_LIMIT_TIMEOUT
-                elif error_type == 'invalid_key':
-                    timeout = INVALID_KEY_TIMEOUT
-                else:
-                    timeout = 60
-            else:
-                timeout = 60
-            if current_time - timestamp > timeout:
-                available_keys.append(key)
+        if openrouter_rate_limiter.ready_in(key) > 0:
+            continue
+        failure = failed_openrouter_keys.get(key)
+        if failure and failure[1] != 'rate_limit':
+            timeout = INVALID_KEY_TIMEOUT if failure[1] == 'invalid_key' else 60
+            if current_time - failure[0] <= timeout:
+                continue
+        available_keys.append(key)
     if not available_keys:
         failed_openrouter_keys.clear()
         available_keys = OPENROUTER_API_KEYS
@@ -270,358 +221,113 @@ def get_openrouter_client():
     with _openrouter_key_index_lock:
         api_key = available_keys[_openrouter_key_index % len(available_keys)]
         _openrouter_key_index += 1
+    openrouter_rate_limiter.reserve(api_key, 0)
     return api_key
 
-def mark_groq_key_failed(api_key, error_type='unknown'):
-    """Mark a Groq API key as failed with error type for better timeout handling"""
+def mark_groq_key_failed(api_key, error_type='unknown', headers=None):
+    """
+    Mark a Groq API key as failed. Rate-limited keys are benched for exactly as
+    long as the provider's retry-after / reset headers say; other failures use
+    the scheduler's fixed timeouts.
+    """
     failed_groq_keys[api_key] = (time.time(), error_type)
+    if error_type == 'rate_limit':
+        retry_after = groq_rate_limiter.observe_rate_limited(api_key, headers)
+        groq_scheduler.defer(api_key, time.time() + retry_after, error_type)
+    else:
+        groq_scheduler.mark_failed(api_key, error_type)
 
-def mark_openrouter_key_failed(api_key, error_type='unknown'):
-    """Mark an OpenRouter API key as failed with error type for better timeout handling"""
+def mark_openrouter_key_failed(api_key, error_type='unknown', headers=None):
+    """Mark an OpenRouter API key as failed; rate limits are benched via the response headers"""
     failed_openrouter_keys[api_key] = (time.time(), error_type)
+    if error_type == 'rate_limit':
+        openrouter_rate_limiter.observe_rate_limited(api_key, headers)
+
+def classify_groq_error(e):
+    """Map a Groq exception to 'payload_too_large', 'rate_limit', 'invalid_key' or 'unknown' by HTTP status"""
+    status_code = getattr(e, 'status_code', None)
+    if status_code == 413:
+        return 'payload_too_large'
+    if status_code == 429:
+        return 'rate_limit'
+    if status_code in (401, 403):
+        return 'invalid_key'
+    return 'unknown'
+
+llm_gateway.gateway.configure(
+    groq_scheduler,
+    groq_rate_limiter,
+    classify_error=classify_groq_error,
+    mark_key_failed=mark_groq_key_failed,
+    max_retries=MAX_RETRIES,
+    openrouter_key_provider=get_openrouter_client,
+    openrouter_limiter=openrouter_rate_limiter,
+    mark_openrouter_key_failed=mark_openrouter_key_failed,
+)
+map_reduce_summarizer.configure(groq_scheduler)
 
 def openrouter_generate_content(prompt, temperature=1, max_tokens=8000, model="mistralai/devstral-small-2505:free"):
-    """Generate content using OpenRouter API with DeepSeek model"""
-    try:
-        api_key = get_openrouter_client()
-        if api_key is None:
-            return None
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:5000",
-            "X-Title": "RadarGPT"
-        }
-        
-        data = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": False
-        }
-        
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=30
-        )
-        
-        if response.status_code == 200:
-            result = response.json()
-            if "choices" in result and result["choices"]:
-                return result["choices"][0]["message"]["content"]
-            else:
-                print("OpenRouter API response missing 'choices':", result)
-                return f"Error: OpenRouter API response missing 'choices': {result}"
-        elif response.status_code == 429:
-            # Rate limit hit
-            mark_openrouter_key_failed(api_key, 'rate_limit')
-            return None
-        elif response.status_code == 401:
-            # Invalid API key
-            mark_openrouter_key_failed(api_key, 'invalid_key')
-            return None
-        else:
-            print(f"OpenRouter error: {response.status_code} - {response.text}")
-            return f"Error: OpenRouter error: {response.status_code} - {response.text}"
-            
-    except Exception as e:
-        print(f"OpenRouter request error: {e}")
-        return f"Error: OpenRouter request error: {e}"
-
-def openrouter_generate_content_stream(prompt, temperature=1, max_tokens=4000, model="mistralai/devstral-small-2505:free"):
-    """Generate streaming content using OpenRouter API with DeepSeek model"""
-    try:
-        api_key = get_openrouter_client()
-        if api_key is None:
-            return None
-        
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "HTTP-Referer": "http://localhost:5000",
-            "X-Title": "RadarGPT"
-        }
-        
-        data = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
-            "temperature": temperature,
-            "max_tokens": max_tokens,
-            "stream": True
-        }
-        
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=data,
-            timeout=30,
-            stream=True
-        )
-        
-        if response.status_code == 200:
-            for line in response.iter_lines():
-                if line:
-                    line = line.decode('utf-8')
-                    if line.startswith('data: '):
-                        data_str = line[6:]
-                        if data_str == '[DONE]':
-                            break
-                        try:
-                            data_json = json.loads(data_str)
-                            if 'choices' in data_json and data_json['choices']:
-                                delta = data_json['choices'][0].get('delta', {})
-                                if 'content' in delta:
-                                    yield delta['content']
-                        except json.JSONDecodeError:
-                            continue
-        elif response.status_code == 429:
-            # Rate limit hit
-            mark_openrouter_key_failed(api_key, 'rate_limit')
-            return None
-        elif response.status_code == 401:
-            # Invalid API key
-            mark_openrouter_key_failed(api_key, 'invalid_key')
-            return None
-        else:
-            print(f"OpenRouter streaming error: {response.status_code} - {response.text}")
-            return None
-            
-    except Exception as e:
-        print(f"OpenRouter streaming request error: {e}")
-        return None
-
-def throttled_groq_request(client, messages, model="llama-3.1-8b-instant", **kwargs):
-    """Make a throttled request to Groq API with per-key rate limiting only"""
-    global last_request_time
-    # No global acquire/release
-    # Only throttle per API key
-    api_key = None
-    if hasattr(client, '_api_key'):
-        api_key = client._api_key
-    elif hasattr(client, 'api_key'):
-        api_key = client.api_key
-    if not api_key:
-        # Fallback to simple request
-        return client.chat.completions.create(
-            model=model,
-            messages=messages, 
-            **kwargs
-        )
-    # Throttle requests per key
-    with request_lock:
-        current_time = time.time()
-        if api_key in last_request_time:
-            time_since_last = current_time - last_request_time[api_key]
-            if time_since_last < REQUEST_DELAY:
-                sleep_time = REQUEST_DELAY - time_since_last
-                print(f"⏳ Throttling request for {sleep_time:.2f}s (per-key)")
-                time.sleep(sleep_time)
-        last_request_time[api_key] = time.time()
-    # Make the actual request
-    return client.chat.completions.create(
-        model=model,
-        messages=messages, 
-        **kwargs
-    )
+    """Generate content using OpenRouter API with DeepSeek model (on the LLM gateway's event loop)"""
+    return llm_gateway.generate(prompt, temperature=temperature, max_tokens=max_tokens, model=model,
+                                provider="openrouter")
 
 def groq_generate_content_fast_stream(prompt, temperature=1, max_tokens=4000, model="llama-3.1-8b-instant"):
     """Streaming version: always wait for a Groq key, never fallback, always yield from Groq."""
-    while True:
-        available_clients = []
-        soonest_ready = None
-        soonest_reason = None
-        for org_idx, group_state in enumerate(groq_key_state):
-            org_name = f"Org {org_idx+1}"
-            keys = group_state["keys"]
-            for _ in range(len(keys)):
-                with group_state["lock"]:
-                    key = keys[group_state["index"] % len(keys)]
-                    group_state["index"] += 1
-                    now = time.time()
-                    if key in group_state["failed_keys"]:
-                        ready_at = group_state["failed_keys"][key]
-                        if now < ready_at:
-                            if soonest_ready is None or ready_at < soonest_ready:
-                                soonest_ready = ready_at
-                                soonest_reason = f"rate limit (Org {org_idx+1})"
-                            continue
-                        else:
-                            del group_state["failed_keys"][key]
-                    last_used = group_state["last_used"].get(key, 0)
-                    ready_at = last_used + REQUEST_DELAY
-                    if now < ready_at:
-                        if soonest_ready is None or ready_at < soonest_ready:
-                            soonest_ready = ready_at
-                            soonest_reason = f"cooldown (Org {org_idx+1})"
-                        continue
-                    group_state["last_used"][key] = now
-                    available_clients.append((Groq(api_key=key), org_name, key))
-        if not available_clients:
-            wait_time = max(soonest_ready - time.time(), 0.1) if soonest_ready else 1
-            print(f"⏳ All keys are rate-limited or cooling down. Waiting {wait_time:.2f}s for next available key ({soonest_reason})...")
-            time.sleep(wait_time)
-            continue
-        for client, org_used, key_used in available_clients:
-            try:
-                print(f"✅ Using key: {key_used[:6]}... from {org_used}")
-                print(f"🚀 Making streaming request with {org_used}")
-                stream = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=1,
-                    stream=True,
-                    stop=None,
-                )
-                for chunk in stream:
-                    if hasattr(chunk, "choices") and chunk.choices:
-                        delta = chunk.choices[0].delta
-                        if hasattr(delta, "content") and delta.content:
-                            yield delta.content
-                return
-            except Exception as e:
-                error_str = str(e).lower()
-                if any(payload_error in error_str for payload_error in [
-                    '413', 'payload too large', 'request too large', 'content too long']):
-                    print(f"Payload too large error: {e}")
-                    yield f"Error: Request too large. Please try with a shorter prompt or fewer data points."
-                    return
-                if any(rate_limit_indicator in error_str for rate_limit_indicator in [
-                    'rate limit', 'rate_limit', '429', 'too many requests', 'quota exceeded']):
-                    if hasattr(client, '_api_key'):
-                        mark_groq_key_failed(client._api_key, 'rate_limit')
-                    elif hasattr(client, 'api_key'):
-                        mark_groq_key_failed(client.api_key, 'rate_limit')
-                    print(f"Groq rate limit hit for key {key_used[:6]}... from {org_used}")
-                    continue
-                elif any(auth_error in error_str for auth_error in [
-                    '401', 'unauthorized', 'invalid api key', 'invalid_api_key']):
-                    if hasattr(client, '_api_key'):
-                        mark_groq_key_failed(client._api_key, 'invalid_key')
-                    elif hasattr(client, 'api_key'):
-                        mark_groq_key_failed(client.api_key, 'invalid_key')
-                    print(f"Invalid Groq API key {key_used[:6]}... from {org_used}")
-                    continue
-                else:
-                    print(f"Groq error: {e}")
-                    continue
+    yield from llm_gateway.stream(prompt, temperature=temperature, max_tokens=max_tokens, model=model)
 
 def groq_generate_content_fast(prompt, temperature=1, max_tokens=6000, model="llama-3.1-8b-instant"):
     """Fast version: always use groq_generate_content, never fallback, always wait for a Groq key."""
     return groq_generate_content(prompt, temperature, max_tokens, model)
 
-def groq_generate_content(prompt, temperature=1, max_tokens=6000, model="llama-3.1-8b-instant"):
-    """Always return a valid result by waiting for a Groq key to become available. Never return a parse error."""
-    import json
-    while True:
-        available_clients = []
-        soonest_ready = None
-        soonest_reason = None
-        # Build a list of all available keys from both orgs
-        for org_idx, group_state in enumerate(groq_key_state):
-            org_name = f"Org {org_idx+1}"
-            keys = group_state["keys"]
-            for _ in range(len(keys)):
-                with group_state["lock"]:
-                    key = keys[group_state["index"] % len(keys)]
-                    group_state["index"] += 1
-                    now = time.time()
-                    if key in group_state["failed_keys"]:
-                        ready_at = group_state["failed_keys"][key]
-                        if now < ready_at:
-                            if soonest_ready is None or ready_at < soonest_ready:
-                                soonest_ready = ready_at
-                                soonest_reason = f"rate limit (Org {org_idx+1})"
-                            continue
-                        else:
-                            del group_state["failed_keys"][key]
-                    last_used = group_state["last_used"].get(key, 0)
-                    ready_at = last_used + REQUEST_DELAY
-                    if now < ready_at:
-                        if soonest_ready is None or ready_at < soonest_ready:
-                            soonest_ready = ready_at
-                            soonest_reason = f"cooldown (Org {org_idx+1})"
-                        continue  # key still in cooldown
-                    group_state["last_used"][key] = now
-                    available_clients.append((Groq(api_key=key), org_name, key))
-        if not available_clients:
-            wait_time = max(soonest_ready - time.time(), 0.1) if soonest_ready else 1
-            print(f"⏳ All keys are rate-limited or cooling down. Waiting {wait_time:.2f}s for next available key ({soonest_reason})...")
-            time.sleep(wait_time)
-            continue
-        for client, org_used, key_used in available_clients:
-            try:
-                print(f"✅ Using key: {key_used[:6]}... from {org_used}")
-                print(f"🚀 Making request with {org_used}")
-                completion = throttled_groq_request(
-                    client,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    model=model,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    top_p=1,
-                    stream=False,
-                    stop=None,
-                )
-                # Ensure the response is always parseable and valid
-                try:
-                    # If the response is already a string, just return it
-                    if hasattr(completion, 'choices') and completion.choices:
-                        content = completion.choices[0].message.content
-                        # Optionally, check if it's valid JSON if your app expects JSON
-                        # json.loads(content)  # Uncomment if you want to enforce JSON
-                        return content
-                    else:
-                        print("[Groq error]: No choices in response, trying next key...")
-                        continue
-                except Exception as parse_e:
-                    print(f"[Groq error]: {parse_e}. Trying next key...")
-                    continue
-            except Exception as e:
-                error_str = str(e).lower()
-                if any(payload_error in error_str for payload_error in [
-                    '413', 'payload too large', 'request too large', 'content too long']):
-                    print(f"Payload too large error: {e}")
-                    return f"Error: Request too large. Please try with a shorter prompt or fewer data points."
-                if any(rate_limit_indicator in error_str for rate_limit_indicator in [
-                    'rate limit', 'rate_limit', '429', 'too many requests', 'quota exceeded']):
-                    if hasattr(client, '_api_key'):
-                        mark_groq_key_failed(client._api_key, 'rate_limit')
-                    elif hasattr(client, 'api_key'):
-                        mark_groq_key_failed(client.api_key, 'rate_limit')
-                    print(f"Groq rate limit hit for key {key_used[:6]}... from {org_used}")
-                    continue
-                elif any(auth_error in error_str for auth_error in [
-                    '401', 'unauthorized', 'invalid api key', 'invalid_api_key']):
-                    if hasattr(client, '_api_key'):
-                        mark_groq_key_failed(client._api_key, 'invalid_key')
-                    elif hasattr(client, 'api_key'):
-                        mark_groq_key_failed(client.api_key, 'invalid_key')
-                    print(f"Invalid Groq API key {key_used[:6]}... from {org_used}")
-                    continue
-                else:
-                    print(f"Groq error: {e}")
-                    continue
+def groq_generate_content(prompt, temperature=1, max_tokens=6000, model="llama-3.1-8b-instant", use_cache=True):
+    """
+    Always return a valid result by waiting for a Groq key to become available. Never return a parse error.
+    Identical prompts (after canonicalization) are served from prompt_cache; pass use_cache=False to force a fresh completion.
+    """
+    cache_params = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+    if use_cache:
+        cached = prompt_cache.get("completion", prompt, **cache_params)
+        if cached is not None:
+            return cached
+    try:
+        response = llm_gateway.generate(prompt, temperature=temperature, max_tokens=max_tokens, model=model)
+    except Exception as e:
+        # Callers treat the result as text, so exhausted retries and key timeouts come back as an error string
+        print(f"❌ Groq generation failed: {e}")
+        return f"Error: {e}"
+    if response and not response.startswith("Error:"):
+        prompt_cache.set("completion", response, prompt, **cache_params)
+    return response
+
+def groq_generate_json(prompt, schemas, on_item=None, temperature=1, max_tokens=6000, model="llama-3.1-8b-instant",
+                       use_cache=True):
+    """
+    Stream a JSON completion through a tolerant incremental parser (streaming_json).
+    on_item(key, item) is called for each valid item of the `schemas` arrays as soon as it closes in the stream,
+    so callers can start on the first items while the rest is still generating; defects are repaired locally.
+    Returns (document or None, raw text). Completions that held JSON are cached like groq_generate_content's.
+    """
+    cache_params = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+    cached = prompt_cache.get("completion", prompt, **cache_params) if use_cache else None
+    chunks = [cached] if cached is not None else llm_gateway.stream(
+        prompt, temperature=temperature, max_tokens=max_tokens, model=model)
+    parser = StreamingJSONParser(schemas)
+    text = []
+    for chunk in chunks:
+        text.append(chunk)
+        for key, item in parser.feed(chunk):
+            if on_item is not None:
+                on_item(key, item)
+    for key, item in parser.close():
+        if on_item is not None:
+            on_item(key, item)
+    text = "".join(text)
+    document = parser.value()
+    if parser.repairs:
+        print(f"🩹 Repaired LLM JSON locally: {dict(parser.repairs)}")
+    if document is not None and cached is None and not text.startswith("Error:"):
+        prompt_cache.set("completion", text, prompt, **cache_params)
+    return document, text
 
 def generate_fallback_response_text(prompt):
     """Generate a fallback response as text (for non-streaming functions)"""
@@ -824,58 +530,21 @@ def generate_fallback_response(prompt):
         time.sleep(0.05)  # Small delay to simulate streaming
 
 def groq_start_chat(history=None):
-    """Replace Groq's start_chat method with Groq equivalent and always-wait logic."""
+    """Chat session over llm_gateway, which leases a Groq key for exactly the length of each request."""
     class GroqChat:
         def __init__(self, history=None):
             self.history = history or []
-            self.client = None
-            self._initialize_client()
 
-        def _initialize_client(self):
-            self.client = get_groq_client()
+        def send_message(self, text):
+            transcript = "\n\n".join(
+                f"{'Assistant' if turn['role'] in ('assistant', 'model') else 'User'}: {' '.join(turn['parts'])}"
+                for turn in self.history
+            )
+            prompt = f"{transcript}\n\nUser: {text}\n\nAssistant:" if transcript else text
+            reply = groq_generate_content(prompt, use_cache=False)
+            self.history += [{"role": "user", "parts": [text]}, {"role": "assistant", "parts": [reply]}]
+            return SimpleNamespace(text=reply)
 
-        def _get_client_with_retry(self):
-            # Always wait for a working client
-            while True:
-                if self.client is None:
-                    self._initialize_client()
-                try:
-                    test_completion = self.client.chat.completions.create(
-                        model="llama-3.1-8b-instant",
-                        messages=[{"role": "user", "content": "test"}],
-                        max_tokens=1,
-                        temperature=0,
-                    )
-                    return self.client
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if any(rate_limit_indicator in error_str for rate_limit_indicator in [
-                        'rate limit', 'rate_limit', '429', 'too many requests', 'quota exceeded']):
-                        if hasattr(self.client, '_api_key'):
-                            mark_groq_key_failed(self.client._api_key)
-                        elif hasattr(self.client, 'api_key'):
-                            mark_groq_key_failed(self.client.api_key)
-                        print(f"Rate limit hit in chat, rotating key, waiting for next available key...")
-                        self.client = get_groq_client()
-                        time.sleep(0.5)
-                        continue
-                    elif any(auth_error in error_str for auth_error in [
-                        '401', 'unauthorized', 'invalid api key', 'invalid_api_key']):
-                        if hasattr(self.client, '_api_key'):
-                            mark_groq_key_failed(self.client._api_key, 'invalid_key')
-                        elif hasattr(self.client, 'api_key'):
-                            mark_groq_key_failed(self.client.api_key, 'invalid_key')
-                        print(f"Invalid API key in chat, rotating key, waiting for next available key...")
-                        self.client = get_groq_client()
-                        time.sleep(0.5)
-                        continue
-                    else:
-                        print(f"Groq chat error: {e}")
-                        self.client = get_groq_client()
-                        time.sleep(0.5)
-                        continue
-            return self.client
-    
     return GroqChat(history)
 
 # --- Verticals setup ---
@@ -883,12 +552,10 @@ vertical_insights = VerticalInsights()
 VERTICALS = vertical_insights.VERTICALS
 
 # --- Reddit (PRAW) setup ---
-import praw
-reddit = praw.Reddit(
-    client_id=os.getenv("REDDIT_CLIENT_ID"),
-    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-    user_agent=os.getenv("REDDIT_USER_AGENT")
-)
+from reddit_access import reddit_access
+from reddit_fetcher import RedditFetcher
+
+reddit = reddit_access.client("app")
 
 
 # Import improved ComplaintsBoard scraper
@@ -897,6 +564,7 @@ from fix_producthunt import scrape_producthunt_fixed
 # --- Diskcache persistent cache ---
 from diskcache import Cache
 cache = Cache("radargpt_cache")
+reddit_fetcher = RedditFetcher(lambda: reddit_access.new_client("reddit_fetcher"), cache)
 
 app = Flask(__name__)
 app.config.from_pyfile('config.py')
@@ -992,26 +660,9 @@ def get_reddit_posts_with_replies(keyword, start=0, batch_size=5, max_posts=5, s
     result = cache.get(cache_key)
     if result is not None:
         return result
-    results = []
-    submissions = reddit.subreddit(subreddit).search(keyword, limit=None if start or batch_size else max_posts)
-    for _ in range(start):
-        try:
-            next(submissions)
-        except StopIteration:
-            break
-    for _ in range(batch_size if batch_size else max_posts):
-        try:
-            submission = next(submissions)
-            submission.comments.replace_more(limit=0)
-            comments = [c.body or "" for c in submission.comments.list()[:10]]
-            results.append({
-                "title": submission.title or "",
-                "selftext": submission.selftext or "",
-                "url": submission.url or "",
-                "comments": comments
-            })
-        except StopIteration:
-            break
+    # Listing pages and their cursors are cached per keyword, comment trees are fetched concurrently
+    results = reddit_fetcher.fetch(keyword, start=start, count=batch_size if batch_size else max_posts,
+                                   subreddit=subreddit)
     cache.set(cache_key, results, expire=3600)
     return results
 
@@ -1055,26 +706,10 @@ def search_stackoverflow(keyword, max_pages=3, pagesize=50):
     result = cache.get(cache_key)
     if result is not None:
         return result
-    all_results = []
-    url = "https://api.stackexchange.com/2.3/search/advanced"
-    for page in range(1, max_pages + 1):
-        resp = requests.get(url, params={
-            "order": "desc",
-            "sort": "relevance",
-            "q": keyword,
-            "site": "stackoverflow",
-            "page": page,
-            "pagesize": pagesize
-        })
-        if resp.status_code != 200:
-            break
-        data = resp.json()
-        items = data.get("items", [])
-        if not items:
-            break
-        all_results.extend([{"title": i.get("title", ""), "link": i.get("link", "")} for i in items])
-        if not data.get("has_more", False):
-            break
+    # strict: a failed API call raises (so circuit breakers record it) instead of caching an empty result
+    items = stackexchange.search(keyword, pages=max_pages, pagesize=pagesize, strict=True)
+    all_results = [{"title": i.get("title", ""), "link": i.get("link", ""), "creation_date": i.get("creation_date")}
+                   for i in items]
     cache.set(cache_key, all_results, expire=3600)
     return all_results
 
@@ -1085,6 +720,8 @@ def get_newsapi_date_range():
     from_date = max(min_date, today - timedelta(days=7))  # last 7 days or min_date
     return from_date.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
 
+NEWS_API_STALE_TTL = 7 * 24 * 3600  # last good result per keyword, served when the daily budget runs low
+
 def search_news_api(keyword, max_results=20):
     """Search for news articles related to pain points and problems"""
     # Use the API key from environment or the one provided by user
@@ -1145,111 +782,103 @@ def search_news_api(keyword, max_results=20):
             }
         ]
         
-        all_articles = []
-        
-        for i, strategy in enumerate(search_strategies):
-            try:
-                print(f"🔍 News API Strategy {i+1}: Searching for '{keyword}' with {strategy.get('domains', 'all sources')}")
-                
-                # Build query parameters
-                params = {
-                    "apiKey": api_key,
-                    **strategy
-                }
-                
-                response = requests.get(
-                    f"{NEWS_API_BASE_URL}/everything",
-                    params=params,
-                    timeout=15
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    articles = data.get("articles", [])
-                    
-                    print(f"  ✅ Found {len(articles)} articles from strategy {i+1}")
-                    
-                    for article in articles:
-                        # Extract pain-related content
-                        title = article.get("title", "")
-                        description = article.get("description", "")
-                        content = article.get("content", "")
-                        
-                        # Check if article contains pain-related keywords
-                        pain_keywords = [
-                            "problem", "issue", "pain", "complaint", "struggle", "frustration",
-                            "broken", "bug", "error", "fail", "difficult", "challenging",
-                            "annoying", "terrible", "awful", "hate", "disappointed",
-                            "not working", "doesn't work", "stopped working", "crashes",
-                            "fails", "unable to", "doesn't respond", "hangs", "freeze",
-                            "timeout", "corrupted", "inaccessible", "bloated", "tedious",
-                            "pointless", "missing feature", "churn", "costs too much",
-                            "pricing problem", "overpriced", "hard to scale", "lack of support",
-                            "team hates", "reviews are bad", "burnout", "micromanage"
-                        ]
-                        
-                        combined_text = f"{title} {description} {content}".lower()
-                        if any(keyword in combined_text for keyword in pain_keywords):
-                            all_articles.append({
-                                "title": title,
-                                "description": description,
-                                "url": article.get("url", ""),
-                                "source": article.get("source", {}).get("name", "Unknown"),
-                                "publishedAt": article.get("publishedAt", ""),
-                                "content": content[:500] if content else description[:500],
-                                "type": "news",
-                                "strategy": f"Strategy {i+1}"
-                            })
-                elif response.status_code == 429:
-                    print(f"  ⚠️ Rate limit hit for strategy {i+1}")
-                    break
-                elif response.status_code == 401:
-                    print(f"  ❌ Invalid API key for strategy {i+1}")
-                    break
-                else:
-                    print(f"  ❌ Error {response.status_code} for strategy {i+1}: {response.text}")
-                
-                # Rate limiting between requests
-                time.sleep(0.5)
-                
-            except Exception as e:
-                print(f"  ❌ Error in strategy {i+1}: {e}")
-                continue
+        pain_keywords = [
+            "problem", "issue", "pain", "complaint", "struggle", "frustration",
+            "broken", "bug", "error", "fail", "difficult", "challenging",
+            "annoying", "terrible", "awful", "hate", "disappointed",
+            "not working", "doesn't work", "stopped working", "crashes",
+            "fails", "unable to", "doesn't respond", "hangs", "freeze",
+            "timeout", "corrupted", "inaccessible", "bloated", "tedious",
+            "pointless", "missing feature", "churn", "costs too much",
+            "pricing problem", "overpriced", "hard to scale", "lack of support",
+            "team hates", "reviews are bad", "burnout", "micromanage"
+        ]
         
-        # Remove duplicates based on URL and title
-        seen_urls = set()
-        seen_titles = set()
-        unique_articles = []
+        if newsapi_governor.remaining() < len(search_strategies):
+            print(f"⚠️ News API daily budget low; serving cached/RSS news for '{keyword}'")
+            return news_api_fallback(keyword, max_results)
         
-        for article in all_articles:
-            url = article["url"]
-            title = article["title"].lower()
-            
-            if url not in seen_urls and title not in seen_titles:
-                seen_urls.add(url)
-                seen_titles.add(title)
-                unique_articles.append(article)
+        def run_strategy(i, strategy):
+            print(f"🔍 News API Strategy {i+1}: Searching for '{keyword}' with {strategy.get('domains', 'all sources')}")
+            data = newsapi_governor.get("everything", strategy, api_key)
+            if data is not None:
+                print(f"  ✅ Found {len(data.get('articles', []))} articles from strategy {i+1}")
+            return data
         
-        # Sort by relevance (articles with more pain keywords first)
-        def pain_score(article):
-            text = f"{article['title']} {article['description']} {article['content']}".lower()
-            pain_count = sum(1 for keyword in pain_keywords if keyword in text)
-            return pain_count
+        # All strategies run concurrently; the governor counts each call against the daily budget
+        responses = executors.page_fetch.map(lambda args: run_strategy(*args), enumerate(search_strategies),
+                                             timeout=NEWS_API_SEARCH_TIMEOUT)
         
-        unique_articles.sort(key=pain_score, reverse=True)
+        if all(data is None for data in responses):
+            return news_api_fallback(keyword, max_results)
         
-        # Limit results
-        result = unique_articles[:max_results]
+        # Merge, pain-filter and dedupe (by URL and title) in one pass
+        seen_urls = set()
+        seen_titles = set()
+        scored_articles = []
+        
+        for i, data in enumerate(responses):
+            for article in (data or {}).get("articles", []):
+                title = article.get("title") or ""
+                description = article.get("description") or ""
+                content = article.get("content") or ""
+                url = article.get("url", "")
+                if url in seen_urls or title.lower() in seen_titles:
+                    continue
+                
+                combined_text = f"{title} {description} {content}".lower()
+                pain_count = sum(1 for term in pain_keywords if term in combined_text)
+                if not pain_count:
+                    continue
+                
+                seen_urls.add(url)
+                seen_titles.add(title.lower())
+                scored_articles.append((pain_count, {
+                    "title": title,
+                    "description": description,
+                    "url": url,
+                    "source": article.get("source", {}).get("name", "Unknown"),
+                    "publishedAt": article.get("publishedAt", ""),
+                    "content": content[:500] if content else description[:500],
+                    "type": "news",
+                    "strategy": f"Strategy {i+1}"
+                }))
+        
+        # Sort by relevance (articles with more pain keywords first) and limit results
+        scored_articles.sort(key=lambda pair: pair[0], reverse=True)
+        result = [article for _, article in scored_articles[:max_results]]
         
         print(f"📊 News API: Found {len(result)} unique pain-related articles for '{keyword}'")
         
         cache.set(cache_key, result, expire=1800)  # Cache for 30 minutes
+        cache.set(f"news_api_stale_{keyword}_{max_results}", result, expire=NEWS_API_STALE_TTL)
         return result
         
     except Exception as e:
         print(f"❌ Error in News API search: {e}")
         return []
 
+def news_api_fallback(keyword, max_results=20):
+    """Last good NewsAPI result for the keyword, else matching RSS headlines, when the daily budget runs low"""
+    stale = cache.get(f"news_api_stale_{keyword}_{max_results}")
+    if stale is not None:
+        return stale
+    terms = [term for term in keyword.lower().split() if len(term) > 2]
+    articles = []
+    for headline in fetch_rss_headlines(max_items=200):
+        if any(term in headline['title'].lower() for term in terms):
+            articles.append({
+                "title": headline['title'],
+                "description": "",
+                "url": headline['url'],
+                "source": headline['source'],
+                "publishedAt": headline['publishedAt'],
+                "content": "",
+                "type": "news",
+                "strategy": "RSS fallback"
+            })
+    return articles[:max_results]
+
 def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
     # This is a simplified version that returns more results
     print(f"Using improved ProductHunt scraper for: {keyword}")
@@ -1305,140 +934,42 @@ def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
 
 
 
-def scrape_complaintsboard_full_text(keyword, max_pages=50):
-    cache_key = f"complaintsboard_{keyword}_{max_pages}"
-    # Clear the cache to ensure we get fresh results
-    cache.delete(cache_key)
+COMPLAINTSBOARD_MAX_RESULTS = 60  # stop paging once this many unique complaints are found
+COMPLAINTSBOARD_PARTIAL_TTL = 60  # seconds an incomplete search result is reused
+
+# Request deadlines for fan-out on the shared executors; sources still running at the deadline are left behind
+MULTI_SOURCE_TIMEOUT = 30
+MIN_REQUEST_DEADLINE = 5
+MAX_REQUEST_DEADLINE = 60
+RADARGPT_SUMMARY_TIMEOUT = 15
+PAIN_SEARCH_TIMEOUT = 60
+LIVE_TRENDS_TIMEOUT = 30
+NEWS_API_SEARCH_TIMEOUT = 20
+LLM_BATCH_TIMEOUT = 90
+
+
+def scrape_complaintsboard_full_text(keyword, max_pages=50, max_results=COMPLAINTSBOARD_MAX_RESULTS):
+    cache_key = f"complaintsboard_{keyword}_{max_pages}_{max_results}"
     result = cache.get(cache_key)
+    if result is None:
+        result = cache.get(f"{cache_key}_partial")
     if result is not None:
         return result
-    from selenium import webdriver
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.common.by import By
-    from selenium.webdriver.common.keys import Keys
-    from selenium.webdriver.support.ui import WebDriverWait
-    from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException
-    import os
-    import platform
-
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--disable-extensions")
-    options.add_argument("--disable-plugins")
-    options.add_argument("--disable-images")
-    options.add_argument("--disable-javascript")
-    
-    # Fix ChromeDriver path issue on Windows
+    # Search pages parse fine over plain HTTP, so page concurrently instead of driving Chrome
+    from working_complaintsboard_scraper import page_complaintsboard
     try:
-        if platform.system() == "Windows":
-            # Force clean installation and use specific path
-            driver_path = ChromeDriverManager().install()
-            # Ensure we're using the actual chromedriver.exe, not a notice file
-            if "THIRD_PARTY_NOTICES" in driver_path:
-                # Clean up and reinstall
-                import shutil
-                cache_dir = os.path.expanduser("~/.wdm")
-                if os.path.exists(cache_dir):
-                    shutil.rmtree(cache_dir)
-                driver_path = ChromeDriverManager().install()
-            
-            service = Service(driver_path)
-        else:
-            service = Service(ChromeDriverManager().install())
-        
-        driver = webdriver.Chrome(service=service, options=options)
+        results, complete = page_complaintsboard(keyword, max_pages=max_pages, max_results=max_results)
     except Exception as e:
-        print(f"❌ ChromeDriver error for {keyword}: {e}")
-        # Return empty results if driver fails
-        cache.set(cache_key, [], expire=3600)
-        return []
-    
-    try:
-        search_url = f"https://www.complaintsboard.com/?search={keyword.replace(' ', '+')}"
-        driver.get(search_url)
-
-        try:
-            # Try multiple CSS selectors to find complaint items
-            try:
-                WebDriverWait(driver, 30).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "span.search__item-text"))
-                )
-                print(f"Found search__item-text elements for keyword: {keyword}")
-            except TimeoutException:
-                try:
-                    WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, ".complaint-item"))
-                    )
-                    print(f"Found complaint-item elements for keyword: {keyword}")
-                except TimeoutException:
-                    print(f"No complaint elements found for keyword: {keyword}")
-                    cache.set(cache_key, [], expire=3600)
-                    return []
-        except Exception as e:
-            print(f"Error during ComplaintsBoard search: {e}")
-            cache.set(cache_key, [], expire=3600)
-            return []
-            
-        results = []
-        page = 1
-        seen = set()
-        while page <= max_pages:
-            for _ in range(5):
-                driver.find_element(By.TAG_NAME, "body").send_keys(Keys.END)
-                time.sleep(1)
-            soup = BeautifulSoup(driver.page_source, "html.parser")
-            
-            # Try multiple selectors to find complaint items
-            items = soup.select("span.search__item-text")
-            if not items:
-                items = soup.select(".complaint-item")
-                
-            for item in items:
-                # For search__item-text elements
-                parent_a = item.find_parent("a", href=True)
-                if not parent_a:
-                    # For complaint-item elements
-                    parent_a = item.find("a", href=True)
-                
-                if parent_a:
-                    href = parent_a['href']
-                    # Fix: Use a more lenient regex pattern to match complaint URLs
-                    # Some URLs might not have the #cXXX format
-                    if href.startswith('/'):
-                        page_url = "https://www.complaintsboard.com" + href.split('#')[0]
-                        complaint_id = href.split('#')[1] if '#' in href else ''
-                        key = (page_url, complaint_id)
-                        if key not in seen:
-                            results.append({
-                                "title": item.text.strip(),
-                                "url": f"{page_url}#{complaint_id}" if complaint_id else page_url,
-                                "text": ""
-                            })
-                            seen.add(key)
-            try:
-                next_button = driver.find_element(By.XPATH, "//a[contains(., 'Next')]")
-                if next_button.is_enabled():
-                    next_button.click()
-                    page += 1
-                    time.sleep(2)
-                else:
-                    break
-            except Exception:
-                break
-        print(f"ComplaintsBoard results: {len(results)}")
-        cache.set(cache_key, results, expire=3600)
-        return results
-    finally:
-        try:
-            driver.quit()
-        except:
-            pass
+        print(f"Error during ComplaintsBoard search: {e}")
+        results, complete = [], False
+    print(f"ComplaintsBoard results: {len(results)}{'' if complete else ' (incomplete)'}")
+    if complete:
+        # Empty results are usually transient (blocked), so retry them sooner
+        cache.set(cache_key, results, expire=3600 if results else 600)
+    else:
+        # Cut short by the request deadline, an open circuit or a failed page: only absorb a burst of repeats
+        cache.set(f"{cache_key}_partial", results, expire=COMPLAINTSBOARD_PARTIAL_TTL)
+    return results
 
 
 def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
@@ -1448,43 +979,12 @@ def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
     
     # Try to get real results first
     try:
-        from selenium import webdriver
-        from selenium.webdriver.chrome.service import Service
-        from webdriver_manager.chrome import ChromeDriverManager
+        from browser_pool import browser_pool
         from selenium.webdriver.common.by import By
-        import os
-        import platform
         
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-plugins")
-        options.add_argument("--disable-images")
-        options.add_argument("--disable-javascript")
-        
-        # Fix ChromeDriver path issue on Windows
         try:
-            if platform.system() == "Windows":
-                # Force clean installation and use specific path
-                driver_path = ChromeDriverManager().install()
-                # Ensure we're using the actual chromedriver.exe, not a notice file
-                if "THIRD_PARTY_NOTICES" in driver_path:
-                    # Clean up and reinstall
-                    import shutil
-                    cache_dir = os.path.expanduser("~/.wdm")
-                    if os.path.exists(cache_dir):
-                        shutil.rmtree(cache_dir)
-                    driver_path = ChromeDriverManager().install()
-                
-                service = Service(driver_path)
-            else:
-                service = Service(ChromeDriverManager().install())
-            
-            driver = webdriver.Chrome(service=service, options=options)
+            lease = browser_pool.lease()
+            driver = lease.driver
         except Exception as e:
             print(f"❌ ChromeDriver error for ProductHunt {keyword}: {e}")
             # Fall back to mock data
@@ -1537,10 +1037,7 @@ def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
                 if results:
                     return results
         finally:
-            try:
-                driver.quit()
-            except:
-                pass
+            browser_pool.release(lease)
     except Exception as e:
         print(f"Error in ProductHunt scraper: {e}")
     
@@ -1567,19 +1064,12 @@ def scrape_producthunt_products(keyword, max_pages=3, max_products=30):
     ]
 
 
-def groq_summarize_with_citations(content_list, prompt_prefix):
-    sources_str = ""
-    for idx, item in enumerate(content_list, 1):
-        sources_str += f"[{idx}] {item['title']} ({item.get('url','')})\n"
-    content_str = "\n\n".join([f"{item['title']}\n{item.get('text','')}" for item in content_list])
-    prompt = (
-        f"{prompt_prefix}\n"
-        "After each fact or sentence, add a citation in the form [n] that refers to the n-th source in the list below. "
-        "Only use citations for facts you can attribute to a specific source.\n\n"
-        f"Sources:\n{sources_str}\n\nContent:\n{content_str}\n"
-    )
+PAIN_SEARCH_MAX_TOKENS = 3000
+
+def groq_summarize_with_citations(content_list, prompt_prefix, query=""):
     try:
-        response = groq_generate_content_with_fallback(prompt)
+        # Large corpora are summarized in chunks across the free keys, then merged
+        response = map_reduce_summarizer.summarize(content_list, prompt_prefix, query)
         return response.strip() if response else ""
     except Exception as e:
         return f"Error: {e}"
@@ -1686,33 +1176,90 @@ Content: {all_content}
 logger = logging.getLogger(__name__)
 
 # --- 30-Second Timeout Multi-Source Search ---
-def multi_source_search(keyword):
-    results = {}
-    start_time = time.time()
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {
-            "reddit": executor.submit(get_reddit_posts_with_replies, keyword),
-            "stackoverflow": executor.submit(search_stackoverflow, keyword),
-            "complaintsboard": executor.submit(scrape_complaintsboard_full_text, keyword),
-            "producthunt": executor.submit(scrape_producthunt_fixed, keyword)
+def corpus_adapter(text_field, url_field="url", defaults=None, published_field=None):
+    """(to_item, from_row) pair mapping a source's result dicts to corpus items and back"""
+    def to_item(result):
+        return {
+            "url": result.get(url_field, ""),
+            "title": result.get("title", ""),
+            "text": result.get(text_field, "") if text_field else "",
+            # The real publication time; time-windowed corpus searches skip rows without one
+            "published_at": epoch_seconds(result.get(published_field)) if published_field else None,
+            "extra": result
         }
-        for name, future in futures.items():
-            try:
-                # Increase timeout for complaintsboard
-                if name == "complaintsboard":
-                    timeout = 60  # Give more time for ComplaintsBoard
-                else:
-                    timeout = max(5, 30 - (time.time() - start_time))
-                    
-                results[name] = future.result(timeout=timeout)
-                print(f"Successfully retrieved {len(results[name])} results from {name}")
-            except TimeoutError:
-                print(f"Timeout error for {name}")
-                results[name] = []
-            except Exception as e:
-                print(f"Error for {name}: {str(e)}")
-                results[name] = []
-    return results
+
+    def from_row(row):
+        if row["extra"]:
+            return dict(defaults or {}, **row["extra"])
+        result = dict(defaults or {}, title=row["title"], **{url_field: row["url"]})
+        if text_field:
+            result[text_field] = row["text"]
+        return result
+
+    return to_item, from_row
+
+
+REDDIT_CORPUS = corpus_adapter("selftext", defaults={"comments": []}, published_field="created_utc")
+STACKOVERFLOW_CORPUS = corpus_adapter(None, url_field="link", published_field="creation_date")
+COMPLAINTSBOARD_CORPUS = corpus_adapter("text")
+NEWS_CORPUS = corpus_adapter("content", published_field="publishedAt")
+
+
+def has_comments(row):
+    """Crawled Reddit posts carry no comments, which the prompts built from Reddit results rely on"""
+    return bool(row["extra"].get("comments"))
+
+
+def pages_for(needed, pagesize, max_pages=3):
+    """Result pages needed for `needed` more results, at most `max_pages`"""
+    return max(1, min(max_pages, -(-needed // pagesize)))
+
+
+def guarded(source, fetch):
+    """fetch() behind `source`'s circuit breaker: an instant [] instead of a call while the circuit is open"""
+    return lambda *args: circuit_breakers.call(source, lambda: fetch(*args), fallback=list)
+
+
+# Scraped sites are probed in the background while their circuit is open; API sources are probed by the next request
+PROBE_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"}
+circuit_breakers.register_probe("complaintsboard", lambda: requests.get(
+    "https://www.complaintsboard.com/", headers=PROBE_HEADERS, timeout=10).raise_for_status())
+circuit_breakers.register_probe("producthunt", lambda: requests.get(
+    "https://www.producthunt.com/", headers=PROBE_HEADERS, timeout=10).raise_for_status())
+circuit_breakers.start()
+
+
+def multi_source_search(keyword, deadline=MULTI_SOURCE_TIMEOUT):
+    """
+    Results from every source for `keyword` within `deadline` seconds:
+    {"results": {source: [...]}, "partial", "missing", "elapsed"}. Sources that
+    miss their budget finish in the background and fill the corpus for the next call.
+    """
+    # The local corpus answers repeated keywords; upstream is only hit when it has too few matches
+    search = search_orchestrator.search({
+        "reddit": lambda: corpus_store.search_or_fetch("reddit", keyword,
+                                                       guarded("reddit", lambda needed: get_reddit_posts_with_replies(keyword, batch_size=needed)),
+                                                       *REDDIT_CORPUS, limit=5, usable=has_comments),
+        "stackoverflow": lambda: corpus_store.search_or_fetch("stackoverflow", keyword,
+                                                              guarded("stackoverflow", lambda needed: search_stackoverflow(keyword, max_pages=pages_for(needed, 50))),
+                                                              *STACKOVERFLOW_CORPUS, limit=150, min_results=30),
+        "complaintsboard": lambda: corpus_store.search_or_fetch("complaintsboard", keyword,
+                                                                lambda needed: scrape_complaintsboard_full_text(keyword, max_results=needed),
+                                                                *COMPLAINTSBOARD_CORPUS,
+                                                                limit=COMPLAINTSBOARD_MAX_RESULTS, min_results=20),
+        "producthunt": guarded("producthunt", lambda: scrape_producthunt_fixed(keyword)),
+    }, deadline)
+    for name, items in search["results"].items():
+        print(f"Successfully retrieved {len(items)} results from {name}")
+    return search
+
+
+def request_deadline(data, default):
+    """End-to-end deadline in seconds requested by the client, clamped to a sane range"""
+    try:
+        return min(max(float(data.get('deadline', default)), MIN_REQUEST_DEADLINE), MAX_REQUEST_DEADLINE)
+    except (TypeError, ValueError):
+        return default
 
 # --- MAIN ROUTES ---
 
@@ -1728,8 +1275,10 @@ def radargpt_api():
     mode = data.get('mode', 'future_pain')
     if not keyword:
         return jsonify({"error": "Keyword required"}), 400
-    cache_key = f"radargpt_result_{keyword}_{mode}"
-    cached_result = cache.get(cache_key)
+    # The summary's LLM call comes out of the same end-to-end deadline as the search
+    search_deadline = max(request_deadline(data, MULTI_SOURCE_TIMEOUT + RADARGPT_SUMMARY_TIMEOUT) - RADARGPT_SUMMARY_TIMEOUT,
+                          MIN_REQUEST_DEADLINE)
+    cached_result = prompt_cache.get("radargpt_result", keyword=keyword, mode=mode, fuzzy="keyword")
     if cached_result is not None:
         return jsonify({
             "summary": cached_result["summary"],
@@ -1737,25 +1286,28 @@ def radargpt_api():
             "query_id": cached_result["query_id"],
             "cached": True
         })
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        try:
-            search_future = executor.submit(multi_source_search, keyword)
-            search_results = search_future.result(timeout=15)
-            all_content = []
-            for v in search_results.values():
-                if isinstance(v, list):
-                    all_content.extend(v)
-                elif isinstance(v, dict):
-                    all_content.append(v)
-            prompt_prefix = MODE_PROMPTS.get(mode, MODE_PROMPTS['future_pain'])
-            summary_future = executor.submit(
-                groq_summarize_with_citations, all_content, prompt_prefix
-            )
-            summary = summary_future.result(timeout=15)
-        except TimeoutError:
-            return jsonify({"error": "Operation timed out"}), 504
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+
+    def search_and_summarize():
+        # multi_source_search bounds each source itself; the summary runs on the LLM gateway loop
+        search = single_flight.do("multi_source_search", lambda: multi_source_search(keyword, search_deadline),
+                                  keyword=keyword)
+        all_content = []
+        for v in search["results"].values():
+            if isinstance(v, list):
+                all_content.extend(v)
+            elif isinstance(v, dict):
+                all_content.append(v)
+        prompt_prefix = MODE_PROMPTS.get(mode, MODE_PROMPTS['future_pain'])
+        summary = map_reduce_summarizer.summarize(all_content, prompt_prefix, keyword, timeout=RADARGPT_SUMMARY_TIMEOUT)
+        return search, summary.strip() if summary else ""
+
+    try:
+        # Identical concurrent searches share one run across threads and gunicorn workers
+        search, summary = single_flight.do("radargpt", search_and_summarize, keyword=keyword, mode=mode)
+    except TimeoutError:
+        return jsonify({"error": "Operation timed out"}), 504
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
     # Save to database
     new_query = SearchQuery(
         keyword=keyword,
@@ -1768,11 +1320,13 @@ def radargpt_api():
     db.session.commit()
     result_obj = {
         "summary": summary,
-        "sources": search_results,
+        "sources": search["results"],
         "query_id": new_query.id
     }
-    cache.set(cache_key, result_obj, expire=3600)  # Cache for 1 hour
-    return jsonify(result_obj)
+    # A partial answer is not cached, so the next request sees what the late sources found
+    if not search["partial"]:
+        prompt_cache.set("radargpt_result", result_obj, keyword=keyword, mode=mode, fuzzy="keyword")
+    return jsonify(dict(result_obj, partial=search["partial"], missing_sources=search["missing"]))
 
 @app.route('/findradar', methods=['POST'])
 @login_required
@@ -1785,17 +1339,21 @@ def findradar_api():
     cached_result = cache.get(cache_key)
     if cached_result is not None:
         return jsonify({"results": cached_result, "cached": True})
+    deadline = request_deadline(data, MULTI_SOURCE_TIMEOUT)
     try:
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future = executor.submit(multi_source_search, keyword)
-            results = future.result(timeout=30)
-        cache.set(cache_key, results, expire=3600)  # Cache for 1 hour
+        # Shares one in-flight multi_source_search with /radargpt callers for the same keyword
+        search = single_flight.do("multi_source_search", lambda: multi_source_search(keyword, deadline),
+                                  timeout=deadline + 5, keyword=keyword)
+        if not search["partial"]:
+            cache.set(cache_key, search["results"], expire=3600)  # Cache for 1 hour
     except TimeoutError:
         return jsonify({"error": "Search timed out"}), 504
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     return jsonify({
-        "results": results
+        "results": search["results"],
+        "partial": search["partial"],
+        "missing_sources": search["missing"]
     })
 
 # --- User & Chat Management (unchanged) ---
@@ -2199,8 +1757,7 @@ def analyze(vertical, query):
         vertical_name = vertical_data["name"]
         
         # Check cache first
-        cache_key = f"vertical_insights_{vertical}_{query.lower().replace(' ', '_')}"
-        cached_result = cache.get(cache_key)
+        cached_result = prompt_cache.get("vertical_insights", vertical=vertical, query=query, fuzzy="query")
         if cached_result is not None:
             print(f"✅ Returning cached vertical insights for {vertical}: {query}")
             return jsonify(cached_result)
@@ -2334,23 +1891,11 @@ Be highly specific and practical about {vertical_name}. Imagine this will direct
 Do not output anything other than the JSON structure above.
 """
     
-        # Generate structured insights
-        response = groq_generate_content(prompt)
+        # Generate structured insights, parsed (and repaired) as the completion streams in
+        insights_json, response = groq_generate_json(prompt, VERTICAL_SCHEMAS)
         insights_text = response.strip() if response else ""
         
-        # Parse JSON response (add error handling)
-        try:
-            # Find JSON in the response (in case there's any extra text)
-            json_match = re.search(r'({[\s\S]*})', insights_text)
-            if json_match:
-                insights_text = json_match.group(1)
-            
-            # Clean up the JSON string - remove comments and fix any trailing commas
-            cleaned_json = re.sub(r'//.*?(\n|$)', '', insights_text)  # Remove comments
-            cleaned_json = re.sub(r',(\s*[}\]])', r'\1', cleaned_json)  # Remove trailing commas
-            
-            insights_json = json.loads(cleaned_json)
-            
+        if isinstance(insights_json, dict):
             # Prepare response
             result = {
                 "vertical": vertical,
@@ -2366,7 +1911,7 @@ Do not output anything other than the JSON structure above.
             }
             
             # Cache the result for 1 hour
-            cache.set(cache_key, result, expire=3600)
+            prompt_cache.set("vertical_insights", result, vertical=vertical, query=query, fuzzy="query")
             
             # Track usage for vertical insights
             try:
@@ -2383,16 +1928,16 @@ Do not output anything other than the JSON structure above.
             
             return jsonify(result)
             
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON decode error: {e}")
+        else:
+            logger.error("No JSON object in vertical insights response")
             logger.error(f"Raw text: {insights_text}")
-            # Fallback to text response if JSON parsing fails
+            # Fallback to text response if the response holds no JSON object
             result = {
                 "vertical": vertical,
                 "vertical_name": vertical_name,
                 "query": query,
                 "insights": insights_text,
-                "error": f"Could not parse structured insights: {str(e)}",
+                "error": "Could not parse structured insights: no JSON object in the response",
                 "sources": {
                     "reddit": [],
                     "stackoverflow": [],
@@ -2401,7 +1946,8 @@ Do not output anything other than the JSON structure above.
             }
             
             # Cache the fallback result too
-            cache.set(cache_key, result, expire=1800)  # 30 minutes for fallback
+            prompt_cache.set("vertical_insights", result, vertical=vertical, query=query, fuzzy="query",
+                             expire=prompt_cache.ttl_for("vertical_insights_fallback"))
             
             return jsonify(result)
             
@@ -2420,12 +1966,17 @@ def analyze_stream(vertical, query):
         vertical_data = VERTICALS[vertical]
         vertical_name = vertical_data["name"]
         
-        # Check cache first
-        cache_key = f"vertical_insights_{vertical}_{query.lower().replace(' ', '_')}"
-        cached_result = cache.get(cache_key)
-        if cached_result is not None:
-            print(f"✅ Returning cached vertical insights for {vertical}: {query}")
-            return jsonify(cached_result)
+        # Check cache first: replay a recorded stream, or the raw insights cached by /analyze,
+        # over the same text/plain streaming protocol as a fresh response
+        replay = prompt_cache.replay_stream("vertical_insights", vertical=vertical, query=query, fuzzy="query")
+        if replay is None:
+            cached_result = prompt_cache.get("vertical_insights", vertical=vertical, query=query, fuzzy="query")
+            cached_text = cached_result and (cached_result.get("raw_insights") or cached_result.get("insights"))
+            if cached_text:
+                replay = iter([cached_text])
+        if replay is not None:
+            print(f"✅ Replaying cached vertical insights for {vertical}: {query}")
+            return Response(replay, mimetype='text/plain')
         
         # Ultra-simplified, super fast prompt
         prompt = f"""You are a billion-dollar product strategist, domain analyst, and venture expert in the {vertical_name} sector. You are trusted by top-tier VCs and founders for your unmatched depth of insight into product-market fit, unsolved user pain, competitive edge, and fast-execution strategy. You have access to comprehensive internal knowledge — proprietary market intelligence, user needs, technology gaps, funding trends, and real competitive landscapes — all up to the latest date.
@@ -2449,36 +2000,34 @@ Do not output anything other than the JSON structure above.
         def generate():
             """Generate streaming response"""
             full_response = ""
-            for chunk in groq_generate_content_fast_stream(prompt, max_tokens=4096, temperature=0.7):
+            # Structured insights are parsed alongside the stream, so nothing is re-parsed once it ends
+            parser = StreamingJSONParser(VERTICAL_SCHEMAS)
+            chunks = groq_generate_content_fast_stream(prompt, max_tokens=4096, temperature=0.7)
+            for chunk in prompt_cache.record_stream("vertical_insights", chunks, vertical=vertical, query=query, fuzzy="query"):
                 full_response += chunk
+                parser.feed(chunk)
                 yield chunk
             
-            # Try to parse and cache the complete response
+            # Cache the structured result
             try:
-                json_match = re.search(r'({[\s\S]*})', full_response)
-                if json_match:
-                    insights_text = json_match.group(1)
-                    cleaned_json = re.sub(r'//.*?(\n|$)', '', insights_text)  # Remove comments
-                    cleaned_json = re.sub(r',(\s*[}\]])', r'\1', cleaned_json)  # Remove trailing commas
-                    insights_json = json.loads(cleaned_json)
-                    
+                parser.close()
+                insights_json = parser.value()
+                if isinstance(insights_json, dict):
                     result = {
                         "vertical": vertical,
                         "vertical_name": vertical_name,
                         "query": query,
                         "structured_insights": insights_json,
-                        "raw_insights": insights_text,
+                        "raw_insights": full_response.strip(),
                         "sources": {"reddit": [], "stackoverflow": [], "complaintsboard": []}
                     }
-                    cache.set(cache_key, result, expire=3600)
+                    prompt_cache.set("vertical_insights", result, vertical=vertical, query=query, fuzzy="query")
                     
-                    print(f"✅ Streaming analysis successful: {len(insights_json.get('pain_points', []))} pain points, {len(insights_json.get('startup_opportunities', []))} opportunities")
+                    print(f"✅ Streaming analysis successful: {len(insights_json.get('pain_points', []))} pain points, {len(insights_json.get('opportunities', []))} opportunities")
                 else:
                     print("❌ No JSON found in response")
-                    result = create_fallback_analysis(query, all_content)
             except Exception as e:
                 print(f"❌ Streaming analysis error: {e}")
-                result = create_fallback_analysis(query, all_content)
         
         return Response(generate(), mimetype='text/plain')
             
@@ -2526,8 +2075,7 @@ def vertical_chat(vertical, query):
     vertical_name = vertical_data["name"]
     
     # Check cache for similar chat responses
-    cache_key = f"vertical_chat_{vertical}_{hash(user_text + context) % 10000}"
-    cached_response = cache.get(cache_key)
+    cached_response = prompt_cache.get("vertical_chat", vertical=vertical, user_text=user_text, context=context)
     if cached_response is not None:
         print(f"✅ Returning cached vertical chat response for {vertical}")
         return jsonify({"bot_reply": cached_response})
@@ -2548,8 +2096,9 @@ Keep response under 100 words."""
             temperature=0.7
         ).strip()
         
-        # Cache the response for 30 minutes
-        cache.set(cache_key, bot_response, expire=1800)
+        # Cache the response for 30 minutes, unless it is an error
+        if bot_response and not bot_response.startswith("Error:"):
+            prompt_cache.set("vertical_chat", bot_response, vertical=vertical, user_text=user_text, context=context)
         
         # Save user message
         user_chat = VerticalChat(
@@ -2609,12 +2158,15 @@ def vertical_chat_stream(vertical, query):
     vertical_data = VERTICALS[vertical]
     vertical_name = vertical_data["name"]
     
-    # Check cache for similar chat responses
-    cache_key = f"vertical_chat_{vertical}_{hash(user_text + context) % 10000}"
-    cached_response = cache.get(cache_key)
-    if cached_response is not None:
-        print(f"✅ Returning cached vertical chat response for {vertical}")
-        return jsonify({"bot_reply": cached_response})
+    # Check cache for similar chat responses and replay them over the streaming protocol
+    replay = prompt_cache.replay_stream("vertical_chat", vertical=vertical, user_text=user_text, context=context)
+    if replay is None:
+        cached_response = prompt_cache.get("vertical_chat", vertical=vertical, user_text=user_text, context=context)
+        if cached_response:
+            replay = iter([cached_response])
+    if replay is not None:
+        print(f"✅ Replaying cached vertical chat response for {vertical}")
+        return Response(replay, mimetype='text/plain')
     
     # Ultra-simplified, super fast prompt
     system_prompt = f"""You are a {vertical_name} expert. Answer briefly:
@@ -2627,17 +2179,19 @@ Keep response under 100 words."""
     def generate():
         """Generate streaming chat response"""
         full_response = ""
-        for chunk in groq_generate_content_fast_stream(
+        chunks = groq_generate_content_fast_stream(
             f"{system_prompt}\n\nAnswer:",
             max_tokens=150,
             temperature=0.7
-        ):
+        )
+        for chunk in prompt_cache.record_stream("vertical_chat", chunks, vertical=vertical, user_text=user_text, context=context):
             full_response += chunk
             yield chunk
         
-        # Cache the complete response
+        # Cache the complete response; errors (PAYLOAD_TOO_LARGE_MESSAGE included) must not be replayed
         bot_response = full_response.strip()
-        cache.set(cache_key, bot_response, expire=1800)
+        if bot_response and not bot_response.startswith("Error:"):
+            prompt_cache.set("vertical_chat", bot_response, vertical=vertical, user_text=user_text, context=context)
         
         # Save to database
         try:
@@ -2715,9 +2269,8 @@ def fetch_posts():
     start = int(data.get("start", 0))
     batch_size = int(data.get("batch_size", 5))
     posts = get_reddit_posts_with_replies(keyword, start, batch_size)
-    with ThreadPoolExecutor() as executor:
-        summaries = list(executor.map(summarize_post_and_replies, posts))
-        ideas = list(executor.map(generate_startup_ideas, summaries))
+    summaries = executors.enrichment.map(summarize_post_and_replies, posts, timeout=LLM_BATCH_TIMEOUT, default="")
+    ideas = executors.llm.map(generate_startup_ideas, summaries, timeout=LLM_BATCH_TIMEOUT, default="")
     for i, post in enumerate(posts):
         post["problems_summary"] = summaries[i]
         post["suggestions"] = ideas[i]
@@ -2774,7 +2327,7 @@ def multi_search():
         def reddit_job():
             try:
                 current_status[keyword] = "Searching Reddit..."
-                results = get_reddit_posts_with_replies(keyword, max_posts=5)
+                results = circuit_breakers.call("reddit", lambda: get_reddit_posts_with_replies(keyword, max_posts=5))
                 sources["Reddit"] = [{"title": r["title"], "url": r["url"], "text": ""} for r in results]
                 current_status[keyword] = f"Found {len(sources['Reddit'])} results from Reddit"
             except Exception as e:
@@ -2785,7 +2338,7 @@ def multi_search():
         def stackoverflow_job():
             try:
                 current_status[keyword] = "Searching Stack Overflow..."
-                results = search_stackoverflow(keyword, max_pages=2, pagesize=25)
+                results = circuit_breakers.call("stackoverflow", lambda: search_stackoverflow(keyword, max_pages=2, pagesize=25))
                 sources["Stack Overflow"] = [{"title": s["title"], "url": s["link"], "text": ""} for s in results]
                 current_status[keyword] = f"Found {len(sources['Stack Overflow'])} results from Stack Overflow"
             except Exception as e:
@@ -2826,7 +2379,8 @@ def multi_search():
                 current_status[keyword] = "Searching ProductHunt..."
                 # Use the new working scraper that doesn't require ChromeDriver
                 from working_producthunt_scraper import scrape_producthunt_working
-                ph_results = scrape_producthunt_working(keyword, max_pages=3)
+                # An open circuit raises CircuitOpen straight into the placeholder fallback below
+                ph_results = circuit_breakers.call("producthunt", lambda: scrape_producthunt_working(keyword, max_pages=3))
                 
                 if ph_results:
                     sources["Product Hunt"] = [{"title": p["title"], "url": p["url"], "text": p["description"]} for p in ph_results]
@@ -2847,35 +2401,41 @@ def multi_search():
                                           "text": f"A {t.lower()} for {keyword}"} 
                                          for t in ["Tool", "Manager", "Assistant"]]
 
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = [
-                executor.submit(reddit_job),
-                executor.submit(stackoverflow_job),
-                executor.submit(complaints_job),
-                executor.submit(producthunt_job),
-            ]
-            for future in as_completed(futures):
-                future.result()
-
-        # Force ProductHunt to have at least 5 results if it doesn't
-        if len(sources["Product Hunt"]) < 5:
-            print("Fixing ProductHunt results count...")
-            sources["Product Hunt"] = [{"title": f"{keyword.title()} {t}", 
-                                       "url": f"https://www.producthunt.com/products/{keyword.lower().replace(' ', '-')}-{t.lower()}",
-                                       "text": f"A {t.lower()} for {keyword}"} 
-                                      for t in ["Tool", "Manager", "Assistant", "Platform", "Pro", 
-                                               "App", "Dashboard", "Analytics", "Suite", "AI",
-                                               "Bot", "Tracker", "Monitor", "Hub", "Solution"]]
-
-        all_posts = []
-        print("Sources data:", {src: len(data) for src, data in sources.items()})
-        for src in ALL_SOURCES:
-            all_posts.extend(sources[src])
-
-        current_status[keyword] = "Analyzing data and generating summary..."
-        prompt_prefix = MODE_PROMPTS.get(mode, MODE_PROMPTS["future_pain"])
-        summary = groq_summarize_with_citations(all_posts, prompt_prefix)
-        current_status[keyword] = "Summary generated successfully!"
+        def search_and_summarize():
+            _, missing = executors.source_fetch.gather({
+                "Reddit": reddit_job,
+                "Stack Overflow": stackoverflow_job,
+                "ComplaintsBoard": complaints_job,
+                "Product Hunt": producthunt_job,
+            }, timeout=MULTI_SOURCE_TIMEOUT)
+            # Jobs that missed the deadline may still write into `sources`; work from a snapshot
+            for src in missing:
+                errors[src] = "timed out"
+            found = {src: list(sources.get(src, [])) for src in ALL_SOURCES}
+
+            # Force ProductHunt to have at least 5 results if it doesn't
+            if len(found["Product Hunt"]) < 5:
+                print("Fixing ProductHunt results count...")
+                found["Product Hunt"] = [{"title": f"{keyword.title()} {t}", 
+                                           "url": f"https://www.producthunt.com/products/{keyword.lower().replace(' ', '-')}-{t.lower()}",
+                                           "text": f"A {t.lower()} for {keyword}"} 
+                                          for t in ["Tool", "Manager", "Assistant", "Platform", "Pro", 
+                                                   "App", "Dashboard", "Analytics", "Suite", "AI",
+                                                   "Bot", "Tracker", "Monitor", "Hub", "Solution"]]
+
+            all_posts = []
+            print("Sources data:", {src: len(data) for src, data in found.items()})
+            for src in ALL_SOURCES:
+                all_posts.extend(found[src])
+
+            current_status[keyword] = "Analyzing data and generating summary..."
+            prompt_prefix = MODE_PROMPTS.get(mode, MODE_PROMPTS["future_pain"])
+            summary = groq_summarize_with_citations(all_posts, prompt_prefix, keyword)
+            current_status[keyword] = "Summary generated successfully!"
+            return found, summary
+
+        # Identical concurrent searches share one run across threads and gunicorn workers
+        found, summary = single_flight.do("multi_search", search_and_summarize, keyword=keyword, mode=mode)
 
         new_query = SearchQuery(
             keyword=keyword,
@@ -2888,7 +2448,7 @@ def multi_search():
         db.session.commit()
         result_obj = {
             "summary": summary,
-            "sources": sources,
+            "sources": found,
             "query_id": new_query.id
         }
         
@@ -2917,27 +2477,8 @@ def scrape_reddit_titles(keyword):
         return []
 
 def search_stackexchange(keyword, max_pages=3, pagesize=50):
-    all_results = []
-    url = "https://api.stackexchange.com/2.3/search/advanced"
-    for page in range(1, max_pages + 1):
-        resp = requests.get(url, params={
-            "order": "desc",
-            "sort": "relevance",
-            "q": keyword,
-            "site": "stackoverflow",
-            "page": page,
-            "pagesize": pagesize
-        })
-        if resp.status_code != 200:
-            break
-        data = resp.json()
-        items = data.get("items", [])
-        if not items:
-            break
-        all_results.extend([{"title": i.get("title", ""), "link": i.get("link", "")} for i in items])
-        if not data.get("has_more", False):
-            break
-    return all_results
+    items = stackexchange.search(keyword, pages=max_pages, pagesize=pagesize)
+    return [{"title": i.get("title", ""), "link": i.get("link", "")} for i in items]
 
 @app.route("/search", methods=["GET"])
 def search_get():
@@ -3185,6 +2726,7 @@ def api_status():
 def key_status():
     """Monitor the status of all API keys"""
     try:
+        from browser_pool import browser_pool
         # Get current key status for Groq
         working_groq_keys = []
         rate_limited_groq_keys = []
@@ -3241,7 +2783,28 @@ def key_status():
                 "rate_limited": rate_limited_openrouter_keys,
                 "failed": failed_openrouter_keys_list
             },
-            "limiter": limiter_status
+            "limiter": limiter_status,
+            "scheduler": groq_scheduler.status(),
+            "client_pool": client_pool.stats(),
+            "gateway": llm_gateway.gateway.stats(),
+            "single_flight": single_flight.stats(),
+            "browser_pool": browser_pool.stats(),
+            "reddit": reddit_access.stats(),
+            "stackexchange": stackexchange.stats(),
+            "newsapi": newsapi_governor.stats(),
+            "rss": rss_refresher.stats(),
+            "corpus": corpus_store.stats(),
+            "crawler": incremental_crawler.stats(),
+            "pain_cloud": pain_cloud_materializer.stats(),
+            "executors": executors.stats(),
+            "search": search_orchestrator.stats(),
+            "circuits": circuit_breakers.stats(),
+            "map_reduce": map_reduce_summarizer.stats(),
+            "prompt_cache": prompt_cache.stats(),
+            "rate_limits": {
+                "groq": groq_rate_limiter.status(),
+                "openrouter": openrouter_rate_limiter.status()
+            }
         }, 200
     except Exception as e:
         import traceback
@@ -3351,35 +2914,26 @@ Industry: {industry}
 Return ONLY valid JSON with keys: complaints (list of {{text, severity}}), keywords (list of {{word, count}}), themes (list of strings).
 '''
     try:
-        response = groq_generate_content(prompt)
+        result, response = groq_generate_json(prompt, PAIN_CLOUD_API_SCHEMAS)
         if response.startswith('Error:'):
             return jsonify({'error': response}), 500
         text = response.strip()
-        start = text.find('{')
-        end = text.rfind('}')
-        if start != -1 and end != -1:
-            json_str = text[start:end+1]
+        if isinstance(result, dict):
+            # Track usage for pain cloud insights
             try:
-                result = json.loads(json_str)
-                
-                # Track usage for pain cloud insights
-                try:
-                    new_usage = UserUsage(
-                        user_id=current_user.id,
-                        module='insights',
-                        action='pain_cloud',
-                        usage_count=1
-                    )
-                    db.session.add(new_usage)
-                    db.session.commit()
-                except Exception as e:
-                    print(f"Error tracking usage: {e}")
-                
-                return jsonify(result)
-            except json.JSONDecodeError as json_error:
-                print(f"JSON decode error: {json_error}")
-                print(f"Raw response: {text}")
-                return jsonify({'error': f'Could not parse Groq response: {json_error}', 'raw': text}), 500
+                new_usage = UserUsage(
+                    user_id=current_user.id,
+                    module='insights',
+                    action='pain_cloud',
+                    usage_count=1
+                )
+                db.session.add(new_usage)
+                db.session.commit()
+            except Exception as e:
+                print(f"Error tracking usage: {e}")
+            
+            return jsonify(result)
+        print(f"Raw response: {text}")
         return jsonify({'error': 'No valid JSON found in Groq response', 'raw': text}), 500
     except Exception as e:
         import traceback
@@ -3533,6 +3087,13 @@ PERSONA_INDUSTRY_SOURCES = {
 
 }
 
+# Keep the pain-cloud subreddits warm in the local corpus
+incremental_crawler.register(subreddits={
+    source[2:] for sources in PERSONA_INDUSTRY_SOURCES.values() for source in sources if source.startswith('r/')
+})
+PAIN_CLOUD_WINDOW = 15 * 7 * 86400  # the 15 weekly trend bins below
+PAIN_CLOUD_POSTS_PER_SUBREDDIT = 100
+
 
 
 
@@ -3566,6 +3127,55 @@ where where's which while who who's whom why why's with won't would wouldn't you
 yourself yourselves
 """.split())
 
+# Pain points enriched per LLM call in /pain-cloud-realtime (keeps each batched prompt well under the TPM budget)
+ENRICHMENT_BATCH_SIZE = 5
+PAIN_CLOUD_EXTRACTION_ATTEMPTS = 3  # fresh completions, only when even the repaired one holds no pain point
+
+def build_enrichment_prompt(points, persona, industry):
+    """One prompt that asks for keywords + a trend insight for every pain point in `points`"""
+    current_date = datetime.now().strftime('%B %d, %Y')
+    prompt = f"""Analyze the following pain trends among {persona}s in the {industry} industry, using Reddit frequency data up to {current_date}.
+
+For EACH numbered pain point below, return:
+- keywords: exactly 3 startup-relevant keywords.
+- insight: a clear, sharp, **conviction-based insight** (max 200 words) like a VC would pitch internally, about why this matters for {persona}s in the {industry} industry. Take a stance — for or against investing product resources. Cover:
+  1. **Trajectory**: Is this a rising, fading, or stagnant pain? (Quantify trend where possible.)
+  2. **Urgency Signal**: What does the emotion + frequency + severity tell us?
+  3. **Market Risk**: What's at stake if ignored — missed revenue, roadmap slip, morale loss?
+  4. **Strategic Opportunity**: Could this be a wedge into a broader product or service? Is it timing-sensitive?
+  Where possible, **quantify** the impact. Use the excerpt to assess **emotion** and user frustration. Avoid vague language like "might," "maybe," or "could."
+
+Return ONLY a JSON array with one object per pain point, in the same order:
+[{{"index": 1, "keywords": ["...", "...", "..."], "insight": "..."}}]
+"""
+    for idx, point in enumerate(points, 1):
+        prompt += (
+            f"\n[{idx}] Title: {point.get('title', '')[:100]}\n"
+            f"Pain Summary: {point.get('summary', '')}\n"
+            f"Reason: {point.get('reason', '')[:300]}\n"
+            f"Market Gap: {point.get('market_gap', '')}\n"
+            f"Trend: {point.get('trend', '')}\n"
+            f"Severity: {point.get('severity', '')}/10\n"
+            f"Excerpt: \"{point.get('excerpt', '')}\"\n"
+        )
+    return prompt
+
+def parse_enrichment_response(response, count):
+    """
+    Map a batched enrichment response onto `count` items. The array is repaired and parsed element by
+    element, so one broken element only leaves its own slot None (the caller's per-point fallback).
+    """
+    results = [None] * count
+    if not isinstance(response, str):
+        return results
+    _, parser = parse_llm_json(response, PAIN_CLOUD_ENRICHMENT_SCHEMAS)
+    for pos, item in enumerate(parser.items[ROOT]):
+        idx = item['index']
+        idx = int(idx) - 1 if str(idx).isdigit() else pos
+        if 0 <= idx < count:
+            results[idx] = item
+    return results
+
 # ---- ROUTES ----
 @app.route('/pain-cloud-realtime', methods=['GET'])
 def pain_cloud_realtime_page():
@@ -3576,17 +3186,32 @@ def pain_cloud_combined_page():
 
 
 
-@app.route('/pain-cloud-realtime', methods=['POST'])
-def pain_cloud_realtime_api():
-    data = request.get_json()
-    persona = data.get('persona')
-    industry = data.get('industry')
-    mode = data.get('mode', 'real')
+def fetch_recent_reddit_live(subreddit, window, limit):
+    """Newest posts of `subreddit` from the last `window` seconds straight from Reddit, shaped like crawler rows"""
+    cutoff = time.time() - window
+    try:
+        posts = list(reddit.subreddit(subreddit).new(limit=limit))
+    except Exception as e:
+        print(f"❌ Live Reddit fetch failed for r/{subreddit}: {e}")
+        return []
+    return [{
+        'title': post.title or '',
+        'text': post.selftext or '',
+        'score': post.score,
+        'url': post.url or f"https://www.reddit.com{post.permalink}",
+        'published_at': post.created_utc,
+        'extra': {'subreddit': subreddit},
+    } for post in posts if post.created_utc >= cutoff]
 
-    if not persona or not industry:
-        return jsonify({'error': 'Missing persona or industry'}), 400
 
-    sources = PERSONA_INDUSTRY_SOURCES.get((persona, industry)) or PERSONA_SOURCES.get(persona, [])
+def compute_pain_cloud(persona, industry):
+    """
+    Pain points, trending keywords and trend groups for one persona x industry pair.
+    Returns (result, llm_calls); result carries an 'error' key when there is nothing to analyse.
+    """
+    sources = PERSONA_INDUSTRY_SOURCES.get((persona, industry)) or [
+        f"r/{subreddit}" for subreddit in PERSONA_SOURCES.get(persona, {}).get('reddit', [])
+    ]
 
     def is_complaint_post(title, body):
         complaint_keywords = [
@@ -3602,33 +3227,28 @@ def pain_cloud_realtime_api():
 
     all_posts = []
 
-    # --- Parallel fetch Reddit posts ---
+    # --- Recent Reddit posts from the incremental crawler's local store ---
     reddit_sources = [s[2:] for s in sources if s.startswith('r/')]
-    def fetch_subreddit(subreddit):
-        posts = []
-        try:
-            for post in reddit.subreddit(subreddit).new(limit=100):
-                if is_complaint_post(post.title, post.selftext):
-                    posts.append({
-                        'title': post.title or '',
-                        'selftext': post.selftext or '',
-                        'score': post.score,
-                        'url': f"https://reddit.com{post.permalink}",
-                        'source': f"r/{subreddit}",
-                        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(post.created_utc)),
-                        'created_utc': post.created_utc
-                    })
-        except Exception as e:
-            print(f"[Reddit error] r/{subreddit}: {e}")
-        return posts
-
-    with ThreadPoolExecutor(max_workers=min(8, len(reddit_sources))) as executor:
-        futures = [executor.submit(fetch_subreddit, sub) for sub in reddit_sources]
-        for future in as_completed(futures):
-            all_posts.extend(future.result())
+    rows = incremental_crawler.recent_reddit(reddit_sources, PAIN_CLOUD_WINDOW, PAIN_CLOUD_POSTS_PER_SUBREDDIT)
+    # A subreddit the crawler holds nothing for yet (fresh deploy, failed first crawl) is read live instead
+    stored = {row['extra'].get('subreddit', '').lower() for row in rows}
+    for subreddit in reddit_sources:
+        if subreddit.lower() not in stored:
+            rows.extend(fetch_recent_reddit_live(subreddit, PAIN_CLOUD_WINDOW, PAIN_CLOUD_POSTS_PER_SUBREDDIT))
+    for row in rows:
+        if is_complaint_post(row['title'], row['text']):
+            all_posts.append({
+                'title': row['title'] or '',
+                'selftext': row['text'] or '',
+                'score': row['score'] or 0,
+                'url': row['url'],
+                'source': f"r/{row['extra'].get('subreddit', '')}",
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(row['published_at'])),
+                'created_utc': row['published_at']
+            })
 
     if not all_posts:
-        return jsonify({'error': 'No relevant complaint posts found.'})
+        return {'error': 'No relevant complaint posts found.'}, 0
 
     def score(post):
         return post['score'] - 0.5 * ((time.time() - post['created_utc']) / 86400)
@@ -3662,45 +3282,6 @@ Return a **JSON array**, where each item is a **validated pain point**, with the
         prompt += f"\n[{idx}] Title: {title}\nText: {text}\nUpvotes: {post['score']}\nSource: {post['source']}\nTimestamp: {post['timestamp']}\nURL: {post['url']}"
     prompt += "\n\nOnly include pain points that are truly startup-relevant and avoid generic complaints."
 
-    # --- Robust Groq call: always return valid JSON array ---
-    import re, json
-    pain_points = []
-    for _ in range(30):  # Try up to 30 keys if needed
-        try:
-            response = groq_generate_content(prompt)
-            match = re.search(r'\[.*\]', response.strip(), re.DOTALL)
-            if match:
-                try:
-                    pain_points = json.loads(match.group(0))
-                    break  # Success!
-                except Exception as parse_e:
-                    print(f"[Groq error]: {parse_e}. Trying next key...")
-                    continue
-            else:
-                print("[Groq error]: No JSON array found in response, trying next key...")
-                continue
-        except Exception as e:
-            print(f"[Groq error]: {e}. Trying next key...")
-            continue
-    # If all keys fail, return a friendly fallback
-    if not pain_points:
-        pain_points = [{
-            'summary': 'No valid pain points could be extracted at this time.',
-            'reason': 'The AI did not return a valid result. Please try again later.',
-            'market_gap': '',
-            'trend': '',
-            'severity': 0,
-            'title': '',
-            'excerpt': '',
-            'upvotes': 0,
-            'source': '',
-            'timestamp': '',
-            'url': ''
-        }]
-
-    # (rest of the endpoint unchanged)
-    real_pain_points = [p for p in pain_points if not (isinstance(p.get('reason', ''), str) and 'fallback: complaint matched keyword list' in p.get('reason', '').lower())]
-
     num_bins = 15
     now = time.time()
     bin_edges = [now - (num_bins - i) * 7 * 86400 for i in range(num_bins + 1)]
@@ -3711,18 +3292,6 @@ Return a **JSON array**, where each item is a **validated pain point**, with the
         sev = point.get('severity')
         sev_score = int(sev) if isinstance(sev, int) or (isinstance(sev, str) and sev.isdigit()) else 7
         point['tag'] = 'VC-worthy' if sev_score >= 8 else 'Quick Fix'
-        try:
-            keyword_prompt = f"Extract 3 startup-relevant keywords from this pain point:\n{point.get('title', '')[:100]}\n{point.get('reason', '')[:200]}\nReturn JSON: {{\"keywords\": [\"...\"]}}"
-            kw_resp = groq_generate_content(keyword_prompt, max_tokens=100)
-            match = re.search(r'\{.*\}', kw_resp.strip())
-            if match:
-                parsed = json.loads(match.group(0))
-                point['keywords'] = [{'word': k, 'score': random.randint(6, 10)} for k in parsed['keywords']]
-        except:
-            if 'keywords' not in point:
-                text = f"{point.get('title', '')} {point.get('reason', '')}"
-                top = Counter(re.findall(r'\b[a-z]{4,}\b', text.lower())).most_common(3)
-                point['keywords'] = [{'word': w, 'score': min(10, max(3, f))} for w, f in top]
         matching_posts = [p for p in all_posts if point['title'].lower() in p['title'].lower()]
         bin_counts = [0] * num_bins
         for post in matching_posts:
@@ -3734,44 +3303,18 @@ Return a **JSON array**, where each item is a **validated pain point**, with the
         point['sparkline_data'] = bin_counts or [0] * num_bins
         delta = bin_counts[-1] - bin_counts[0] if bin_counts else 0
         point['trend_direction'] = 'rising' if delta > 2 else 'fading' if delta < -2 else 'flat'
-        current_date = datetime.now().strftime('%B %d, %Y')
-        try:
-            insight_prompt = f"""Analyze this pain trend for {persona}s in {industry}:
-Analyze the following pain trend among {persona}s in the {industry} industry, using Reddit frequency data up to {current_date}.
-
-Deliver a clear, sharp, **conviction-based insight** like a VC would pitch internally.
-Avoid weak or indecisive language. Take a stance — for or against investing product resources.
-
-Frame the insight through the lens of what a {persona} in the {industry} industry cares most about — e.g., speed to launch, retention, roadmap clarity, developer productivity, or customer satisfaction. Think about what blocks their outcomes and how solving this would unlock leverage.
-
-Cover:
-1. **Trajectory**: Is this a rising, fading, or stagnant pain? (Quantify trend where possible.)
-2. **Urgency Signal**: What does the emotion + frequency + severity tell us?
-3. **Market Risk**: What's at stake if ignored — missed revenue, roadmap slip, morale loss?
-4. **Strategic Opportunity**: Could this be a wedge into a broader product or service? Is it timing-sensitive?
-
-Emphasize **why a founder or PM should act on this now**. Would fixing this 10x outcomes? Unlock new markets? Lower churn?
-
-Where possible, **quantify** the impact: % of team affected, time wasted, missed goals. Use the quote to assess **emotion** and user frustration.
-
-Avoid vague language like "might," "maybe," or "could." Be definitive and useful.
-
-Context:
-Pain Summary: {point['summary']}
-Reason: {point['reason']}
-Market Gap: {point['market_gap']}
-Trend: {point['trend']}
-Role: {persona}
-Industry: {industry}
-Severity: {point['severity']}/10  
-Excerpt: "{point['excerpt']}"
-
+        return point
 
-Provide a brief, actionable insight (max 200 words) about why this matters for {persona}s in the {industry} industry."""
-            insight_resp = groq_generate_content(insight_prompt, max_tokens=300)
-            point['sparkline_insight'] = insight_resp.strip()
+    def apply_llm_enrichment(point, item):
+        item = item or {}
+        keywords = item.get('keywords')
+        if isinstance(keywords, list) and keywords:
+            point['keywords'] = [{'word': str(k), 'score': random.randint(6, 10)} for k in keywords[:3]]
+        insight = item.get('insight')
+        if isinstance(insight, str) and insight.strip():
+            point['sparkline_insight'] = insight.strip()
             point['trend_label'] = "Trending"
-        except Exception as e:
+        else:
             point['sparkline_insight'] = ""
             point['trend_label'] = ""
         if 'keywords' not in point or not point['keywords']:
@@ -3780,8 +3323,70 @@ Provide a brief, actionable insight (max 200 words) about why this matters for {
             point['keywords'] = [{'word': w, 'score': min(10, max(3, f))} for w, f in top]
         all_keywords.extend([k['word'] for k in point['keywords']])
         return point
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        enriched_points = list(executor.map(enrich_point, real_pain_points[:10]))
+
+    # --- Groq pain point extraction, parsed as it streams ---
+    # Keywords + insights come from batched prompts on the gateway; each batch starts as soon as its
+    # pain points have streamed in, while the extraction is still generating the rest
+    extracted = []
+    enriched_points = []
+    batches = []
+
+    def start_enrichment(batch):
+        future = llm_gateway.gateway.submit(llm_gateway.gateway.generate(
+            build_enrichment_prompt(batch, persona, industry), max_tokens=400 * len(batch)))
+        batches.append((batch, future))
+
+    def on_pain_point(key, point):
+        extracted.append(point)
+        if len(enriched_points) >= 10 or 'fallback: complaint matched keyword list' in point['reason'].lower():
+            return
+        enriched_points.append(enrich_point(point))
+        if len(enriched_points) % ENRICHMENT_BATCH_SIZE == 0:
+            start_enrichment(enriched_points[-ENRICHMENT_BATCH_SIZE:])
+
+    llm_calls = 0
+    for attempt in range(PAIN_CLOUD_EXTRACTION_ATTEMPTS):
+        llm_calls += 1
+        try:
+            # Only the first attempt may be served from the prompt cache, so a retry never replays a bad response
+            groq_generate_json(prompt, PAIN_CLOUD_SCHEMAS, on_item=on_pain_point, use_cache=attempt == 0)
+        except Exception as e:
+            print(f"[Groq error]: {e}")
+        if extracted:
+            break
+        print("[Groq error]: No pain points in response, regenerating...")
+    # If every attempt fails, return a friendly fallback
+    if not extracted:
+        on_pain_point(None, {
+            'summary': 'No valid pain points could be extracted at this time.',
+            'reason': 'The AI did not return a valid result. Please try again later.',
+            'market_gap': '',
+            'trend': '',
+            'severity': 0,
+            'title': '',
+            'excerpt': '',
+            'upvotes': 0,
+            'source': '',
+            'timestamp': '',
+            'url': ''
+        })
+    remainder = len(enriched_points) % ENRICHMENT_BATCH_SIZE
+    if remainder:
+        start_enrichment(enriched_points[-remainder:])
+    # One deadline for all batches, so a slow batch never holds back the ones that already finished
+    done, _ = wait([future for _, future in batches], timeout=LLM_BATCH_TIMEOUT)
+    for batch, future in batches:
+        response = None
+        if future not in done:
+            print(f"⏱️ Pain point enrichment missed its {LLM_BATCH_TIMEOUT}s deadline")
+            future.cancel()
+        else:
+            try:
+                response = future.result()
+            except Exception as e:
+                print(f"❌ Pain point enrichment failed: {e}")
+        for point, item in zip(batch, parse_enrichment_response(response, len(batch))):
+            apply_llm_enrichment(point, item)
     trending_keywords = [kw for kw, _ in Counter(all_keywords).most_common(10)]
     rising_trend, fading_trend, flat_trend = [], [], []
     for point in enriched_points:
@@ -3792,7 +3397,7 @@ Provide a brief, actionable insight (max 200 words) about why this matters for {
             fading_trend.append(point)
         elif dir == 'flat':
             flat_trend.append(point)
-    return jsonify({
+    return {
         'pain_points': enriched_points,
         'trending_keywords': trending_keywords,
         'groups': {
@@ -3801,7 +3406,42 @@ Provide a brief, actionable insight (max 200 words) about why this matters for {
             'flat': flat_trend
         },
         'raw_posts': top_posts
-    })
+    }, llm_calls + len(batches)
+
+# Known pairs are recomputed off-peak and served from their latest materialization
+pain_cloud_materializer.configure(PERSONA_INDUSTRY_SOURCES.keys(), compute_pain_cloud)
+pain_cloud_materializer.start()
+
+@app.route('/pain-cloud-realtime', methods=['POST'])
+def pain_cloud_realtime_api():
+    data = request.get_json()
+    persona = data.get('persona')
+    industry = data.get('industry')
+
+    if not persona or not industry:
+        return jsonify({'error': 'Missing persona or industry'}), 400
+
+    if (persona, industry) not in PERSONA_INDUSTRY_SOURCES:
+        result, _ = compute_pain_cloud(persona, industry)
+        return jsonify(result)
+
+    record = pain_cloud_materializer.latest(persona, industry)
+    if record is None:
+        # Cold start: one worker computes the first version, concurrent requests wait for it
+        record = single_flight.do(
+            "pain_cloud", lambda: pain_cloud_materializer.materialize(persona, industry),
+            persona=persona, industry=industry
+        ) or pain_cloud_materializer.latest(persona, industry)
+    if record is None:
+        result, _ = compute_pain_cloud(persona, industry)
+        return jsonify(result)
+    if 'version' not in record:
+        return jsonify(record['result'])
+    return jsonify(dict(
+        record['result'],
+        materialized_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(record['computed_at'])),
+        version=record['version']
+    ))
     
     
 # Pain Search Engine Routes
@@ -3826,118 +3466,111 @@ def pain_search_api():
         
         print(f"🔍 Pain search for: {query}")
         
-        # Initialize results dictionary
-        results = {
-            'reddit': [],
-            'news': [],
-            'stackoverflow': [],
-            'complaintsboard': []
-        }
+        # Identical concurrent searches share one run across threads and gunicorn workers
+        result = single_flight.do("pain_search", lambda: run_pain_search(query, category), query=query, category=category)
+        return jsonify(result)
         
-        # Search across multiple sources
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            # Reddit search - use broader search terms
-            reddit_query = f"{query} (problem OR issue OR pain OR complaint OR struggle OR frustration OR broken OR bug OR error OR fail OR difficult OR challenging OR annoying OR terrible OR awful OR hate OR disappointed)"
-            reddit_future = executor.submit(get_reddit_posts_with_replies, reddit_query, max_posts=15)
-            
-            # News API search - already optimized for pain points
-            news_future = executor.submit(search_news_api, query, max_results=20)
-            
-            # Stack Overflow search - focus on problems and errors
-            stackoverflow_query = f"{query} (problem OR error OR bug OR issue OR fail OR broken OR doesn't work OR not working)"
-            stackoverflow_future = executor.submit(search_stackoverflow, stackoverflow_query, max_pages=3, pagesize=30)
-            
-            # ComplaintsBoard search - already optimized for complaints
-            complaints_future = executor.submit(scrape_complaintsboard_full_text, query, max_pages=8)
-            
-            # Collect results
-            try:
-                results['reddit'] = reddit_future.result(timeout=45)
-                print(f"✅ Reddit: {len(results['reddit'])} results")
-            except Exception as e:
-                print(f"❌ Reddit search error: {e}")
-                results['reddit'] = []
-            
-            try:
-                results['news'] = news_future.result(timeout=30)
-                print(f"✅ News: {len(results['news'])} results")
-            except Exception as e:
-                print(f"❌ News search error: {e}")
-                results['news'] = []
-            
-            try:
-                results['stackoverflow'] = stackoverflow_future.result(timeout=30)
-                print(f"✅ Stack Overflow: {len(results['stackoverflow'])} results")
-            except Exception as e:
-                print(f"❌ Stack Overflow search error: {e}")
-                results['stackoverflow'] = []
-            
-            try:
-                results['complaintsboard'] = complaints_future.result(timeout=60)
-                print(f"✅ ComplaintsBoard: {len(results['complaintsboard'])} results")
-            except Exception as e:
-                print(f"❌ ComplaintsBoard search error: {e}")
-                results['complaintsboard'] = []
-        
-        # Combine all content for AI analysis
-        all_content = []
-        
-        # Process Reddit results
-        for post in results['reddit']:
-            content = f"{post.get('title', '')}\n{post.get('selftext', '')}"
-            if len(content.strip()) > 50:  # Only include posts with substantial content
-                all_content.append({
-                    'title': post.get('title', ''),
-                    'content': content,
-                    'url': post.get('url', ''),
-                    'source': 'Reddit',
-                    'score': post.get('score', 0),
-                    'comments': post.get('comments', [])
-                })
-        
-        # Process News results
-        for article in results['news']:
-            content = article.get('content', '') or article.get('description', '')
-            if content and len(content.strip()) > 50:
-                all_content.append({
-                    'title': article.get('title', ''),
-                    'content': content,
-                    'url': article.get('url', ''),
-                    'source': 'News',
-                    'score': 0,
-                    'publishedAt': article.get('publishedAt', '')
-                })
-        
-        # Process Stack Overflow results
-        for question in results['stackoverflow']:
-            title = question.get('title', '')
-            if title and len(title.strip()) > 20:
-                all_content.append({
-                    'title': title,
-                    'content': title,  # Stack Overflow API doesn't provide full content
-                    'url': question.get('link', ''),
-                    'source': 'Stack Overflow',
-                    'score': 0
-                })
-        
-        # Process ComplaintsBoard results
-        for complaint in results['complaintsboard']:
-            content = complaint.get('text', '') or complaint.get('title', '')
-            if content and len(content.strip()) > 30:
-                all_content.append({
-                    'title': complaint.get('title', ''),
-                    'content': content,
-                    'url': complaint.get('url', ''),
-                    'source': 'ComplaintsBoard',
-                    'score': 0
-                })
-        
-        print(f"📊 Total content items: {len(all_content)}")
-        
-        # Generate AI analysis using Groq
-        if all_content:
-            # Create a more detailed and specific prompt
-            analysis_prompt = f"""
+    except Exception as e:
+        print(f"❌ Pain search API error: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+
+def run_pain_search(query, category):
+    """Search every pain source for `query` and run the AI pain-point analysis on the combined content"""
+    # Initialize results dictionary
+    results = {
+        'reddit': [],
+        'news': [],
+        'stackoverflow': [],
+        'complaintsboard': []
+    }
+    
+    # Search across multiple sources; each consults the local corpus for `query` first and only goes upstream for the gap
+    # Reddit search - use broader search terms
+    reddit_query = f"{query} (problem OR issue OR pain OR complaint OR struggle OR frustration OR broken OR bug OR error OR fail OR difficult OR challenging OR annoying OR terrible OR awful OR hate OR disappointed)"
+    # Stack Overflow search - focus on problems and errors
+    stackoverflow_query = f"{query} (problem OR error OR bug OR issue OR fail OR broken OR doesn't work OR not working)"
+    results, missing = executors.source_fetch.gather({
+        'reddit': lambda: corpus_store.search_or_fetch("reddit", query,
+                                                       guarded("reddit", lambda needed: get_reddit_posts_with_replies(reddit_query, batch_size=needed)),
+                                                       *REDDIT_CORPUS, limit=15, usable=has_comments),
+        # News API search - already optimized for pain points
+        'news': lambda: corpus_store.search_or_fetch("news", query, lambda needed: search_news_api(query, max_results=needed),
+                                                     *NEWS_CORPUS, limit=20),
+        'stackoverflow': lambda: corpus_store.search_or_fetch("stackoverflow", query,
+                                                              guarded("stackoverflow", lambda needed: search_stackoverflow(stackoverflow_query, max_pages=pages_for(needed, 30), pagesize=30)),
+                                                              *STACKOVERFLOW_CORPUS, limit=90, min_results=30),
+        # ComplaintsBoard search - already optimized for complaints
+        'complaintsboard': lambda: corpus_store.search_or_fetch("complaintsboard", query,
+                                                                lambda needed: scrape_complaintsboard_full_text(query, max_pages=8, max_results=needed),
+                                                                *COMPLAINTSBOARD_CORPUS, limit=COMPLAINTSBOARD_MAX_RESULTS,
+                                                                min_results=20),
+    }, timeout=PAIN_SEARCH_TIMEOUT)
+    for name, items in results.items():
+        if name not in missing:
+            print(f"✅ {name}: {len(items)} results")
+    
+    # Combine all content for AI analysis
+    all_content = []
+    
+    # Process Reddit results
+    for post in results['reddit']:
+        content = f"{post.get('title', '')}\n{post.get('selftext', '')}"
+        if len(content.strip()) > 50:  # Only include posts with substantial content
+            all_content.append({
+                'title': post.get('title', ''),
+                'content': content,
+                'url': post.get('url', ''),
+                'source': 'Reddit',
+                'score': post.get('score', 0),
+                'comments': post.get('comments', [])
+            })
+    
+    # Process News results
+    for article in results['news']:
+        content = article.get('content', '') or article.get('description', '')
+        if content and len(content.strip()) > 50:
+            all_content.append({
+                'title': article.get('title', ''),
+                'content': content,
+                'url': article.get('url', ''),
+                'source': 'News',
+                'score': 0,
+                'publishedAt': article.get('publishedAt', '')
+            })
+    
+    # Process Stack Overflow results
+    for question in results['stackoverflow']:
+        title = question.get('title', '')
+        if title and len(title.strip()) > 20:
+            all_content.append({
+                'title': title,
+                'content': title,  # Stack Overflow API doesn't provide full content
+                'url': question.get('link', ''),
+                'source': 'Stack Overflow',
+                'score': 0
+            })
+    
+    # Process ComplaintsBoard results
+    for complaint in results['complaintsboard']:
+        content = complaint.get('text', '') or complaint.get('title', '')
+        if content and len(content.strip()) > 30:
+            all_content.append({
+                'title': complaint.get('title', ''),
+                'content': content,
+                'url': complaint.get('url', ''),
+                'source': 'ComplaintsBoard',
+                'score': 0
+            })
+    
+    print(f"📊 Total content items: {len(all_content)}")
+    
+    # Generate AI analysis using Groq
+    if all_content:
+        # Create a more detailed and specific prompt
+        analysis_prompt = f"""
 You are an expert startup advisor and pain point analyst specializing in identifying real user problems and startup opportunities. 
 
 Analyze the following content related to "{query}" and extract specific, actionable insights. Focus on REAL problems that users are actually experiencing, not generic statements.
@@ -3988,69 +3621,65 @@ Return ONLY valid JSON in this exact format:
 
 Content to analyze:
 """
-            
-            # Add content to prompt with better formatting
-            for i, item in enumerate(all_content[:25]):  # Limit to 25 items
-                source = item['source']
-                title = item['title'][:200]  # Limit title length
-                content = item['content'][:400]  # Limit content length
-                
-                analysis_prompt += f"\n--- SOURCE {i+1}: {source} ---\n"
-                analysis_prompt += f"TITLE: {title}\n"
-                analysis_prompt += f"CONTENT: {content}\n"
-                if item.get('comments'):
-                    analysis_prompt += f"COMMENTS: {' '.join(item['comments'][:3])}\n"
-                analysis_prompt += f"URL: {item['url']}\n"
-            
-            analysis_prompt += "\n\nAnalyze the above content and return ONLY the JSON response. If no specific pain points are found, return empty arrays but explain why in the description."
-            
-            try:
-                print("🤖 Generating AI analysis...")
-                analysis_response = groq_generate_content_with_fallback(analysis_prompt, max_tokens=4000, temperature=0.7)
-                
-                # Try to extract JSON from response
-                import re
-                json_match = re.search(r'\{.*\}', analysis_response, re.DOTALL)
-                if json_match:
-                    try:
-                        analysis = json.loads(json_match.group(0))
-                        print(f"✅ AI analysis successful: {len(analysis.get('pain_points', []))} pain points, {len(analysis.get('startup_opportunities', []))} opportunities")
-                    except json.JSONDecodeError as e:
-                        print(f"❌ JSON decode error: {e}")
-                        analysis = create_fallback_analysis(query, all_content)
-                else:
-                    print("❌ No JSON found in response")
-                    analysis = create_fallback_analysis(query, all_content)
-            except Exception as e:
-                print(f"❌ AI analysis error: {e}")
-                analysis = create_fallback_analysis(query, all_content)
-        else:
-            print("❌ No content found for analysis")
-            analysis = {
-                "pain_points": [],
-                "startup_opportunities": [],
-                "note": f"No relevant content found for '{query}'. Try a different search term or check if the sources are working properly."
-            }
         
-        # Calculate statistics
-        total_sources = sum(1 for source_data in results.values() if source_data)
-        total_items = sum(len(source_data) for source_data in results.values())
+        closing = "\n\nAnalyze the above content and return ONLY the JSON response. If no specific pain points are found, return empty arrays but explain why in the description."
         
-        return jsonify({
-            "query": query,
-            "category": category,
-            "results": results,
-            "analysis": analysis,
-            "total_sources": total_sources,
-            "total_items": total_items,
-            "content_count": len(all_content)
-        })
+        # The items most relevant to the query (near-duplicates dropped) that fit the model's request limit
+        def content_of(item):
+            comments = f" COMMENTS: {' '.join(item['comments'][:3])}" if item.get('comments') else ""
+            return f"{item['content']}{comments}"
         
-    except Exception as e:
-        print(f"❌ Pain search API error: {e}")
-        import traceback
-        traceback.print_exc()
-        return jsonify({"error": f"Server error: {str(e)}"}), 500
+        packed = context_packer.pack(
+            all_content, query,
+            context_packer.prompt_budget(CITATION_MODEL, PAIN_SEARCH_MAX_TOKENS, analysis_prompt, closing),
+            lambda n, item, text: (f"\n--- SOURCE {n}: {item['source']} ---\n"
+                                   f"TITLE: {item['title'][:200]}\nCONTENT: {text}\nURL: {item['url']}\n"),
+            text_of=content_of
+        )
+        analysis_prompt += "".join(block for _, _, _, block in packed) + closing
+        print(f"📦 Packed {len(packed)} of {len(all_content)} items into the analysis prompt")
+        
+        try:
+            print("🤖 Generating AI analysis...")
+            started = time.time()
+            seen = set()
+            
+            def first_item(key, item):
+                if key not in seen:
+                    seen.add(key)
+                    print(f"⚡ First {key} item parsed after {time.time() - started:.1f}s")
+            
+            analysis, _ = groq_generate_json(analysis_prompt, PAIN_SEARCH_SCHEMAS, on_item=first_item,
+                                             max_tokens=PAIN_SEARCH_MAX_TOKENS, temperature=0.7, model=CITATION_MODEL)
+            if isinstance(analysis, dict):
+                print(f"✅ AI analysis successful: {len(analysis.get('pain_points', []))} pain points, {len(analysis.get('startup_opportunities', []))} opportunities")
+            else:
+                print("❌ No JSON found in response")
+                analysis = create_fallback_analysis(query, all_content)
+        except Exception as e:
+            print(f"❌ AI analysis error: {e}")
+            analysis = create_fallback_analysis(query, all_content)
+    else:
+        print("❌ No content found for analysis")
+        analysis = {
+            "pain_points": [],
+            "startup_opportunities": [],
+            "note": f"No relevant content found for '{query}'. Try a different search term or check if the sources are working properly."
+        }
+    
+    # Calculate statistics
+    total_sources = sum(1 for source_data in results.values() if source_data)
+    total_items = sum(len(source_data) for source_data in results.values())
+    
+    return {
+        "query": query,
+        "category": category,
+        "results": results,
+        "analysis": analysis,
+        "total_sources": total_sources,
+        "total_items": total_items,
+        "content_count": len(all_content)
+    }
 
 
 def create_fallback_analysis(query, all_content):
@@ -4261,7 +3890,6 @@ def live_trends_api():
                 to_date = end_date.strftime('%Y-%m-%d')
                 
                 headlines_params = {
-                    "apiKey": api_key,
                     "country": "us" if region == "us" else None,
                     "category": category if category != "all" else "general",
                     "pageSize": 50,
@@ -4269,13 +3897,8 @@ def live_trends_api():
                     "to": to_date
                 }
                 headlines_params = {k: v for k, v in headlines_params.items() if v is not None}
-                response = requests.get(
-                    f"{NEWS_API_BASE_URL}/top-headlines",
-                    params=headlines_params,
-                    timeout=15
-                )
-                if response.status_code == 200:
-                    data = response.json()
+                data = newsapi_governor.get("top-headlines", headlines_params, api_key, reserve=LOW_BUDGET_RESERVE)
+                if data is not None:
                     articles = data.get("articles", [])
                     trending_topics = []
                     for article in articles[:20]:
@@ -4298,7 +3921,6 @@ def live_trends_api():
                             })
                     return trending_topics
                 else:
-                    print(f"❌ News API error: {response.status_code}")
                     return []
             except Exception as e:
                 print(f"❌ News trends error: {e}")
@@ -4509,22 +4131,14 @@ def live_trends_api():
                     }
                 ]
         
-        # Run all trend gathering in parallel with timeout
-        try:
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                news_future = executor.submit(get_news_trends)
-                reddit_future = executor.submit(get_reddit_trends)
-                stackoverflow_future = executor.submit(get_stackoverflow_trends)
-                complaints_future = executor.submit(get_complaints_trends)
-                
-                # Collect results with timeout
-                trends_data['news_trends'] = news_future.result(timeout=30)
-                trends_data['reddit_trends'] = reddit_future.result(timeout=30)
-                trends_data['stackoverflow_trends'] = stackoverflow_future.result(timeout=30)
-                trends_data['complaints_trends'] = complaints_future.result(timeout=30)
-        except Exception as e:
-            print(f"❌ Thread execution error: {e}")
-            # Continue with empty results if threading fails
+        # Run all trend gathering in parallel; sources that miss the deadline contribute no trends
+        trends, _ = executors.source_fetch.gather({
+            'news_trends': get_news_trends,
+            'reddit_trends': get_reddit_trends,
+            'stackoverflow_trends': get_stackoverflow_trends,
+            'complaints_trends': get_complaints_trends,
+        }, timeout=LIVE_TRENDS_TIMEOUT)
+        trends_data.update(trends)
         
         # Combine all trends for global analysis
         all_trends = []
@@ -4648,26 +4262,19 @@ def trending_keywords_api():
             if api_key:
                 from_date, to_date = get_newsapi_date_range()
                 
-                # Get top headlines
-                response = requests.get(
-                    f"{NEWS_API_BASE_URL}/top-headlines",
-                    params={
-                        "apiKey": api_key,
-                        "country": "us",
-                        "pageSize": 20
-                    },
-                    timeout=10
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
+                # Get top headlines (RSS headlines when the daily budget runs low)
+                data = newsapi_governor.get("top-headlines", {"country": "us", "pageSize": 20}, api_key,
+                                            reserve=LOW_BUDGET_RESERVE, timeout=10)
+                if data is not None:
                     articles = data.get("articles", [])
-                    
-                    for article in articles:
-                        title = article.get("title", "")
-                        if title:
-                            words = re.findall(r'\b[a-z]{4,}\b', title.lower())
-                            keywords.extend(words)
+                else:
+                    articles = get_news_trends_hybrid(max_items=20)
+                
+                for article in articles:
+                    title = article.get("title", "")
+                    if title:
+                        words = re.findall(r'\b[a-z]{4,}\b', title.lower())
+                        keywords.extend(words)
         except Exception as e:
             print(f"❌ News keywords error: {e}")
         
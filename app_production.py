@@ -6,7 +6,6 @@ Production-ready Flask app with OpenRouter DeepSeek integration
 import os
 import json
 import time
-import requests
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
 from flask_cors import CORS
@@ -18,6 +17,7 @@ from flask_login import (
 from werkzeug.security import generate_password_hash, check_password_hash
 from functools import wraps
 from diskcache import Cache
+from llm_clients import client_pool
 
 # Load environment variables
 load_dotenv()
@@ -128,7 +128,7 @@ class OpenRouterClient:
                 "top_p": 0.9
             }
             
-            response = requests.post(
+            response = client_pool.session().post(
                 f"{self.base_url}/chat/completions",
                 headers=self.headers,
                 json=payload,
@@ -1,12 +1,11 @@
 import requests
 import re
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from diskcache import Cache
+from browser_pool import browser_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -60,54 +59,47 @@ class AppStoreSource:
             return result
             
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=options)
+            with browser_pool.driver() as driver:
+                url = f"https://play.google.com/store/apps/details?id={app_id}&showAllReviews=true"
+                driver.get(url)
             
-            url = f"https://play.google.com/store/apps/details?id={app_id}&showAllReviews=true"
-            driver.get(url)
+                # Wait for reviews to load
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div[jsname='fk8dgd']"))
+                )
             
-            # Wait for reviews to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[jsname='fk8dgd']"))
-            )
+                # Scroll to load more reviews
+                for _ in range(5):
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    import time
+                    time.sleep(1)
             
-            # Scroll to load more reviews
-            for _ in range(5):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                import time
-                time.sleep(1)
+                reviews = driver.find_elements(By.CSS_SELECTOR, "div[jsname='fk8dgd']")
+                results = []
             
-            reviews = driver.find_elements(By.CSS_SELECTOR, "div[jsname='fk8dgd']")
-            results = []
-            
-            for review in reviews[:max_reviews]:
-                try:
-                    rating_element = review.find_element(By.CSS_SELECTOR, "div[role='img']")
-                    rating = rating_element.get_attribute("aria-label")
-                    rating = re.search(r"(\d+)", rating).group(1) if rating else "?"
+                for review in reviews[:max_reviews]:
+                    try:
+                        rating_element = review.find_element(By.CSS_SELECTOR, "div[role='img']")
+                        rating = rating_element.get_attribute("aria-label")
+                        rating = re.search(r"(\d+)", rating).group(1) if rating else "?"
                     
-                    author = review.find_element(By.CSS_SELECTOR, "span[class='X43Kjb']").text
-                    date = review.find_element(By.CSS_SELECTOR, "span[class='p2TkOb']").text
-                    content = review.find_element(By.CSS_SELECTOR, "div[class='h3YV2d']").text
+                        author = review.find_element(By.CSS_SELECTOR, "span[class='X43Kjb']").text
+                        date = review.find_element(By.CSS_SELECTOR, "span[class='p2TkOb']").text
+                        content = review.find_element(By.CSS_SELECTOR, "div[class='h3YV2d']").text
                     
-                    results.append({
-                        "author": author,
-                        "date": date,
-                        "rating": rating,
-                        "content": content
-                    })
-                except Exception as e:
-                    continue
+                        results.append({
+                            "author": author,
+                            "date": date,
+                            "rating": rating,
+                            "content": content
+                        })
+                    except Exception as e:
+                        continue
             
-            driver.quit()
             cache.set(cache_key, results, expire=3600)
             return results
         except Exception as e:
             logger.error(f"Error fetching Play Store reviews: {e}")
-            if 'driver' in locals():
-                driver.quit()
             return []
 
 # Singleton instance
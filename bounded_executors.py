@@ -0,0 +1,161 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+_task = threading.local()
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised (on the returned future) when a bounded executor's queue is full"""
+
+
+def cancelled():
+    """True inside a task whose gather() deadline has passed; long loops should check it and return early"""
+    token = getattr(_task, "cancel", None)
+    return token is not None and token.is_set()
+
+
+def remaining():
+    """Seconds left before the current task's gather() deadline, or None outside a deadline"""
+    deadline = getattr(_task, "deadline", None)
+    return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+
+class BoundedExecutor:
+    """
+    Process-wide thread pool for one subsystem, with a bound on how much work
+    may queue behind its workers.
+
+    submit() never blocks. Once `max_workers + max_queue` tasks are queued or
+    running, it returns a future failed with ExecutorSaturated, so a burst
+    of requests cannot pile up unbounded work. gather() runs several calls
+    and returns at the deadline with whatever finished. Stragglers are not
+    waited for: queued ones are cancelled, and running ones see cancelled()
+    turn true so they can stop early.
+    """
+
+    def __init__(self, name, max_workers, max_queue):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._active = 0
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0,
+                       "abandoned": 0, "cancelled": 0, "max_pending": 0}
+
+    def _count(self, outcome, n=1):
+        with self._lock:
+            self._stats[outcome] += n
+
+    def _run(self, fn, args, kwargs, cancel, deadline):
+        with self._lock:
+            self._active += 1
+        _task.cancel, _task.deadline = cancel, deadline
+        try:
+            result = fn(*args, **kwargs)
+            self._count("completed")
+            return result
+        except BaseException:
+            self._count("failed")
+            raise
+        finally:
+            _task.cancel = _task.deadline = None
+            with self._lock:
+                self._active -= 1
+                self._pending -= 1
+
+    def _submit(self, fn, args, kwargs, cancel=None, deadline=None):
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                future = Future()
+                future.set_exception(ExecutorSaturated(f"{self.name} executor saturated ({self._pending} tasks)"))
+                return future
+            self._pending += 1
+            self._stats["submitted"] += 1
+            self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+        future = self._executor.submit(self._run, fn, args, kwargs, cancel, deadline)
+
+        def on_done(f):
+            if f.cancelled():
+                # Cancelled before it started, so _run never released its slot
+                with self._lock:
+                    self._pending -= 1
+                    self._stats["cancelled"] += 1
+
+        future.add_done_callback(on_done)
+        return future
+
+    def submit(self, fn, *args, **kwargs):
+        return self._submit(fn, args, kwargs)
+
+    def spawn(self, call, cancel=None, deadline=None):
+        """Submit a zero-arg call that sees `cancel` (an Event) and `deadline` (monotonic) via cancelled()/remaining()"""
+        return self._submit(call, (), {}, cancel, deadline)
+
+    def gather(self, calls, timeout, default=list):
+        """
+        Run `calls` ({name: zero-arg callable}) concurrently for at most
+        `timeout` seconds. Returns (results, missing): results maps every name
+        to its value, or to default() if the call failed or missed the
+        deadline; missing lists the names that missed it.
+        """
+        deadline = time.monotonic() + timeout
+        cancel = threading.Event()
+        futures = {name: self._submit(call, (), {}, cancel, deadline) for name, call in calls.items()}
+        wait(futures.values(), timeout=timeout)
+        cancel.set()
+        results, missing = {}, []
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                self._count("abandoned")
+                missing.append(name)
+                print(f"⏱️ {self.name}: {name} missed its {timeout:g}s deadline")
+                results[name] = default()
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"❌ {self.name}: {name} failed: {e}")
+                results[name] = default()
+        return results, missing
+
+    def map(self, fn, items, timeout, default=None):
+        """fn(item) for every item, in order, within `timeout` seconds (default for failed or late items)"""
+        items = list(items)
+        results, _ = self.gather({i: (lambda item=item: fn(item)) for i, item in enumerate(items)},
+                                 timeout, default=lambda: default)
+        return [results[i] for i in range(len(items))]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(max_workers=self.max_workers, max_queue=self.max_queue, active=self._active,
+                         queued=max(self._pending - self._active, 0),
+                         saturation=round(self._pending / (self.max_workers + self.max_queue), 3))
+        return stats
+
+
+class Executors:
+    """The named executors shared by every request in this process"""
+
+    def __init__(self):
+        self.source_fetch = BoundedExecutor("source_fetch", max_workers=16, max_queue=64)
+        self.llm = BoundedExecutor("llm", max_workers=8, max_queue=32)
+        self.enrichment = BoundedExecutor("enrichment", max_workers=8, max_queue=32)
+        # Sub-requests of one source (result pages, query variants, Reddit comment trees). They are submitted
+        # from source_fetch tasks, so they need their own workers: a source_fetch task waiting on source_fetch
+        # could starve it
+        self.page_fetch = BoundedExecutor("page_fetch", max_workers=16, max_queue=64)
+        # Background feed crawls: few workers, so crawling never eats the upstream budgets of live requests
+        self.crawl = BoundedExecutor("crawl", max_workers=4, max_queue=256)
+
+    def stats(self):
+        return {name: executor.stats() for name, executor in vars(self).items()}
+
+
+# Create singleton instance
+executors = Executors()
@@ -0,0 +1,218 @@
+import atexit
+import os
+import platform
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+from circuit_breakers import circuit_breakers
+
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:  # Selenium Manager (selenium>=4.6) can locate chromedriver itself
+    ChromeDriverManager = None
+
+BROWSER_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "3"))
+BROWSER_MAX_USES = int(os.getenv("BROWSER_MAX_USES", "50"))  # leases before a browser is recycled
+BROWSER_ACQUIRE_TIMEOUT = 120
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def _chrome_options():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-extensions")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    return options
+
+
+class BrowserLease:
+    """A pooled Chrome handed out for one scrape; use `.driver` inside the lease's own tab"""
+
+    def __init__(self, driver, base_handle):
+        self.driver = driver
+        self.base_handle = base_handle
+        self.uses = 0
+        self.created_at = time.time()
+        self.leased_at = None
+
+
+class BrowserPool:
+    """
+    Bounded, process-wide pool of warm headless Chrome instances shared by
+    every Selenium-based source.
+
+    At most `size` browsers are alive at once; callers beyond that queue until
+    one is returned. chromedriver is resolved once per process instead of per
+    request. Each lease works in a fresh tab that is closed (and cookies
+    cleared) on release, browsers that fail a health check are replaced, and a
+    browser is recycled after `max_uses` leases to cap Chrome's memory growth.
+    """
+
+    def __init__(self, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES, acquire_timeout=BROWSER_ACQUIRE_TIMEOUT):
+        self.size = size
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        self._idle = []
+        self._live = 0
+        self._waiting = 0
+        self._driver_path = None
+        self._install_lock = threading.Lock()
+        self._stats = {
+            "leases": 0, "created": 0, "recycled": 0, "unhealthy": 0, "launch_failures": 0,
+            "max_waiting": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0,
+        }
+
+    def _service(self):
+        if ChromeDriverManager is None:
+            return Service()
+        with self._install_lock:
+            if self._driver_path is None:
+                driver_path = ChromeDriverManager().install()
+                # On Windows webdriver_manager can hand back the THIRD_PARTY_NOTICES file instead of chromedriver.exe
+                if platform.system() == "Windows" and "THIRD_PARTY_NOTICES" in driver_path:
+                    cache_dir = os.path.expanduser("~/.wdm")
+                    if os.path.exists(cache_dir):
+                        shutil.rmtree(cache_dir)
+                    driver_path = ChromeDriverManager().install()
+                self._driver_path = driver_path
+        return Service(self._driver_path)
+
+    def _launch(self):
+        driver = webdriver.Chrome(service=self._service(), options=_chrome_options())
+        with self._cond:
+            self._stats["created"] += 1
+        return BrowserLease(driver, driver.current_window_handle)
+
+    def _healthy(self, lease):
+        try:
+            return lease.base_handle in lease.driver.window_handles
+        except Exception:
+            return False
+
+    def _quit(self, lease):
+        try:
+            lease.driver.quit()
+        except Exception:
+            pass
+
+    def lease(self, timeout=None):
+        """
+        Take a warm browser (launching one if the pool is below its size) and
+        open a fresh tab for the caller. Raises TimeoutError when the pool stays
+        saturated for `timeout` seconds.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.time()
+        deadline = start + timeout
+        with self._cond:
+            self._waiting += 1
+            self._stats["max_waiting"] = max(self._stats["max_waiting"], self._waiting)
+            try:
+                while not self._idle and self._live >= self.size:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        raise TimeoutError("Browser pool saturated; no browser became free in time.")
+                    self._cond.wait(remaining)
+                lease = self._idle.pop() if self._idle else None
+                if lease is None:
+                    self._live += 1
+            finally:
+                self._waiting -= 1
+            waited = time.time() - start
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+
+        try:
+            if lease is not None and not self._healthy(lease):
+                with self._cond:
+                    self._stats["unhealthy"] += 1
+                self._quit(lease)
+                lease = None
+            if lease is None:
+                # A broken ChromeDriver install fails fast instead of every caller retrying the launch
+                lease = circuit_breakers.call("chromedriver", self._launch)
+            lease.driver.switch_to.new_window("tab")
+        except Exception:
+            if lease is not None:
+                self._quit(lease)
+            with self._cond:
+                self._live -= 1
+                self._stats["launch_failures"] += 1
+                self._cond.notify()
+            raise
+        lease.uses += 1
+        lease.leased_at = time.time()
+        with self._cond:
+            self._stats["leases"] += 1
+        return lease
+
+    def release(self, lease):
+        """Close the lease's tab and return the browser to the pool, or recycle it"""
+        keep = lease.uses < self.max_uses
+        if keep:
+            try:
+                driver = lease.driver
+                for handle in driver.window_handles:
+                    if handle != lease.base_handle:
+                        driver.switch_to.window(handle)
+                        driver.close()
+                driver.switch_to.window(lease.base_handle)
+                # delete_all_cookies() only reaches the current (about:blank) origin; CDP clears every site's
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            except Exception:
+                keep = False
+        if not keep:
+            self._quit(lease)
+        with self._cond:
+            if keep:
+                self._idle.append(lease)
+            else:
+                self._live -= 1
+                self._stats["recycled"] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """`with browser_pool.driver() as driver:` leases a browser tab for the block"""
+        lease = self.lease(timeout)
+        try:
+            yield lease.driver
+        finally:
+            self.release(lease)
+
+    def shutdown(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+        for lease in idle:
+            self._quit(lease)
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                size=self.size,
+                live=self._live,
+                idle=len(self._idle),
+                leased=self._live - len(self._idle),
+                waiting=self._waiting,
+            )
+        stats["avg_wait_seconds"] = round(stats["total_wait_seconds"] / stats["leases"], 3) if stats["leases"] else 0.0
+        stats["total_wait_seconds"] = round(stats["total_wait_seconds"], 3)
+        stats["max_wait_seconds"] = round(stats["max_wait_seconds"], 3)
+        return stats
+
+
+# Create singleton instance
+browser_pool = BrowserPool()
+atexit.register(browser_pool.shutdown)
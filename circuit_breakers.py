@@ -0,0 +1,177 @@
+import threading
+import time
+
+from diskcache import Cache
+
+CIRCUIT_STATE_DIR = "radargpt_cache"  # shared by every gunicorn worker
+WINDOW_CALLS = 20  # outcomes considered per source
+WINDOW_SECONDS = 600  # ... and only from this recent
+MIN_CALLS = 5  # fewer outcomes than this never open a circuit
+ERROR_THRESHOLD = 0.5  # failure share (slow calls included) that opens a circuit
+SLOW_CALL_SECONDS = {"complaintsboard": 30, "producthunt": 30, "chromedriver": 60}
+DEFAULT_SLOW_CALL_SECONDS = 20
+OPEN_COOLDOWN = 60  # first wait before a half-open probe; doubles after every failed probe
+MAX_OPEN_COOLDOWN = 900
+PROBE_LEASE_TTL = 120
+PROBE_INTERVAL = 30
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling a source whose circuit is open"""
+
+
+class CircuitBreakers:
+    """
+    Per-source circuit breakers, shared across gunicorn workers through the
+    diskcache directory.
+
+    Each source keeps its last WINDOW_CALLS outcomes. Calls slower than the
+    source's SLOW_CALL_SECONDS count as failures. Once at least MIN_CALLS
+    recent outcomes are ERROR_THRESHOLD failures, the circuit opens and
+    callers skip the source instantly. After the cooldown it is half-open:
+    one caller (or the background prober, if the source has a probe) gets a
+    lease to try it. Success closes the circuit; failure reopens it with
+    twice the cooldown.
+    """
+
+    def __init__(self, directory=CIRCUIT_STATE_DIR):
+        self.cache = Cache(directory)
+        self._lock = threading.Lock()
+        self._probes = {}
+        self._sources = set()
+        self._thread = None
+
+    def _key(self, source):
+        return f"circuit_{source}"
+
+    def _load(self, source):
+        with self._lock:
+            self._sources.add(source)
+        return self.cache.get(self._key(source)) or {"state": CLOSED, "outcomes": [], "opened_at": None,
+                                                     "cooldown": OPEN_COOLDOWN}
+
+    def state(self, source):
+        circuit = self._load(source)
+        if circuit["state"] == OPEN and time.time() >= circuit["opened_at"] + circuit["cooldown"]:
+            return HALF_OPEN
+        return circuit["state"]
+
+    def allow(self, source):
+        """Whether a call to `source` may go ahead now (a half-open circuit admits one probe at a time)"""
+        state = self.state(source)
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN:
+            return self.cache.add(f"circuit_probe_{source}", time.time(), expire=PROBE_LEASE_TTL)
+        return False
+
+    def record(self, source, ok, latency=0.0):
+        """Feed one call outcome; slow successes count as failures"""
+        ok = ok and latency <= SLOW_CALL_SECONDS.get(source, DEFAULT_SLOW_CALL_SECONDS)
+        now = time.time()
+        key = self._key(source)
+        with self.cache.transact():
+            circuit = self._load(source)
+            outcomes = [o for o in circuit["outcomes"] if o[0] >= now - WINDOW_SECONDS]
+            outcomes = (outcomes + [(now, ok, round(latency, 3))])[-WINDOW_CALLS:]
+            circuit["outcomes"] = outcomes
+            was_open = circuit["state"] == OPEN
+            if was_open:
+                if ok:
+                    circuit.update(state=CLOSED, outcomes=[], opened_at=None, cooldown=OPEN_COOLDOWN)
+                    print(f"✅ Circuit for {source} closed")
+                else:
+                    circuit.update(opened_at=now, cooldown=min(circuit["cooldown"] * 2, MAX_OPEN_COOLDOWN))
+            else:
+                failures = sum(1 for o in outcomes if not o[1])
+                if len(outcomes) >= MIN_CALLS and failures / len(outcomes) >= ERROR_THRESHOLD:
+                    circuit.update(state=OPEN, opened_at=now, cooldown=OPEN_COOLDOWN)
+                    print(f"⚠️ Circuit for {source} opened ({failures}/{len(outcomes)} recent calls failed)")
+            self.cache.set(key, circuit)
+        if was_open:
+            self.cache.delete(f"circuit_probe_{source}")
+
+    def call(self, source, fn, fallback=None):
+        """
+        fn() through `source`'s breaker. When the circuit is open, returns
+        fallback() if given, otherwise raises CircuitOpen.
+        """
+        if not self.allow(source):
+            if fallback is not None:
+                return fallback()
+            raise CircuitOpen(f"{source} is temporarily unavailable (circuit open)")
+        start = time.time()
+        try:
+            result = fn()
+        except Exception:
+            self.record(source, False, time.time() - start)
+            raise
+        self.record(source, True, time.time() - start)
+        return result
+
+    def register_probe(self, source, probe):
+        """probe() is run in the background when `source` turns half-open; raising means still broken"""
+        with self._lock:
+            self._probes[source] = probe
+            self._sources.add(source)
+
+    def probe_once(self):
+        with self._lock:
+            probes = dict(self._probes)
+        for source, probe in probes.items():
+            if self.state(source) != HALF_OPEN:
+                continue
+            try:
+                self.call(source, probe)
+            except CircuitOpen:
+                pass  # another worker holds the probe lease
+            except Exception as e:
+                print(f"❌ Probe for {source} failed: {e}")
+
+    def _run(self):
+        while True:
+            time.sleep(PROBE_INTERVAL)
+            try:
+                self.probe_once()
+            except Exception as e:
+                print(f"❌ Circuit prober error: {e}")
+
+    def start(self):
+        """Start the background prober (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="circuit-prober", daemon=True)
+        self._thread.start()
+
+    def health(self, source):
+        """State plus a 0-1 health score: success rate, halved when p90 latency is slow, 0 while open"""
+        circuit = self._load(source)
+        state = self.state(source)
+        outcomes = circuit["outcomes"]
+        latencies = sorted(o[2] for o in outcomes)
+        success_rate = sum(1 for o in outcomes if o[1]) / len(outcomes) if outcomes else 1.0
+        p90 = latencies[min(int(0.9 * len(latencies)), len(latencies) - 1)] if latencies else 0.0
+        score = success_rate * (0.5 if p90 > SLOW_CALL_SECONDS.get(source, DEFAULT_SLOW_CALL_SECONDS) / 2 else 1.0)
+        return {
+            "state": state,
+            "health": 0.0 if state == OPEN else round(score, 3),
+            "recent_calls": len(outcomes),
+            "error_rate": round(1 - success_rate, 3),
+            "p90_latency_seconds": p90,
+            "opened_at": circuit["opened_at"],
+            "retry_in_seconds": (max(round(circuit["opened_at"] + circuit["cooldown"] - time.time(), 1), 0)
+                                 if circuit["state"] == OPEN else None),
+            "probe": source in self._probes,
+        }
+
+    def stats(self):
+        with self._lock:
+            sources = sorted(self._sources)
+        return {source: self.health(source) for source in sources}
+
+
+# Create singleton instance
+circuit_breakers = CircuitBreakers()
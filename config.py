@@ -43,6 +43,8 @@ EMOTIONAL_KEYWORDS = {
 CACHE_SETTINGS = {
     'reddit': 3600,  # 1 hour
     'stackoverflow': 3600,
+    'stackoverflow_question': 86400,  # per question id; bodies rarely change
+    'stackoverflow_closed_question': 30 * 86400,
     'complaintsboard': 3600,
     'trends': 3600,
     'summaries': 86400  # 24 hours
@@ -0,0 +1,144 @@
+import math
+import os
+import re
+from collections import Counter
+
+from rate_limits import CHARS_PER_TOKEN, estimate_tokens
+
+# Largest request (prompt + max_tokens) each model accepts without a 413; Groq's free tier caps a request at the key's TPM
+MODEL_REQUEST_TOKENS = {
+    "llama-3.1-8b-instant": int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000")),
+    "llama-3.3-70b-versatile": 12000,
+    "mistralai/devstral-small-2505:free": 32000,
+}
+DEFAULT_REQUEST_TOKENS = 6000
+MAX_ITEM_TOKENS = 300  # one item's text is cut to this many tokens before packing
+MIN_ITEM_TOKENS = 40  # a truncated item shorter than this is not worth its citation
+NEAR_DUPLICATE_JACCARD = 0.8
+# One-permutation MinHash banding: items share a bucket when any band of LSH_ROWS values matches, and only
+# bucket-mates get the exact Jaccard check. Pairs at NEAR_DUPLICATE_JACCARD meet in some band ~98% of the time
+LSH_BANDS = 8
+LSH_ROWS = 4
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_STOPWORDS = set("""
+a an and are as at be but by for from has have i if in is it its of on or so that the this to was were will with
+you your we our they their he she them my me not no do does did can just about into than then there these those
+""".split())
+_QUERY_OPERATORS = {"or", "and", "not"}
+
+
+def tokenize(text):
+    """Lowercased word tokens without stopwords"""
+    return [t for t in re.findall(r"\w+", (text or "").lower()) if t not in _STOPWORDS]
+
+
+def request_budget(model):
+    return MODEL_REQUEST_TOKENS.get(model, DEFAULT_REQUEST_TOKENS)
+
+
+def prompt_budget(model, max_tokens, *fixed_text):
+    """Tokens left for packed context once the completion and the prompt's fixed text are accounted for"""
+    return max(request_budget(model) - max_tokens - sum(estimate_tokens(text) for text in fixed_text), 0)
+
+
+def _shingles(tokens):
+    return {tuple(tokens[i:i + 3]) for i in range(max(len(tokens) - 2, 1))}
+
+
+def _bands(shingles):
+    """
+    LSH band keys of a shingle set. An empty MinHash bin is part of its
+    band's key (near-duplicates leave the same bins empty); all-empty bands
+    are left out, and a text with only those is keyed by its exact shingle set.
+    """
+    bins = [None] * (LSH_BANDS * LSH_ROWS)
+    for shingle in shingles:
+        h = hash(shingle) & 0xFFFFFFFFFFFFFFFF
+        slot, value = h % len(bins), h // len(bins)
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    bands = [tuple(bins[b * LSH_ROWS:(b + 1) * LSH_ROWS]) for b in range(LSH_BANDS)]
+    return ([(b, band) for b, band in enumerate(bands) if any(value is not None for value in band)]
+            or [("exact", frozenset(shingles))])
+
+
+def _bm25(query_terms, docs):
+    """BM25 score of every tokenized doc in `docs` for `query_terms`"""
+    if not query_terms or not docs:
+        return [0.0] * len(docs)
+    avg_len = sum(len(doc) for doc in docs) / len(docs) or 1.0
+    df = Counter(term for doc in docs for term in set(doc))
+    scores = []
+    for doc in docs:
+        tf = Counter(doc)
+        score = 0.0
+        for term in query_terms:
+            if not tf[term]:
+                continue
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (BM25_K1 + 1) / (tf[term] + BM25_K1 * (1 - BM25_B + BM25_B * len(doc) / avg_len))
+        scores.append(score)
+    return scores
+
+
+def count_tokens(text):
+    """Local token estimate for a piece of a prompt (no per-message overhead)"""
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN))
+
+
+def _truncate(text, tokens):
+    limit = tokens * CHARS_PER_TOKEN
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def pack(items, query, budget, render, text_of=lambda item: item.get("text", ""),
+         title_of=lambda item: item.get("title", ""), max_item_tokens=MAX_ITEM_TOKENS):
+    """
+    Choose the items of `items` that best fit `budget` prompt tokens.
+
+    Items are ranked by BM25 relevance of title + text to `query` (titles
+    count twice). Source order breaks ties, so with no query the first items
+    win. Near-duplicates of an item already chosen (found through MinHash
+    LSH buckets, then confirmed by exact shingle Jaccard) are dropped; items
+    with no text are never treated as duplicates. Each item's
+    text is cut to `max_item_tokens`; the last one that fits may be cut
+    shorter. render(n, item, text) gives the prompt block for one item, where
+    n is the item's 1-based position in `items`. That keeps [n] citations
+    pointing at the caller's full list.
+    Returns [(n, item, text, block)] in citation order.
+    """
+    query_terms = list(dict.fromkeys(t for t in tokenize(query) if t not in _QUERY_OPERATORS))
+    docs = [tokenize(title_of(item)) * 2 + tokenize(text_of(item)) for item in items]
+    scores = _bm25(query_terms, docs)
+    ranked = sorted(range(len(items)), key=lambda i: (-scores[i], i))
+
+    chosen, kept_shingles, buckets, used = [], [], {}, 0
+    for i in ranked:
+        if budget - used < MIN_ITEM_TOKENS:
+            break
+        shingles = _shingles(docs[i]) if docs[i] else None
+        bands = _bands(shingles) if shingles else []
+        candidates = {k for band in bands for k in buckets.get(band, ())}
+        if any(len(shingles & kept_shingles[k]) / len(shingles | kept_shingles[k]) >= NEAR_DUPLICATE_JACCARD
+               for k in candidates):
+            continue
+        text = _truncate(text_of(items[i]) or "", max_item_tokens)
+        block = render(i + 1, items[i], text)
+        cost = count_tokens(block)
+        if used + cost > budget:
+            room = budget - used - count_tokens(block[:len(block) - len(text)]) - 1
+            if room < MIN_ITEM_TOKENS:
+                continue
+            text = _truncate(text, room)
+            block = render(i + 1, items[i], text)
+            cost = count_tokens(block)
+            if used + cost > budget:
+                continue
+        chosen.append((i + 1, items[i], text, block))
+        for band in bands:
+            buckets.setdefault(band, []).append(len(kept_shingles))
+        kept_shingles.append(shingles)
+        used += cost
+    return sorted(chosen, key=lambda entry: entry[0])
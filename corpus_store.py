@@ -0,0 +1,287 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Beside the app (and its radargpt_cache directory) rather than in whatever directory the process started in
+CORPUS_DB_PATH = os.getenv("CORPUS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "radargpt_corpus.db"))
+CORPUS_MAX_AGE = 6 * 3600  # local items fetched more recently than this can answer a search
+MIN_LOCAL_RESULTS = 10  # fewer local matches than this goes upstream for the gap
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    text TEXT,
+    score REAL,
+    published_at REAL,
+    fetched_at REAL NOT NULL,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS items_source_fetched ON items (source, fetched_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(title, text, content='items', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+    INSERT INTO items_fts (items_fts, rowid, title, text) VALUES ('delete', old.rowid, old.title, old.text);
+    INSERT INTO items_fts (rowid, title, text) VALUES (new.rowid, new.title, new.text);
+END;
+CREATE TABLE IF NOT EXISTS feed_items (
+    feed TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    PRIMARY KEY (feed, item_id)
+);
+CREATE INDEX IF NOT EXISTS feed_items_recent ON feed_items (feed, published_at);
+CREATE TABLE IF NOT EXISTS feed_marks (
+    feed TEXT PRIMARY KEY,
+    high_water REAL,
+    crawled_at REAL
+);
+"""
+
+_UPSERT = """
+INSERT INTO items (id, source, url, title, text, score, published_at, fetched_at, extra)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    title = excluded.title,
+    text = CASE WHEN length(excluded.text) >= length(coalesce(items.text, '')) THEN excluded.text ELSE items.text END,
+    score = coalesce(excluded.score, items.score),
+    published_at = coalesce(excluded.published_at, items.published_at),
+    fetched_at = excluded.fetched_at,
+    extra = CASE WHEN excluded.extra IS NULL OR items.extra IS NULL THEN coalesce(excluded.extra, items.extra)
+                 ELSE json_patch(items.extra, excluded.extra) END
+"""
+
+_QUERY_OPERATORS = {"or", "and", "not", "near"}
+
+
+def canonical_url(url):
+    """Scheme/host lowercased, "www." prefix, fragment, tracking params and trailing slash dropped"""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not k.startswith("utm_")])
+    path = parts.path.rstrip("/") or "/"
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def epoch_seconds(value):
+    """Epoch seconds from an epoch number or an ISO 8601 string ("2025-05-19T08:00:00Z"); None if unparseable"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) if value > 0 else None
+    if isinstance(value, str) and value:
+        try:
+            moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)).timestamp()
+    return None
+
+
+def item_id(source, url, title=""):
+    """Corpus key: hash of the canonical URL (source + title for items without one)"""
+    key = canonical_url(url) if url else f"{source}:{title.strip().lower()}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def match_expression(query):
+    """FTS5 MATCH expression requiring every word of `query` (boolean operators and punctuation dropped)"""
+    terms = [t for t in re.findall(r"\w+", query.lower()) if t not in _QUERY_OPERATORS]
+    return " ".join(f'"{t}"' for t in dict.fromkeys(terms))
+
+
+class CorpusStore:
+    """
+    Local corpus of every item fetched from Reddit, Stack Overflow, News and
+    ComplaintsBoard, in SQLite with an FTS5 index over title and text.
+
+    Items are upserted under a hash of their canonical URL, so re-fetching
+    a post refreshes it instead of duplicating it. Each stored item keeps
+    its source-specific fields (comments, descriptions, ...) as JSON.
+    search_or_fetch() answers a keyword search from the local index when it
+    has enough recently fetched matches. Only when it does not does it call
+    the upstream fetcher, for the missing results only, storing them for
+    the next search.
+    """
+
+    def __init__(self, path=CORPUS_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "upstream_fetches": 0, "upserted": 0}
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, outcome, n=1):
+        with self._lock:
+            self._stats[outcome] += n
+
+    def upsert(self, source, items, feed=None):
+        """
+        Store items for `source`. Each item is a dict with url, title, text
+        and optional score, published_at (epoch seconds) and extra (dict).
+        With `feed` (e.g. "reddit:startups") the items are also filed under
+        that crawl feed, keeping the time each was first seen if undated.
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            url = item.get("url") or ""
+            title = item.get("title") or ""
+            if not (url or title):
+                continue
+            extra = item.get("extra")
+            rows.append((
+                item_id(source, url, title), source, url, title, item.get("text") or "",
+                item.get("score"), item.get("published_at"), now,
+                json.dumps(extra, default=str) if extra is not None else None,
+            ))
+        if rows:
+            with self._conn() as conn:
+                conn.executemany(_UPSERT, rows)
+                if feed:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO feed_items (feed, item_id, published_at) VALUES (?, ?, ?)",
+                        [(feed, row[0], row[6] if row[6] is not None else now) for row in rows]
+                    )
+            self._count("upserted", len(rows))
+        return len(rows)
+
+    def high_water(self, feed):
+        """Newest item timestamp seen for a crawl feed, or None if it was never crawled"""
+        row = self._conn().execute("SELECT high_water FROM feed_marks WHERE feed = ?", (feed,)).fetchone()
+        return row["high_water"] if row else None
+
+    def set_high_water(self, feed, high_water):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO feed_marks (feed, high_water, crawled_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (feed) DO UPDATE SET high_water = max(excluded.high_water, coalesce(feed_marks.high_water, 0)), "
+                "crawled_at = excluded.crawled_at",
+                (feed, high_water, time.time())
+            )
+
+    def recent(self, feeds, since, per_feed_limit=None):
+        """Items filed under `feeds` since `since`, newest first, at most `per_feed_limit` per feed"""
+        if not feeds:
+            return []
+        placeholders = ", ".join("?" for _ in feeds)
+        params = list(feeds) + [since]
+        sql = (
+            "SELECT * FROM ("
+            " SELECT items.*, feed_items.feed AS feed, feed_items.published_at AS seen_at,"
+            " ROW_NUMBER() OVER (PARTITION BY feed_items.feed ORDER BY feed_items.published_at DESC) AS position"
+            " FROM feed_items JOIN items ON items.id = feed_items.item_id"
+            f" WHERE feed_items.feed IN ({placeholders}) AND feed_items.published_at >= ?"
+            ")"
+        )
+        if per_feed_limit is not None:
+            sql += " WHERE position <= ?"
+            params.append(per_feed_limit)
+        sql += " ORDER BY seen_at DESC"
+        results = []
+        for row in self._conn().execute(sql, params).fetchall():
+            result = dict(row)
+            result["extra"] = json.loads(result["extra"]) if result["extra"] else {}
+            results.append(result)
+        return results
+
+    def search(self, query, source=None, limit=50, max_age=None, since=None):
+        """
+        Best BM25 matches for every word of `query`, newest fetches only when
+        `max_age` is given. With `since` only items published at or after it
+        match; undated items are left out.
+        """
+        expression = match_expression(query)
+        if not expression:
+            return []
+        sql = ("SELECT items.*, bm25(items_fts) AS rank FROM items_fts "
+               "JOIN items ON items.rowid = items_fts.rowid WHERE items_fts MATCH ?")
+        params = [expression]
+        if source:
+            sql += " AND items.source = ?"
+            params.append(source)
+        if max_age is not None:
+            sql += " AND items.fetched_at >= ?"
+            params.append(time.time() - max_age)
+        if since is not None:
+            sql += " AND items.published_at >= ?"
+            params.append(since)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        try:
+            rows = self._conn().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"❌ Corpus search error: {e}")
+            return []
+        results = []
+        for row in rows:
+            result = dict(row)
+            result["extra"] = json.loads(result["extra"]) if result["extra"] else {}
+            results.append(result)
+        return results
+
+    def search_or_fetch(self, source, query, fetch, to_item, from_row, limit=50,
+                        min_results=MIN_LOCAL_RESULTS, max_age=CORPUS_MAX_AGE, usable=None, since=None):
+        """
+        Results for `query` in the caller's own shape. Recent local matches
+        answer the search when there are at least `min_results` of them.
+        Otherwise fetch(needed) runs for the gap, `needed` being how many
+        results short of `limit` the usable local matches are, and its results
+        are stored (via to_item) and returned, followed by the local matches. from_row turns a stored
+        row back into the caller's shape. usable(row), if given, says whether
+        a stored row is complete enough to answer the search on its own
+        (e.g. has the comments the caller needs); other rows only follow
+        fetched results. since limits local matches to items published since
+        then, for callers that need a time window rather than relevance alone.
+        """
+        local = self.search(query, source, limit, max_age, since)
+        answers = [row for row in local if usable is None or usable(row)]
+        if len(answers) >= min(min_results, limit):
+            self._count("local_hits")
+            return [from_row(row) for row in answers]
+
+        self._count("upstream_fetches")
+        fetched = fetch(limit - len(answers)) or []
+        items = [to_item(result) for result in fetched]
+        self.upsert(source, items)
+        seen = {item_id(source, item.get("url") or "", item.get("title") or "") for item in items}
+        extra = [from_row(row) for row in local if row["id"] not in seen]
+        return (list(fetched) + extra)[:max(limit, len(fetched))]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        try:
+            rows = self._conn().execute("SELECT source, COUNT(*) FROM items GROUP BY source").fetchall()
+            stats["items"] = {source: count for source, count in rows}
+        except sqlite3.Error:
+            stats["items"] = {}
+        return stats
+
+
+# Create singleton instance
+corpus_store = CorpusStore()
@@ -3,17 +3,16 @@ import re
 import time
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 import tweepy
-import praw
 import json
 import logging
 from diskcache import Cache
+from browser_pool import browser_pool
+from reddit_access import reddit_access
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,11 +42,7 @@ class DataSourceManager:
                 logger.warning("Reddit API credentials not found or incomplete")
                 return None
                 
-            return praw.Reddit(
-                client_id=client_id,
-                client_secret=client_secret,
-                user_agent=user_agent
-            )
+            return reddit_access.client("data_sources")
         except Exception as e:
             logger.error(f"Failed to initialize Reddit: {e}")
             return None
@@ -179,53 +174,46 @@ class DataSourceManager:
             return result
             
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=options)
-            
-            url = f"https://play.google.com/store/apps/details?id={app_id}&showAllReviews=true"
-            driver.get(url)
+            with browser_pool.driver() as driver:
+                url = f"https://play.google.com/store/apps/details?id={app_id}&showAllReviews=true"
+                driver.get(url)
             
-            # Wait for reviews to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "div[jsname='fk8dgd']"))
-            )
+                # Wait for reviews to load
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "div[jsname='fk8dgd']"))
+                )
             
-            # Scroll to load more reviews
-            for _ in range(5):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
+                # Scroll to load more reviews
+                for _ in range(5):
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+                    time.sleep(1)
             
-            reviews = driver.find_elements(By.CSS_SELECTOR, "div[jsname='fk8dgd']")
-            results = []
+                reviews = driver.find_elements(By.CSS_SELECTOR, "div[jsname='fk8dgd']")
+                results = []
             
-            for review in reviews[:max_reviews]:
-                try:
-                    rating_element = review.find_element(By.CSS_SELECTOR, "div[role='img']")
-                    rating = rating_element.get_attribute("aria-label")
-                    rating = re.search(r"(\d+)", rating).group(1) if rating else "?"
+                for review in reviews[:max_reviews]:
+                    try:
+                        rating_element = review.find_element(By.CSS_SELECTOR, "div[role='img']")
+                        rating = rating_element.get_attribute("aria-label")
+                        rating = re.search(r"(\d+)", rating).group(1) if rating else "?"
                     
-                    author = review.find_element(By.CSS_SELECTOR, "span[class='X43Kjb']").text
-                    date = review.find_element(By.CSS_SELECTOR, "span[class='p2TkOb']").text
-                    content = review.find_element(By.CSS_SELECTOR, "div[class='h3YV2d']").text
+                        author = review.find_element(By.CSS_SELECTOR, "span[class='X43Kjb']").text
+                        date = review.find_element(By.CSS_SELECTOR, "span[class='p2TkOb']").text
+                        content = review.find_element(By.CSS_SELECTOR, "div[class='h3YV2d']").text
                     
-                    results.append({
-                        "author": author,
-                        "date": date,
-                        "rating": rating,
-                        "content": content
-                    })
-                except Exception as e:
-                    continue
+                        results.append({
+                            "author": author,
+                            "date": date,
+                            "rating": rating,
+                            "content": content
+                        })
+                    except Exception as e:
+                        continue
             
-            driver.quit()
             cache.set(cache_key, results, expire=3600)
             return results
         except Exception as e:
             logger.error(f"Error fetching Play Store reviews: {e}")
-            if 'driver' in locals():
-                driver.quit()
             return []
     
     def get_industry_forum_posts(self, forum_url, keyword, max_posts=20):
@@ -236,25 +224,20 @@ class DataSourceManager:
             return result
             
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=options)
-            
-            search_url = f"{forum_url}/search?q={keyword.replace(' ', '+')}"
-            driver.get(search_url)
+            with browser_pool.driver() as driver:
+                search_url = f"{forum_url}/search?q={keyword.replace(' ', '+')}"
+                driver.get(search_url)
             
-            # Wait for search results
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.search-result-link"))
-                )
-            except TimeoutException:
-                driver.quit()
-                return []
+                # Wait for search results
+                try:
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "a.search-result-link"))
+                    )
+                except TimeoutException:
+                    return []
             
-            # Get search results
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+                # Get search results
+                soup = BeautifulSoup(driver.page_source, "html.parser")
             results = []
             
             for result_elem in soup.select("div.search-result")[:max_posts]:
@@ -276,13 +259,10 @@ class DataSourceManager:
                     "excerpt": excerpt_text
                 })
             
-            driver.quit()
             cache.set(cache_key, results, expire=3600)
             return results
         except Exception as e:
             logger.error(f"Error fetching forum posts: {e}")
-            if 'driver' in locals():
-                driver.quit()
             return []
     
     def get_linkedin_posts(self, keyword, max_posts=20):
@@ -3,9 +3,6 @@ import re
 import time
 import requests
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
@@ -13,6 +10,9 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 from diskcache import Cache
 import logging
+from browser_pool import browser_pool
+from reddit_access import reddit_access
+from stackexchange_client import stackexchange
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -37,44 +37,19 @@ class EnhancedDataSources:
         if result is not None:
             return result
             
-        all_results = []
-        url = "https://api.stackexchange.com/2.3/search/advanced"
-        
-        # First get results sorted by relevance
-        for page in range(1, 5):  # Fetch more pages to ensure we have enough data to filter
-            resp = requests.get(url, params={
-                "order": "desc",
-                "sort": "relevance",
-                "q": keyword,
-                "site": "stackoverflow",
-                "page": page,
-                "pagesize": 50,
-                "filter": "withbody"  # Include question body
-            })
-            
-            if resp.status_code != 200:
-                break
-                
-            data = resp.json()
-            items = data.get("items", [])
-            
-            if not items:
-                break
-                
-            all_results.extend([{
-                "title": i.get("title", ""),
-                "link": i.get("link", ""),
-                "score": i.get("score", 0),
-                "view_count": i.get("view_count", 0),
-                "answer_count": i.get("answer_count", 0),
-                "is_answered": i.get("is_answered", False),
-                "body": i.get("body", ""),
-                "creation_date": i.get("creation_date", 0),
-                "tags": i.get("tags", [])
-            } for i in items])
-            
-            if not data.get("has_more", False):
-                break
+        # Fetch more pages to ensure we have enough data to filter (question bodies included)
+        items = stackexchange.search(keyword, pages=4, pagesize=50, body=True)
+        all_results = [{
+            "title": i.get("title", ""),
+            "link": i.get("link", ""),
+            "score": i.get("score", 0),
+            "view_count": i.get("view_count", 0),
+            "answer_count": i.get("answer_count", 0),
+            "is_answered": i.get("is_answered", False),
+            "body": i.get("body", ""),
+            "creation_date": i.get("creation_date", 0),
+            "tags": i.get("tags", [])
+        } for i in items]
         
         # Advanced relevance scoring
         def relevance_score(item):
@@ -132,20 +107,14 @@ class EnhancedDataSources:
         """
         Get the most relevant and insightful Reddit posts with comments
         """
-        import praw
-        
         cache_key = f"reddit_enhanced_{keyword}_{max_results}"
         result = cache.get(cache_key)
         if result is not None:
             return result
             
         try:
-            # Initialize Reddit API
-            reddit = praw.Reddit(
-                client_id=os.getenv("REDDIT_CLIENT_ID"),
-                client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-                user_agent=os.getenv("REDDIT_USER_AGENT")
-            )
+            # Shared Reddit client and request budget
+            reddit = reddit_access.client("enhanced_data_sources")
             
             # Search for submissions
             submissions = list(reddit.subreddit("all").search(keyword, limit=100))
@@ -216,15 +185,8 @@ class EnhancedDataSources:
         cache_key = f"complaintsboard_enhanced_{keyword}_{max_results}"
         cache.delete(cache_key)  # Always get fresh results
         
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        lease = browser_pool.lease()
+        driver = lease.driver
         
         try:
             search_url = f"https://www.complaintsboard.com/?search={keyword.replace(' ', '+')}"
@@ -357,7 +319,7 @@ class EnhancedDataSources:
             return results
             
         finally:
-            driver.quit()
+            browser_pool.release(lease)
 
     def get_enhanced_producthunt(self, keyword, max_results=30):
         """
@@ -366,15 +328,8 @@ class EnhancedDataSources:
         cache_key = f"producthunt_enhanced_{keyword}_{max_results}"
         cache.delete(cache_key)  # Always get fresh results
         
-        options = webdriver.ChromeOptions()
-        options.add_argument("--headless")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-        
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+        lease = browser_pool.lease()
+        driver = lease.driver
         
         try:
             search_url = f"https://www.producthunt.com/search?q={keyword.replace(' ', '+')}"
@@ -479,7 +434,7 @@ class EnhancedDataSources:
             return self._generate_fallback_producthunt(keyword, max_results)
             
         finally:
-            driver.quit()
+            browser_pool.release(lease)
     
     def _generate_fallback_producthunt(self, keyword, count=30):
         """Generate fallback ProductHunt products when scraping fails"""
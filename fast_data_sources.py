@@ -3,6 +3,7 @@ import requests
 from bs4 import BeautifulSoup
 from diskcache import Cache
 import logging
+from stackexchange_client import stackexchange
 import time
 import random
 
@@ -28,21 +29,7 @@ class FastDataSources:
             
         try:
             # Single API call with efficient parameters
-            url = "https://api.stackexchange.com/2.3/search/advanced"
-            resp = requests.get(url, params={
-                "order": "desc",
-                "sort": "relevance",
-                "q": keyword,
-                "site": "stackoverflow",
-                "pagesize": max_results,
-                "filter": "withbody"
-            }, timeout=5)
-            
-            if resp.status_code != 200:
-                return []
-                
-            data = resp.json()
-            items = data.get("items", [])
+            items = stackexchange.search(keyword, pagesize=max_results, body=True, timeout=5)
             
             # Format results
             results = []
@@ -0,0 +1,200 @@
+import heapq
+import itertools
+import threading
+import time
+
+
+class KeyLease:
+    """A Groq key handed out by the scheduler for one request"""
+
+    def __init__(self, key, org, waited, cost=0):
+        self.key = key
+        self.org = org
+        self.waited = waited
+        self.cost = cost
+        self.acquired_at = time.time()
+
+
+class GroqKeyScheduler:
+    """
+    Hands out Groq API keys in the order they become ready.
+
+    Keys live in a min-heap ordered by their ready-at time (per-key cooldown
+    after each use, or the expiry of a rate-limit / invalid-key timeout).
+    try_acquire() never blocks: it leases the earliest ready key or says how
+    long until one may be ready, so a waiter (the LLM gateway) sleeps exactly
+    that long. Listeners registered with subscribe() are also called whenever
+    a key is released or its ready-at time moves, so waiters wake as soon as
+    a key comes back instead of polling.
+
+    When a `limiter` (rate_limits.KeyRateLimiter) is given, a key that reaches
+    the top of the heap must also have room in its request/token buckets for
+    the caller's estimated cost; otherwise it is pushed back to the time its
+    buckets will have refilled.
+    """
+
+    def __init__(self, key_groups, request_delay=0.5, rate_limit_timeout=300, invalid_key_timeout=3600,
+                 limiter=None):
+        self.request_delay = request_delay
+        self.limiter = limiter
+        self.rate_limit_timeout = rate_limit_timeout
+        self.invalid_key_timeout = invalid_key_timeout
+
+        self._lock = threading.Lock()
+        self._heap = []
+        self._entries = {}  # key -> live heap entry, older entries are stale
+        self._listeners = []
+        self._seq = itertools.count()
+
+        self._org_of = {}
+        self._failed = {}  # key -> (ready_at, error_type)
+        self._uses = {}
+        self._in_flight = {}
+        self._busy_seconds = {}
+
+        self._started_at = time.time()
+        self._acquisitions = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+        for org_idx, group in enumerate(key_groups):
+            for key in group:
+                if not key or key in self._org_of:
+                    continue
+                self._org_of[key] = f"Org {org_idx + 1}"
+                self._uses[key] = 0
+                self._in_flight[key] = 0
+                self._busy_seconds[key] = 0.0
+                self._push(key, 0)
+
+    @property
+    def keys(self):
+        return list(self._org_of)
+
+    def _push(self, key, ready_at):
+        entry = [ready_at, next(self._seq), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _peek(self):
+        """Return the live entry with the earliest ready-at time, dropping stale ones"""
+        while self._heap and self._entries.get(self._heap[0][2]) is not self._heap[0]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    def subscribe(self, listener):
+        """Call `listener()` (from any thread; it must not block) whenever a key may have become ready"""
+        self._listeners.append(listener)
+
+    def _notify(self):
+        for listener in self._listeners:
+            listener()
+
+    def try_acquire(self, cost=0):
+        """
+        Lease the earliest ready key that (with a limiter) can afford `cost`
+        tokens, without blocking; callers do their own waiting (the asyncio
+        gateway). Returns (lease, 0) or (None, seconds until a key may be ready).
+        """
+        with self._lock:
+            if not self._org_of:
+                raise RuntimeError("No Groq API keys configured.")
+            return self._take_ready(time.time(), cost)
+
+    def _take_ready(self, start, cost):
+        """Lease the earliest ready key; returns (lease, 0) or (None, seconds until the next key is ready)"""
+        while True:
+            now = time.time()
+            entry = self._peek()
+            if entry[0] > now:
+                return None, entry[0] - now
+            key = entry[2]
+            heapq.heappop(self._heap)
+            if self.limiter is not None:
+                refill_in = self.limiter.reserve(key, cost)
+                if refill_in > 0:
+                    self._push(key, now + refill_in)
+                    continue
+            self._failed.pop(key, None)
+            self._push(key, now + self.request_delay)
+            self._uses[key] += 1
+            self._in_flight[key] += 1
+            waited = now - start
+            self._acquisitions += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            return KeyLease(key, self._org_of[key], waited, cost), 0.0
+
+    def release(self, lease, error_type=None):
+        """Return a leased key, benching it if the request failed on that key"""
+        with self._lock:
+            key = lease.key
+            self._in_flight[key] = max(self._in_flight[key] - 1, 0)
+            self._busy_seconds[key] += time.time() - lease.acquired_at
+        if error_type:
+            self.mark_failed(key, error_type)
+        else:
+            self._notify()
+
+    def mark_failed(self, key, error_type='unknown'):
+        """Push a key's ready-at time out according to the kind of failure"""
+        if error_type == 'rate_limit':
+            timeout = self.rate_limit_timeout
+        elif error_type == 'invalid_key':
+            timeout = self.invalid_key_timeout
+        else:
+            timeout = 60
+        self.defer(key, time.time() + timeout, error_type)
+
+    def defer(self, key, ready_at, error_type=None):
+        """Move a key's ready-at time to `ready_at` (earlier or later)"""
+        with self._lock:
+            if key not in self._org_of:
+                return
+            if error_type:
+                self._failed[key] = (ready_at, error_type)
+            else:
+                self._failed.pop(key, None)
+            self._push(key, ready_at)
+        self._notify()
+
+    def available(self, cost=0, within=0.0):
+        """Keys that are not benched and could serve a `cost`-token request within `within` seconds"""
+        with self._lock:
+            horizon = time.time() + within
+            keys = [key for key in self._org_of
+                    if self._entries[key][0] <= horizon
+                    and not (key in self._failed and self._failed[key][0] > horizon)]
+        if self.limiter is None:
+            return len(keys)
+        return sum(1 for key in keys if self.limiter.ready_in(key, cost) <= within)
+
+    def status(self):
+        """Snapshot of key availability, wait times and key utilisation"""
+        with self._lock:
+            now = time.time()
+            elapsed = max(now - self._started_at, 1e-6)
+            ready, cooling, rate_limited, failed = [], [], [], []
+            for key, org in self._org_of.items():
+                label = f"{key[:6]}... ({org})"
+                failure = self._failed.get(key)
+                if failure and failure[0] > now:
+                    (rate_limited if failure[1] == 'rate_limit' else failed).append(label)
+                elif self._entries[key][0] > now:
+                    cooling.append(label)
+                else:
+                    ready.append(label)
+            total_busy = sum(self._busy_seconds.values())
+            return {
+                "keys": len(self._org_of),
+                "ready": ready,
+                "cooling_down": cooling,
+                "rate_limited": rate_limited,
+                "failed": failed,
+                "in_flight": sum(self._in_flight.values()),
+                "acquisitions": self._acquisitions,
+                "avg_wait_seconds": round(self._total_wait / self._acquisitions, 4) if self._acquisitions else 0.0,
+                "max_wait_seconds": round(self._max_wait, 4),
+                "utilisation": round(total_busy / (elapsed * len(self._org_of)), 4) if self._org_of else 0.0,
+                "uses_per_key": {f"{key[:6]}...": uses for key, uses in self._uses.items()},
+            }
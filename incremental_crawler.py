@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+import uuid
+
+from bs4 import BeautifulSoup
+from diskcache import Cache
+
+from bounded_executors import executors
+from config import PERSONA_SOURCES
+from corpus_store import corpus_store
+from reddit_access import reddit_access, PRIORITY_BACKGROUND
+from stackexchange_client import stackexchange
+
+CRAWL_INTERVAL = int(os.getenv("CRAWL_INTERVAL", "300"))  # seconds between ticks
+CRAWL_TIMEOUT = 240  # one round of feed crawls; feeds still running are skipped until the next tick
+CRAWL_LEASE_DIR = "radargpt_cache"  # shared by every gunicorn worker
+CRAWL_LEASE_KEY = "incremental_crawler_tick"
+REDDIT_NEW_LIMIT = 100  # newest posts read per subreddit per tick
+STACKOVERFLOW_MAX_PAGES = 3
+COMPLAINTSBOARD_CRAWL_PAGES = 2
+SCORE_REFRESH_WINDOW = 3 * 86400  # recent Reddit posts whose score/comment counts are re-read each tick
+SCORE_REFRESH_MAX = 2000
+
+
+def reddit_feed(subreddit):
+    return f"reddit:{subreddit.lower()}"
+
+
+def stackoverflow_feed(tag):
+    return f"stackoverflow:{tag.lower()}"
+
+
+def complaintsboard_feed(keyword):
+    return f"complaintsboard:{keyword.lower()}"
+
+
+def _reddit_item(subreddit, post):
+    # Same url as reddit_fetcher stores, so both land on one corpus row
+    url = post.url or f"https://www.reddit.com{post.permalink}"
+    return {
+        "url": url,
+        "title": post.title or "",
+        "text": post.selftext or "",
+        "score": post.score,
+        "published_at": post.created_utc,
+        # Same shape as get_reddit_posts_with_replies results minus "comments", which the crawler does not
+        # fetch; leaving it out keeps comments already stored for the post when the row is refreshed
+        "extra": {
+            "title": post.title or "",
+            "selftext": post.selftext or "",
+            "url": url,
+            "score": post.score,
+            "num_comments": post.num_comments,
+            "subreddit": subreddit,
+            "fullname": post.fullname,
+            "created_utc": post.created_utc,
+        },
+    }
+
+
+class IncrementalCrawler:
+    """
+    Background crawler that keeps recent posts for known feeds in the local
+    corpus, so endpoints read a sliding window instead of calling upstream.
+
+    Feeds are subreddits, Stack Overflow tags and ComplaintsBoard keywords.
+    Each keeps a high-water mark in corpus_store: the newest created_utc
+    (or creation_date) seen. Every tick reads only items past the mark:
+    - subreddit.new() is read until it reaches the mark;
+    - Stack Overflow questions are fetched with fromdate set to the mark;
+    - ComplaintsBoard has no post dates, so its newest pages are re-read
+      and unseen complaints are filed at first-seen time.
+    Scores of recent Reddit posts are refreshed in batched info() calls,
+    100 per call. A diskcache lease lets only one gunicorn worker crawl per
+    interval.
+    """
+
+    def __init__(self, interval=CRAWL_INTERVAL, directory=CRAWL_LEASE_DIR):
+        self.interval = interval
+        self.cache = Cache(directory)
+        self.subreddits = set()
+        self.tags = set()
+        self.keywords = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread = None
+        self._stats = {"ticks": 0, "skipped_ticks": 0, "new_items": 0, "score_refreshes": 0, "errors": 0}
+        for sources in PERSONA_SOURCES.values():
+            self.register(subreddits=sources.get('reddit', []), tags=sources.get('stackoverflow', []),
+                          keywords=sources.get('complaintsboard', []))
+
+    def _count(self, outcome, n=1):
+        with self._lock:
+            self._stats[outcome] += n
+
+    def _reddit(self):
+        # PRAW clients are not thread-safe: one per crawl thread, all on the shared background budget
+        client = getattr(self._local, "reddit", None)
+        if client is None:
+            client = self._local.reddit = reddit_access.new_client("incremental_crawler", PRIORITY_BACKGROUND)
+        return client
+
+    def register(self, subreddits=(), tags=(), keywords=()):
+        with self._lock:
+            self.subreddits.update(subreddits)
+            self.tags.update(tags)
+            self.keywords.update(keywords)
+
+    def crawl_subreddit(self, subreddit):
+        feed = reddit_feed(subreddit)
+        mark = corpus_store.high_water(feed)
+        items = []
+        for post in self._reddit().subreddit(subreddit).new(limit=REDDIT_NEW_LIMIT):
+            if mark is not None and post.created_utc <= mark:
+                break
+            items.append(_reddit_item(subreddit, post))
+        corpus_store.upsert("reddit", items, feed=feed)
+        corpus_store.set_high_water(feed, max([item["published_at"] for item in items], default=mark or 0))
+        return len(items)
+
+    def crawl_tag(self, tag):
+        feed = stackoverflow_feed(tag)
+        mark = corpus_store.high_water(feed)
+        params = {"tagged": tag, "sort": "creation", "order": "desc", "site": "stackoverflow"}
+        if mark:
+            params["fromdate"] = int(mark) + 1
+        questions = stackexchange.fetch("questions", params, pages=STACKOVERFLOW_MAX_PAGES if mark else 1,
+                                        pagesize=100, filter="compact_body", cache_ttl=0)
+        items = []
+        for question in questions:
+            body = BeautifulSoup(question.get("body", ""), "html.parser").get_text(" ", strip=True)
+            items.append({
+                "url": question.get("link", ""),
+                "title": question.get("title", ""),
+                "text": body,
+                "score": question.get("score", 0),
+                "published_at": question.get("creation_date"),
+                "extra": {
+                    "title": question.get("title", ""),
+                    "link": question.get("link", ""),
+                    "score": question.get("score", 0),
+                    "answer_count": question.get("answer_count", 0),
+                    "tags": question.get("tags", []),
+                    "creation_date": question.get("creation_date"),
+                },
+            })
+        corpus_store.upsert("stackoverflow", items, feed=feed)
+        corpus_store.set_high_water(feed, max([item["published_at"] or 0 for item in items], default=mark or 0))
+        return len(items)
+
+    def crawl_keyword(self, keyword):
+        from working_complaintsboard_scraper import scrape_complaintsboard_pages
+        feed = complaintsboard_feed(keyword)
+        complaints = scrape_complaintsboard_pages(keyword, max_pages=COMPLAINTSBOARD_CRAWL_PAGES)
+        items = [{"url": c["url"], "title": c["title"], "text": c["text"], "extra": c} for c in complaints]
+        corpus_store.upsert("complaintsboard", items, feed=feed)
+        corpus_store.set_high_water(feed, time.time())
+        return len(items)
+
+    def refresh_scores(self):
+        """Re-read score and comment count of recent Reddit posts, 100 per info() call"""
+        with self._lock:
+            feeds = [reddit_feed(s) for s in self.subreddits]
+        rows = corpus_store.recent(feeds, time.time() - SCORE_REFRESH_WINDOW)[:SCORE_REFRESH_MAX]
+        subreddits = {row["extra"]["fullname"]: row["extra"]["subreddit"] for row in rows if row["extra"].get("fullname")}
+        if not subreddits:
+            return 0
+        items = [_reddit_item(subreddits[post.fullname], post)
+                 for post in self._reddit().info(fullnames=list(subreddits))]
+        corpus_store.upsert("reddit", items)
+        self._count("score_refreshes", len(items))
+        return len(items)
+
+    def _crawl_safely(self, crawl, name):
+        try:
+            self._count("new_items", crawl(name))
+        except Exception as e:
+            self._count("errors")
+            print(f"❌ Crawl error for {name}: {e}")
+
+    def _crawl_all(self, subreddits=(), tags=(), keywords=()):
+        jobs = ([(self.crawl_subreddit, s) for s in subreddits] + [(self.crawl_tag, t) for t in tags] +
+                [(self.crawl_keyword, k) for k in keywords])
+        if not jobs:
+            return
+        # Feeds that miss the deadline or find the crawl executor full keep their high-water mark for next tick
+        executors.crawl.gather({
+            f"{crawl.__name__}:{name}": (lambda crawl=crawl, name=name: self._crawl_safely(crawl, name))
+            for crawl, name in jobs
+        }, timeout=CRAWL_TIMEOUT, default=lambda: None)
+
+    def tick(self):
+        """Crawl every registered feed past its high-water mark, unless another worker holds this interval's lease"""
+        if not self.cache.add(CRAWL_LEASE_KEY, uuid.uuid4().hex, expire=self.interval):
+            self._count("skipped_ticks")
+            return False
+        with self._lock:
+            subreddits, tags, keywords = list(self.subreddits), list(self.tags), list(self.keywords)
+        self._crawl_all(subreddits, tags, keywords)
+        try:
+            self.refresh_scores()
+        except Exception as e:
+            self._count("errors")
+            print(f"❌ Reddit score refresh error: {e}")
+        self._count("ticks")
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"❌ Crawler tick error: {e}")
+            time.sleep(self.interval)
+
+    def start(self):
+        """Start the background crawl loop (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="incremental-crawler", daemon=True)
+        self._thread.start()
+
+    def recent_reddit(self, subreddits, window, per_feed_limit=None):
+        """
+        Stored posts from `subreddits` created in the last `window` seconds,
+        newest first. Only subreddits never crawled before are fetched now.
+        """
+        self.register(subreddits=subreddits)
+        self.start()
+        self._crawl_all(subreddits=[s for s in subreddits if corpus_store.high_water(reddit_feed(s)) is None])
+        return corpus_store.recent([reddit_feed(s) for s in subreddits], time.time() - window, per_feed_limit)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(subreddits=len(self.subreddits), tags=len(self.tags), keywords=len(self.keywords))
+        return stats
+
+
+# Create singleton instance
+incremental_crawler = IncrementalCrawler()
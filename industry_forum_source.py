@@ -1,12 +1,11 @@
 import logging
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from bs4 import BeautifulSoup
 from diskcache import Cache
+from browser_pool import browser_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -51,25 +50,20 @@ class IndustryForumSource:
             return result
             
         try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            driver = webdriver.Chrome(options=options)
+            with browser_pool.driver() as driver:
+                search_url = f"{forum_url}/search?q={keyword.replace(' ', '+')}"
+                driver.get(search_url)
             
-            search_url = f"{forum_url}/search?q={keyword.replace(' ', '+')}"
-            driver.get(search_url)
+                # Wait for search results
+                try:
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, "a.search-result-link"))
+                    )
+                except TimeoutException:
+                    return []
             
-            # Wait for search results
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, "a.search-result-link"))
-                )
-            except TimeoutException:
-                driver.quit()
-                return []
-            
-            # Get search results
-            soup = BeautifulSoup(driver.page_source, "html.parser")
+                # Get search results
+                soup = BeautifulSoup(driver.page_source, "html.parser")
             results = []
             
             for result_elem in soup.select("div.search-result")[:max_posts]:
@@ -91,13 +85,10 @@ class IndustryForumSource:
                     "excerpt": excerpt_text
                 })
             
-            driver.quit()
             cache.set(cache_key, results, expire=3600)
             return results
         except Exception as e:
             logger.error(f"Error fetching forum posts: {e}")
-            if 'driver' in locals():
-                driver.quit()
             return []
     
     def get_forum_posts_by_vertical(self, vertical, keyword, max_posts=20):
@@ -0,0 +1,117 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # groq pulls httpx in, but keep the pool usable without it
+    httpx = None
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+GROQ_TIMEOUT = 60
+POOL_MAX_CONNECTIONS = 100
+POOL_MAX_KEEPALIVE = 40
+
+
+class LLMClientPool:
+    """
+    Process-wide pool of LLM clients.
+
+    One Groq client is created lazily per API key and reused for every request
+    made with that key. All Groq clients share a single keep-alive (HTTP/2 when
+    `h2` is installed) httpx connection pool, and OpenRouter calls go through
+    one pooled requests.Session, so TLS handshakes happen once per connection
+    rather than once per request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groq_clients = {}
+        self._groq_http_client = None
+        self._session = None
+        self._async_groq_clients = {}
+        self._async_http_client = None
+
+    def _get_groq_http_client(self):
+        if self._groq_http_client is None and httpx is not None:
+            self._groq_http_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                timeout=GROQ_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                ),
+            )
+        return self._groq_http_client
+
+    def groq(self, api_key):
+        """Return the shared Groq client for `api_key`, creating it on first use"""
+        client = self._groq_clients.get(api_key)
+        if client is not None:
+            return client
+        from groq import Groq
+        with self._lock:
+            client = self._groq_clients.get(api_key)
+            if client is None:
+                http_client = self._get_groq_http_client()
+                if http_client is not None:
+                    client = Groq(api_key=api_key, http_client=http_client)
+                else:
+                    client = Groq(api_key=api_key)
+                self._groq_clients[api_key] = client
+        return client
+
+    def session(self):
+        """Return the shared keep-alive requests.Session used for OpenRouter and other HTTP LLM APIs"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=POOL_MAX_CONNECTIONS)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+        return self._session
+
+    def async_http(self):
+        """
+        Return the shared httpx.AsyncClient. Async clients are bound to the event
+        loop they are first used on, so only call this from the LLM gateway loop.
+        """
+        if self._async_http_client is None:
+            self._async_http_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=GROQ_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                ),
+            )
+        return self._async_http_client
+
+    def async_groq(self, api_key):
+        """Return the shared AsyncGroq client for `api_key` (gateway loop only)"""
+        client = self._async_groq_clients.get(api_key)
+        if client is None:
+            from groq import AsyncGroq
+            client = AsyncGroq(api_key=api_key, http_client=self.async_http())
+            self._async_groq_clients[api_key] = client
+        return client
+
+    def stats(self):
+        return {
+            "groq_clients": len(self._groq_clients),
+            "async_groq_clients": len(self._async_groq_clients),
+            "http2": bool(HTTP2_AVAILABLE and self._groq_http_client is not None),
+            "session_open": self._session is not None,
+        }
+
+
+# Create singleton instance
+client_pool = LLMClientPool()
@@ -0,0 +1,385 @@
+import asyncio
+import queue
+import threading
+import time
+
+from llm_clients import client_pool
+from rate_limits import error_headers, estimate_tokens
+
+DEFAULT_GROQ_MODEL = "llama-3.1-8b-instant"
+DEFAULT_OPENROUTER_MODEL = "mistralai/devstral-small-2505:free"
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+PAYLOAD_TOO_LARGE_MESSAGE = "Error: Request too large. Please try with a shorter prompt or fewer data points."
+KEY_ACQUIRE_TIMEOUT = 120  # longest a completion waits for a usable Groq key before giving up
+
+_STREAM_DONE = object()
+
+
+class LLMGateway:
+    """
+    Asyncio core for every LLM completion in the app.
+
+    All Groq / OpenRouter requests run as coroutines on one dedicated event
+    loop thread, so hundreds of concurrent completions share that loop instead
+    of each holding a WSGI or pool thread. Keys come from the shared
+    GroqKeyScheduler, waiting coroutines queue FIFO behind an asyncio.Lock,
+    the head one sleeps until the next key is due or the scheduler reports a
+    released / un-benched key, and failures feed the same mark-failed / rate-limit bookkeeping as before.
+
+    Use `await gateway.generate(...)` from async code, or the module-level
+    generate() / generate_many() / stream() shims from sync code.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._acquire_lock = None
+        self._key_event = None
+        self._waiting = 0
+        self.scheduler = None
+        self.limiter = None
+        self.classify_error = None
+        self.mark_key_failed = None
+        self.openrouter_key_provider = None
+        self.openrouter_limiter = None
+        self.mark_openrouter_key_failed = None
+        self.max_retries = 5
+        self._stats_lock = threading.Lock()
+        self._requests = 0
+        self._in_flight = 0
+        self._max_in_flight = 0
+        self._errors = 0
+        self._total_latency = 0.0
+
+    def configure(self, scheduler, limiter, classify_error, mark_key_failed, max_retries=5,
+                  openrouter_key_provider=None, openrouter_limiter=None, mark_openrouter_key_failed=None):
+        self.scheduler = scheduler
+        scheduler.subscribe(self._key_changed)
+        self.limiter = limiter
+        self.classify_error = classify_error
+        self.mark_key_failed = mark_key_failed
+        self.max_retries = max_retries
+        self.openrouter_key_provider = openrouter_key_provider
+        self.openrouter_limiter = openrouter_limiter
+        self.mark_openrouter_key_failed = mark_openrouter_key_failed
+
+    # --- event loop thread ---
+
+    def _ensure_loop(self):
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._acquire_lock = asyncio.Lock()
+                    self._key_event = asyncio.Event()
+                    ready.set()
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="llm-gateway", daemon=True)
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+        return self._loop
+
+    def submit(self, coro):
+        """Schedule a coroutine on the gateway loop and return a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the gateway loop and block for its result, cancelling it on timeout"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def _key_changed(self):
+        """Scheduler listener (any thread): wake the coroutine waiting for a key"""
+        loop = self._loop
+        if loop is not None and loop.is_running():
+            loop.call_soon_threadsafe(self._key_event.set)
+
+    # --- bookkeeping ---
+
+    def _started(self):
+        with self._stats_lock:
+            self._requests += 1
+            self._in_flight += 1
+            self._max_in_flight = max(self._max_in_flight, self._in_flight)
+        return time.time()
+
+    def _finished(self, started, failed=False):
+        with self._stats_lock:
+            self._in_flight -= 1
+            self._total_latency += time.time() - started
+            if failed:
+                self._errors += 1
+
+    def stats(self):
+        with self._stats_lock:
+            done = self._requests - self._in_flight
+            return {
+                "loop_running": self._loop is not None and self._loop.is_running(),
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "waiting_for_key": self._waiting,
+                "max_in_flight": self._max_in_flight,
+                "errors": self._errors,
+                "avg_latency_seconds": round(self._total_latency / done, 3) if done else 0.0,
+            }
+
+    async def _acquire(self, cost, timeout=KEY_ACQUIRE_TIMEOUT):
+        """
+        Lease a Groq key without blocking the loop; coroutines are served FIFO.
+        Raises RuntimeError if no key became usable within `timeout` seconds.
+        """
+        start = time.time()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._acquire_lock.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self._waiting -= 1
+            raise RuntimeError("No usable Groq keys available at this time.")
+        try:
+            while True:
+                # Cleared before looking, so a key released in between still wakes the wait below
+                self._key_event.clear()
+                lease, wait = self.scheduler.try_acquire(cost)
+                if lease is not None:
+                    lease.waited = time.time() - start
+                    return lease
+                remaining = start + timeout - time.time()
+                if remaining <= 0:
+                    raise RuntimeError("No usable Groq keys available at this time.")
+                try:
+                    await asyncio.wait_for(self._key_event.wait(), min(wait, remaining))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._waiting -= 1
+            self._acquire_lock.release()
+
+    def _handle_groq_error(self, lease, e):
+        """Release a failed lease and bench the key if needed; returns the error type"""
+        error_type = self.classify_error(e)
+        self.scheduler.release(lease)
+        if error_type in ('rate_limit', 'invalid_key'):
+            self.mark_key_failed(lease.key, error_type, headers=error_headers(e))
+            print(f"Groq {error_type} for key {lease.key[:6]}... from {lease.org}")
+        elif error_type != 'payload_too_large':
+            print(f"Groq error: {e}")
+        return error_type
+
+    # --- async API ---
+
+    async def generate(self, prompt, temperature=1, max_tokens=6000, model=DEFAULT_GROQ_MODEL, provider="groq"):
+        """Return the completion text for `prompt`, waiting for a Groq key as long as needed"""
+        if provider == "openrouter":
+            return await self._openrouter_generate(prompt, temperature, max_tokens, model)
+        started = self._started()
+        failures = 0
+        try:
+            while True:
+                lease = await self._acquire(estimate_tokens(prompt) + max_tokens)
+                if lease.waited > 0.05:
+                    print(f"⏳ Waited {lease.waited:.2f}s for next available key")
+                client = client_pool.async_groq(lease.key)
+                try:
+                    raw = await client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        top_p=1,
+                        stream=False,
+                        stop=None,
+                    )
+                    completion = raw.parse()
+                except asyncio.CancelledError:
+                    self.scheduler.release(lease)
+                    raise
+                except Exception as e:
+                    error_type = self._handle_groq_error(lease, e)
+                    if error_type == 'payload_too_large':
+                        print(f"Payload too large error: {e}")
+                        self._finished(started)
+                        return PAYLOAD_TOO_LARGE_MESSAGE
+                    failures += 1
+                    if failures >= self.max_retries:
+                        raise
+                    continue
+                self.scheduler.release(lease)
+                usage = getattr(completion, "usage", None)
+                self.limiter.observe(lease.key, raw.headers, reserved_tokens=lease.cost,
+                                     used_tokens=getattr(usage, "total_tokens", None))
+                if completion.choices:
+                    self._finished(started)
+                    return completion.choices[0].message.content
+                # An empty completion still spent key budget, so it counts against max_retries like an error
+                failures += 1
+                if failures >= self.max_retries:
+                    raise RuntimeError(f"Groq returned no choices in {failures} attempts")
+                print("[Groq error]: No choices in response, trying next key...")
+        except BaseException:
+            self._finished(started, failed=True)
+            raise
+
+    async def stream(self, prompt, temperature=1, max_tokens=4000, model=DEFAULT_GROQ_MODEL):
+        """
+        Async generator of completion chunks for `prompt`. Failures are retried on
+        another key only until the first chunk is out; after that they are raised,
+        since a restarted completion would be appended to the partial one.
+        """
+        started = self._started()
+        failures = 0
+        failed = False
+        yielded = False
+        try:
+            while True:
+                lease = await self._acquire(estimate_tokens(prompt) + max_tokens)
+                client = client_pool.async_groq(lease.key)
+                try:
+                    print(f"🚀 Making streaming request with {lease.org}")
+                    raw = await client.chat.completions.with_raw_response.create(
+                        model=model,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        top_p=1,
+                        stream=True,
+                        stop=None,
+                    )
+                    self.limiter.observe(lease.key, raw.headers)
+                    async for chunk in raw.parse():
+                        if chunk.choices:
+                            content = getattr(chunk.choices[0].delta, "content", None)
+                            if content:
+                                yielded = True
+                                yield content
+                except (asyncio.CancelledError, GeneratorExit):
+                    self.scheduler.release(lease)
+                    raise
+                except Exception as e:
+                    error_type = self._handle_groq_error(lease, e)
+                    if error_type == 'payload_too_large' and not yielded:
+                        print(f"Payload too large error: {e}")
+                        yield PAYLOAD_TOO_LARGE_MESSAGE
+                        return
+                    failures += 1
+                    if yielded or failures >= self.max_retries:
+                        raise
+                    continue
+                self.scheduler.release(lease)
+                return
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._finished(started, failed=failed)
+
+    async def generate_many(self, requests, timeout=None):
+        """
+        Run many generate() calls concurrently; `requests` is a list of kwargs dicts.
+        `timeout` applies to each call, so one slow request cannot discard the others.
+        """
+        calls = (asyncio.wait_for(self.generate(**kwargs), timeout) for kwargs in requests)
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    async def _openrouter_generate(self, prompt, temperature, max_tokens, model):
+        if model == DEFAULT_GROQ_MODEL:
+            model = DEFAULT_OPENROUTER_MODEL
+        api_key = self.openrouter_key_provider() if self.openrouter_key_provider else None
+        if api_key is None:
+            return None
+        started = self._started()
+        try:
+            response = await client_pool.async_http().post(
+                OPENROUTER_URL,
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json",
+                    "HTTP-Referer": "http://localhost:5000",
+                    "X-Title": "RadarGPT"
+                },
+                json={
+                    "model": model,
+                    "messages": [{"role": "user", "content": prompt}],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens,
+                    "stream": False
+                },
+                timeout=30,
+            )
+        except Exception as e:
+            self._finished(started, failed=True)
+            print(f"OpenRouter request error: {e}")
+            return f"Error: OpenRouter request error: {e}"
+        self._finished(started, failed=response.status_code != 200)
+        if response.status_code == 200:
+            if self.openrouter_limiter:
+                self.openrouter_limiter.observe(api_key, response.headers)
+            result = response.json()
+            if result.get("choices"):
+                return result["choices"][0]["message"]["content"]
+            return f"Error: OpenRouter API response missing 'choices': {result}"
+        if response.status_code == 429:
+            self.mark_openrouter_key_failed(api_key, 'rate_limit', headers=response.headers)
+            return None
+        if response.status_code == 401:
+            self.mark_openrouter_key_failed(api_key, 'invalid_key')
+            return None
+        print(f"OpenRouter error: {response.status_code} - {response.text}")
+        return f"Error: OpenRouter error: {response.status_code} - {response.text}"
+
+
+# Create singleton instance
+gateway = LLMGateway()
+
+
+# --- sync shims ---
+
+def generate(prompt, timeout=None, **kwargs):
+    """Blocking generate() for sync code; raises concurrent.futures.TimeoutError after `timeout`"""
+    return gateway.run(gateway.generate(prompt, **kwargs), timeout=timeout)
+
+
+def generate_many(requests, timeout=None):
+    """
+    Blocking fan-out of many completions on the gateway loop. Returns results in
+    order; a failed or timed-out request's slot holds its exception, so the
+    completions that finished within `timeout` are always returned.
+    """
+    return gateway.run(gateway.generate_many(requests, timeout=timeout))
+
+
+def stream(prompt, **kwargs):
+    """Blocking generator over gateway.stream() for Flask streaming responses"""
+    chunks = queue.Queue()
+
+    async def pump():
+        try:
+            async for chunk in gateway.stream(prompt, **kwargs):
+                chunks.put(chunk)
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_STREAM_DONE)
+
+    future = gateway.submit(pump())
+    try:
+        while True:
+            item = chunks.get()
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        future.cancel()
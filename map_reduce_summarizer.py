@@ -0,0 +1,143 @@
+import threading
+import time
+
+import context_packer
+import llm_gateway
+
+CITATION_INSTRUCTIONS = (
+    "After each fact or sentence, add a citation in the form [n] that refers to the n-th source in the list below. "
+    "Only use citations for facts you can attribute to a specific source.\n\n"
+)
+CITATION_SUMMARY_MAX_TOKENS = 2000
+CITATION_MODEL = "llama-3.1-8b-instant"
+MAP_MAX_TOKENS = 600  # each chunk's partial summary
+MAX_FAN_OUT = 12
+MAP_TIMEOUT_SHARE = 0.6  # of the caller's timeout; the reduce step gets the rest
+KEY_READY_WITHIN = 5.0  # keys free within this many seconds count towards the fan-out width
+
+MAP_INSTRUCTIONS = (
+    "Extract every concrete pain point, complaint, trend and existing product (with its gaps) from the sources below "
+    "that is relevant to \"{query}\". Write terse bullet points, at most {words} words in total. End each bullet with "
+    "the [n] citation(s) of the sources it comes from, exactly as numbered below. Do not add facts that are not in "
+    "the sources.\n\nSources:\n"
+)
+REDUCE_INSTRUCTIONS = (
+    "The notes below were extracted from many sources. Each note ends with [n] citations to those original sources. "
+    "Write the final answer from these notes only, keeping the [n] citations exactly as given after every fact you "
+    "use; never renumber them.\n\nNotes:\n"
+)
+
+
+def _render(n, item, text):
+    return f"[{n}] {item.get('title', '')} ({item.get('url', '')})\n{text}\n"
+
+
+def build_citation_prompt(content_list, prompt_prefix, query="", max_tokens=CITATION_SUMMARY_MAX_TOKENS,
+                          model=CITATION_MODEL):
+    """
+    Summary prompt over the items of `content_list` most relevant to `query`, packed to fit `model`'s
+    request limit next to a `max_tokens` completion. [n] is the item's position in `content_list`.
+    """
+    budget = context_packer.prompt_budget(model, max_tokens, prompt_prefix, CITATION_INSTRUCTIONS)
+    packed = context_packer.pack(content_list, query, budget, _render)
+    sources_str = "\n".join(block for _, _, _, block in packed)
+    return f"{prompt_prefix}\n{CITATION_INSTRUCTIONS}Sources:\n{sources_str}\n"
+
+
+class MapReduceSummarizer:
+    """
+    Citation summaries of corpora too big for one prompt, spread over the
+    Groq keys.
+
+    The corpus is ranked and packed as for a single prompt, but to a budget
+    of `width` map chunks. The width is the number of keys free right now,
+    capped by how many partial summaries fit in one reduce prompt. The
+    chunks are summarized concurrently on the LLM gateway, each keeping its
+    sources' [n] ids. The reduce step then merges the partial summaries into
+    the caller's final prompt_prefix output. A corpus that fits one prompt,
+    or a moment with a single free key, falls back to one citation prompt.
+    """
+
+    def __init__(self, model=CITATION_MODEL, max_tokens=CITATION_SUMMARY_MAX_TOKENS):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.scheduler = None
+        self._lock = threading.Lock()
+        self._stats = {"single": 0, "map_reduce": 0, "chunks": 0, "failed_chunks": 0, "max_width": 0}
+
+    def configure(self, scheduler):
+        self.scheduler = scheduler
+
+    def _count(self, outcome, n=1):
+        with self._lock:
+            self._stats[outcome] += n
+
+    def width(self, prompt_prefix):
+        """Map fan-out: free keys, capped by the partial summaries one reduce prompt can hold"""
+        reduce_room = context_packer.prompt_budget(self.model, self.max_tokens, prompt_prefix, REDUCE_INSTRUCTIONS)
+        chunk_cost = context_packer.request_budget(self.model)
+        free = self.scheduler.available(chunk_cost, KEY_READY_WITHIN) if self.scheduler is not None else 1
+        return max(1, min(free, reduce_room // MAP_MAX_TOKENS, MAX_FAN_OUT))
+
+    def _chunks(self, content_list, query, width):
+        map_prompt = MAP_INSTRUCTIONS.format(query=query, words=MAP_MAX_TOKENS * 3 // 5)
+        chunk_budget = context_packer.prompt_budget(self.model, MAP_MAX_TOKENS, map_prompt)
+        packed = context_packer.pack(content_list, query, chunk_budget * width, _render)
+        # First fit into exactly `width` chunks: room left at one chunk's end is filled by later blocks
+        # instead of spilling into an extra chunk that has no free key (or no room in the reduce prompt)
+        chunks, used = [[] for _ in range(width)], [0] * width
+        for _, _, _, block in packed:
+            cost = context_packer.count_tokens(block)
+            for i in range(width):
+                if used[i] + cost <= chunk_budget:
+                    chunks[i].append(block)
+                    used[i] += cost
+                    break
+        return [map_prompt + "\n".join(chunk) for chunk in chunks if chunk]
+
+    def _single(self, content_list, prompt_prefix, query, timeout):
+        self._count("single")
+        prompt = build_citation_prompt(content_list, prompt_prefix, query, self.max_tokens, self.model)
+        return llm_gateway.generate(prompt, max_tokens=self.max_tokens, model=self.model, timeout=timeout)
+
+    def summarize(self, content_list, prompt_prefix, query="", timeout=None):
+        """Final citation summary of `content_list` for `prompt_prefix`, map-reduced when it is large"""
+        width = self.width(prompt_prefix)
+        single_budget = context_packer.prompt_budget(self.model, self.max_tokens, prompt_prefix, CITATION_INSTRUCTIONS)
+        corpus = context_packer.pack(content_list, query, float("inf"), _render)
+        fits = sum(context_packer.count_tokens(block) for _, _, _, block in corpus) <= single_budget
+        prompts = [] if fits or width == 1 else self._chunks(content_list, query, width)
+        if len(prompts) < 2:
+            return self._single(content_list, prompt_prefix, query, timeout)
+
+        started = time.time()
+        self._count("map_reduce")
+        self._count("chunks", len(prompts))
+        with self._lock:
+            self._stats["max_width"] = max(self._stats["max_width"], len(prompts))
+        # The timeout is per chunk: a slow chunk fails alone and the finished notes are still reduced
+        partials = llm_gateway.generate_many(
+            [{"prompt": prompt, "max_tokens": MAP_MAX_TOKENS, "model": self.model} for prompt in prompts],
+            timeout=timeout * MAP_TIMEOUT_SHARE if timeout else None
+        )
+        notes = []
+        for partial in partials:
+            if isinstance(partial, str) and partial.strip() and not partial.startswith("Error"):
+                notes.append(partial.strip())
+            else:
+                self._count("failed_chunks")
+        if not notes:
+            return self._single(content_list, prompt_prefix, query,
+                                max(timeout - (time.time() - started), 1) if timeout else None)
+        print(f"🗺️ Map-reduce summary: {len(notes)}/{len(prompts)} chunks summarized")
+        reduce_prompt = f"{prompt_prefix}\n{REDUCE_INSTRUCTIONS}" + "\n\n".join(notes)
+        return llm_gateway.generate(reduce_prompt, max_tokens=self.max_tokens, model=self.model,
+                                    timeout=max(timeout - (time.time() - started), 1) if timeout else None)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+# Create singleton instance
+map_reduce_summarizer = MapReduceSummarizer()
@@ -1,7 +1,13 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 import feedparser
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime
 
 # List of RSS feeds to aggregate
 RSS_FEEDS = [
@@ -48,39 +54,155 @@ CATEGORY_FEEDS = {
     ],
 }
 
+RSS_REFRESH_INTERVAL = int(os.getenv("RSS_REFRESH_INTERVAL", "300"))  # seconds between background polls
+RSS_FETCH_WORKERS = 8
+RSS_FETCH_TIMEOUT = 10
+RSS_BUFFER_SIZE = 300  # newest entries kept per category
+
+
+def _parse_entries(parsed):
+    """Headline dicts for a parsed feed: {title, url, source, publishedAt}"""
+    source = parsed.feed.get('title', 'Unknown')
+    headlines = []
+    for entry in parsed.entries:
+        published = entry.get('published', '') or entry.get('updated', '')
+        # Try to parse date
+        try:
+            publishedAt = datetime(*entry.published_parsed[:6]).isoformat() if 'published_parsed' in entry else ''
+        except Exception:
+            publishedAt = published
+        headlines.append({
+            'title': entry.get('title', ''),
+            'url': entry.get('link', ''),
+            'source': source,
+            'publishedAt': publishedAt,
+        })
+    return headlines
+
+
+class RSSRefresher:
+    """
+    Background poller that keeps RSS headlines in memory.
+
+    Every `interval` seconds all RSS_FEEDS and CATEGORY_FEEDS are fetched
+    concurrently with ETag/Last-Modified conditional requests, so unchanged
+    feeds cost a 304 and no parsing. Entries go into a bounded per-category
+    buffer deduped by link; readers get a presorted snapshot without any
+    network I/O.
+    """
+
+    def __init__(self, interval=RSS_REFRESH_INTERVAL, buffer_size=RSS_BUFFER_SIZE):
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.session = requests.Session()
+        self._validators = {}  # feed url -> (etag, last_modified)
+        self._buffers = {}  # category -> OrderedDict(link -> headline)
+        self._snapshots = {}  # category -> newest-first tuple of headlines
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self._ready = threading.Event()
+        self._stats = {"polls": 0, "fetched": 0, "not_modified": 0, "errors": 0, "last_refresh": None}
+
+    def _feeds_by_category(self):
+        categories = {'general': RSS_FEEDS}
+        categories.update(CATEGORY_FEEDS)
+        return categories
+
+    def _fetch(self, feed_url):
+        """Entries of one feed, [] if unchanged since the last poll, None on error"""
+        etag, last_modified = self._validators.get(feed_url, (None, None))
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            resp = self.session.get(feed_url, headers=headers, timeout=RSS_FETCH_TIMEOUT)
+            if resp.status_code == 304:
+                self._count("not_modified")
+                return []
+            resp.raise_for_status()
+            parsed = feedparser.parse(resp.content)
+        except Exception:
+            self._count("errors")
+            return None
+        self._validators[feed_url] = (resp.headers.get('ETag'), resp.headers.get('Last-Modified'))
+        self._count("fetched")
+        return _parse_entries(parsed)
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def refresh(self):
+        """Poll every feed once (concurrently) and fold new entries into the category buffers"""
+        with self._refresh_lock:
+            categories = self._feeds_by_category()
+            feed_urls = list(dict.fromkeys(url for feeds in categories.values() for url in feeds))
+            with ThreadPoolExecutor(max_workers=RSS_FETCH_WORKERS) as executor:
+                entries = dict(zip(feed_urls, executor.map(self._fetch, feed_urls)))
+
+            with self._lock:
+                for category, feeds in categories.items():
+                    buffer = self._buffers.setdefault(category, OrderedDict())
+                    added = False
+                    for feed_url in feeds:
+                        for headline in entries.get(feed_url) or []:
+                            link = headline['url']
+                            if not link or link in buffer:
+                                continue
+                            buffer[link] = dict(headline, category=category, region='global')
+                            added = True
+                    while len(buffer) > self.buffer_size:
+                        buffer.popitem(last=False)
+                    if added or category not in self._snapshots:
+                        self._snapshots[category] = tuple(
+                            sorted(buffer.values(), key=lambda h: h['publishedAt'] or '', reverse=True)
+                        )
+                self._stats["polls"] += 1
+                self._stats["last_refresh"] = datetime.now().isoformat()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ RSS refresh error: {e}")
+
+    def start(self):
+        """Start the background poller (idempotent); the first refresh runs synchronously"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="rss-refresher", daemon=True)
+        try:
+            self.refresh()
+        finally:
+            self._ready.set()
+            self._thread.start()
+
+    def headlines(self, category='general', max_items=20):
+        self.start()
+        self._ready.wait(RSS_FETCH_TIMEOUT * 2)
+        snapshot = self._snapshots.get(category if category in CATEGORY_FEEDS else 'general', ())
+        return [dict(headline, category=category or 'general') for headline in snapshot[:max_items]]
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["buffered"] = {category: len(buffer) for category, buffer in self._buffers.items()}
+        return stats
+
+
 def fetch_rss_headlines(category=None, max_items=20):
     """
-    Fetch news headlines from RSS feeds. Optionally filter by category.
+    News headlines from the in-memory RSS buffers kept fresh by rss_refresher.
+    Optionally filter by category.
     Returns a list of dicts: {title, url, source, publishedAt}
     """
-    feeds = RSS_FEEDS.copy()
-    if category and category in CATEGORY_FEEDS:
-        feeds = CATEGORY_FEEDS[category]
-    headlines = []
-    for feed_url in feeds:
-        try:
-            d = feedparser.parse(feed_url)
-            for entry in d.entries[:max_items]:
-                title = entry.get('title', '')
-                url = entry.get('link', '')
-                published = entry.get('published', '') or entry.get('updated', '')
-                source = d.feed.get('title', 'Unknown')
-                # Try to parse date
-                try:
-                    publishedAt = datetime(*entry.published_parsed[:6]).isoformat() if 'published_parsed' in entry else ''
-                except Exception:
-                    publishedAt = published
-                headlines.append({
-                    'title': title,
-                    'url': url,
-                    'source': source,
-                    'publishedAt': publishedAt,
-                    'category': category or 'general',
-                    'region': 'global',
-                })
-        except Exception as e:
-            continue
-    return headlines[:max_items]
+    return rss_refresher.headlines(category, max_items)
 
 # Optional: fallback to scraping a few major sites if RSS fails
 def scrape_headlines_from_site(url, selector, max_items=10):
@@ -119,4 +241,8 @@ def get_news_trends_hybrid(category=None, max_items=20):
     if scraped:
         return scraped
     # Final fallback: return empty, app.py can then use NewsAPI if desired
-    return [] 
\ No newline at end of file
+    return []
+
+
+# Create singleton instance
+rss_refresher = RSSRefresher()
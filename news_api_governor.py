@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import requests
+from diskcache import Cache
+
+from circuit_breakers import circuit_breakers
+from single_flight import single_flight
+
+NEWS_API_BASE_URL = "https://newsapi.org/v2"
+NEWS_API_DAILY_BUDGET = int(os.getenv("NEWS_API_DAILY_BUDGET", "100"))  # developer plan: 100 requests/day
+NEWS_API_STATE_DIR = "radargpt_cache"  # shared by every gunicorn worker
+LOW_BUDGET_RESERVE = 10  # calls kept back for user searches; background trend calls stop here
+RESPONSE_TTL = 900
+REQUEST_TIMEOUT = 15
+
+
+def _usage_key():
+    return f"newsapi_usage_{datetime.now(timezone.utc).strftime('%Y-%m-%d')}"
+
+
+class NewsApiGovernor:
+    """
+    Daily quota governor in front of every NewsAPI call.
+
+    Calls made today (UTC) are counted in the shared diskcache directory, so
+    all gunicorn workers spend one daily budget. Identical requests are
+    answered from a short-lived response cache or coalesced onto the one
+    in-flight call through single_flight. When the budget is spent, or a
+    caller's `reserve` would be breached, get() returns None. Callers then
+    fall back to cached or RSS results. A 429 marks the budget as used up
+    for the rest of the day.
+    """
+
+    def __init__(self, daily_budget=NEWS_API_DAILY_BUDGET, directory=NEWS_API_STATE_DIR):
+        self.daily_budget = daily_budget
+        self.cache = Cache(directory)
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "cache_hits": 0, "denied": 0, "errors": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def used_today(self):
+        return self.cache.get(_usage_key(), 0)
+
+    def remaining(self):
+        return max(self.daily_budget - self.used_today(), 0)
+
+    def _reserve_call(self, reserve):
+        """Count one call against today's budget unless that would dip into `reserve`"""
+        key = _usage_key()
+        with self.cache.transact():
+            used = self.cache.get(key, 0)
+            if used + 1 > self.daily_budget - reserve:
+                return False
+            self.cache.set(key, used + 1, expire=2 * 86400)
+        return True
+
+    def _exhaust(self):
+        self.cache.set(_usage_key(), self.daily_budget, expire=2 * 86400)
+
+    def get(self, endpoint, params, api_key, reserve=0, timeout=REQUEST_TIMEOUT):
+        """JSON body of a NewsAPI `endpoint` call, or None when over budget or on error"""
+        digest = hashlib.sha256(json.dumps([endpoint, params], sort_keys=True, default=str).encode()).hexdigest()
+        cache_key = f"newsapi_response_{digest}"
+        data = self.cache.get(cache_key)
+        if data is not None:
+            self._count("cache_hits")
+            return data
+
+        def call():
+            data = self.cache.get(cache_key)
+            if data is not None:
+                return data
+            if not circuit_breakers.allow("newsapi"):
+                self._count("denied")
+                print(f"⚠️ NewsAPI circuit open; skipping {endpoint}")
+                return None
+            if not self._reserve_call(reserve):
+                self._count("denied")
+                print(f"⚠️ NewsAPI daily budget low ({self.remaining()} left); skipping {endpoint}")
+                return None
+            self._count("calls")
+            start = time.time()
+            try:
+                response = self.session.get(f"{NEWS_API_BASE_URL}/{endpoint}",
+                                            params=dict(params, apiKey=api_key), timeout=timeout)
+            except Exception as e:
+                circuit_breakers.record("newsapi", False, time.time() - start)
+                self._count("errors")
+                print(f"❌ NewsAPI {endpoint} error: {e}")
+                return None
+            circuit_breakers.record("newsapi", response.status_code < 500 and response.status_code != 429,
+                                    time.time() - start)
+            if response.status_code == 200:
+                data = response.json()
+                self.cache.set(cache_key, data, expire=RESPONSE_TTL)
+                return data
+            self._count("errors")
+            if response.status_code == 429:
+                print("⚠️ NewsAPI rate limit hit; treating today's budget as spent")
+                self._exhaust()
+            elif response.status_code == 401:
+                print("❌ NewsAPI rejected the API key")
+            else:
+                print(f"❌ NewsAPI error {response.status_code} for {endpoint}: {response.text[:200]}")
+            return None
+
+        return single_flight.do("newsapi", call, timeout=timeout * 2, endpoint=endpoint, digest=digest)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(daily_budget=self.daily_budget, used_today=self.used_today(), remaining=self.remaining())
+        return stats
+
+
+# Create singleton instance
+newsapi_governor = NewsApiGovernor()
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from diskcache import Cache
+
+PAIN_CLOUD_LLM_BUDGET = int(os.getenv("PAIN_CLOUD_LLM_BUDGET", "300"))  # LLM calls per UTC day for materialization
+PAIN_CLOUD_OFF_PEAK_HOURS = os.getenv("PAIN_CLOUD_OFF_PEAK_HOURS", "1-6")  # UTC hours, inclusive
+PAIN_CLOUD_MAX_AGE = 24 * 3600  # materializations older than this are recomputed in the next off-peak window
+PAIN_CLOUD_CHECK_INTERVAL = 600
+PAIN_CLOUD_VERSIONS_KEPT = 3
+PAIN_CLOUD_LEASE_TTL = 900
+MATERIALIZER_DIR = "radargpt_cache"  # shared by every gunicorn worker
+
+
+def _parse_hours(spec):
+    start, _, end = spec.partition("-")
+    start, end = int(start), int(end or start)
+    if start <= end:
+        return set(range(start, end + 1))
+    return set(range(start, 24)) | set(range(0, end + 1))
+
+
+def _pair_key(persona, industry):
+    return f"pain_cloud:{persona}:{industry}"
+
+
+class PainCloudMaterializer:
+    """
+    Precomputed /pain-cloud-realtime results for every known persona x
+    industry pair.
+
+    In the off-peak UTC hours a background loop recomputes the stalest pairs
+    first. It stops once the day's LLM call budget (shared across gunicorn
+    workers) is spent. Each result is stored as a new version; the latest
+    PAIN_CLOUD_VERSIONS_KEPT are kept. Requests read the latest version with
+    its timestamp. A per-pair lease stops two workers computing the same
+    pair at once.
+    """
+
+    def __init__(self, directory=MATERIALIZER_DIR, llm_budget=PAIN_CLOUD_LLM_BUDGET,
+                 off_peak_hours=PAIN_CLOUD_OFF_PEAK_HOURS, max_age=PAIN_CLOUD_MAX_AGE):
+        self.cache = Cache(directory)
+        self.llm_budget = llm_budget
+        self.off_peak_hours = _parse_hours(off_peak_hours)
+        self.max_age = max_age
+        self.pairs = []
+        self.compute = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stats = {"materialized": 0, "failed": 0, "served": 0, "runs": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def configure(self, pairs, compute):
+        """compute(persona, industry) -> (result dict, llm calls used); results with "error" are not stored"""
+        self.pairs = list(pairs)
+        self.compute = compute
+
+    def _budget_key(self):
+        return f"pain_cloud_llm_calls_{datetime.now(timezone.utc).strftime('%Y-%m-%d')}"
+
+    def budget_used(self):
+        return self.cache.get(self._budget_key(), 0)
+
+    def _spend(self, calls):
+        key = self._budget_key()
+        with self.cache.transact():
+            self.cache.set(key, self.cache.get(key, 0) + calls, expire=2 * 86400)
+
+    def latest(self, persona, industry):
+        """The newest stored materialization {version, computed_at, result, llm_calls}, or None"""
+        record = self.cache.get(f"{_pair_key(persona, industry)}:latest")
+        if record is not None:
+            self._count("served")
+        return record
+
+    def materialize(self, persona, industry):
+        """Compute and store a new version for one pair; returns the record (or the error result, unstored)"""
+        lease_key = f"{_pair_key(persona, industry)}:lease"
+        token = uuid.uuid4().hex
+        if not self.cache.add(lease_key, token, expire=PAIN_CLOUD_LEASE_TTL):
+            return None
+        try:
+            result, llm_calls = self.compute(persona, industry)
+            self._spend(llm_calls)
+            if result.get("error"):
+                self._count("failed")
+                return {"result": result}
+            key = _pair_key(persona, industry)
+            with self.cache.transact():
+                previous = self.cache.get(f"{key}:latest")
+                version = previous["version"] + 1 if previous else 1
+                record = {"version": version, "computed_at": time.time(), "result": result, "llm_calls": llm_calls}
+                self.cache.set(f"{key}:v{version}", record)
+                self.cache.set(f"{key}:latest", record)
+                self.cache.delete(f"{key}:v{version - PAIN_CLOUD_VERSIONS_KEPT}")
+            self._count("materialized")
+            return record
+        finally:
+            if self.cache.get(lease_key) == token:
+                self.cache.delete(lease_key)
+
+    def _age(self, pair):
+        record = self.cache.get(f"{_pair_key(*pair)}:latest")
+        return time.time() - record["computed_at"] if record else float("inf")
+
+    def run_once(self):
+        """Recompute stale pairs, stalest first, until the day's LLM budget is spent"""
+        self._count("runs")
+        for pair in sorted(self.pairs, key=self._age, reverse=True):
+            if self.budget_used() >= self.llm_budget:
+                print(f"⚠️ Pain cloud materializer: daily LLM budget of {self.llm_budget} calls spent")
+                break
+            if self._age(pair) < self.max_age:
+                break
+            try:
+                self.materialize(*pair)
+            except Exception as e:
+                self._count("failed")
+                print(f"❌ Pain cloud materialization failed for {pair}: {e}")
+
+    def _run(self):
+        while True:
+            if datetime.now(timezone.utc).hour in self.off_peak_hours:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"❌ Pain cloud materializer error: {e}")
+            time.sleep(PAIN_CLOUD_CHECK_INTERVAL)
+
+    def start(self):
+        """Start the off-peak materialization loop (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="pain-cloud-materializer", daemon=True)
+        self._thread.start()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update(pairs=len(self.pairs), llm_budget=self.llm_budget, llm_calls_today=self.budget_used(),
+                     materialized_pairs=sum(1 for pair in self.pairs if self._age(pair) != float("inf")))
+        return stats
+
+
+# Create singleton instance
+pain_cloud_materializer = PainCloudMaterializer()
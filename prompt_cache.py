@@ -0,0 +1,187 @@
+import hashlib
+import itertools
+import json
+import re
+import threading
+
+from diskcache import Cache
+
+# TTL tiers (seconds) per cache namespace; anything unlisted uses "default"
+ENDPOINT_TTLS = {
+    "default": 3600,
+    "completion": 1800,
+    "radargpt_result": 3600,
+    "vertical_insights": 3600,
+    "vertical_insights_fallback": 1800,
+    "vertical_chat": 1800,
+}
+
+PROMPT_CACHE_DIR = "prompt_cache"
+PROMPT_CACHE_SIZE_LIMIT = 512 * 1024 * 1024  # 512 MB, LRU-evicted beyond this
+NEAR_DUPLICATE_THRESHOLD = 0.8
+NEAR_DUPLICATE_INDEX_SIZE = 500  # past keywords remembered per namespace/bucket
+MINHASH_PERMUTATIONS = 64
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# A token is alphanumerics plus "+" and "#"; a dot counts when a token character follows it
+_TOKEN_RE = re.compile(r"\.?[a-z0-9](?:[a-z0-9+#]|\.(?=[a-z0-9]))*")
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.sha256(f"a{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME | 1,
+     int.from_bytes(hashlib.sha256(f"b{i}".encode()).digest()[:8], "big") % _MERSENNE_PRIME)
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+
+def normalize_text(text):
+    """
+    Canonical form for cache keys: lowercase, surrounding punctuation dropped,
+    whitespace collapsed and naive plural stripping, so "CRM tools" == "crm  tool".
+    Symbols that change meaning are kept: "c++", "c#" and ".net" stay distinct
+    from "c" and "net", and dots inside tokens survive ("node.js", "2.0").
+    """
+    words = []
+    for word in _TOKEN_RE.findall(str(text).lower()):
+        if len(word) > 3 and word.isalpha() and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return " ".join(words)
+
+
+def _canonical(value):
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def minhash_signature(text):
+    """MinHash signature over character 3-shingles of the normalized text"""
+    text = normalize_text(text)
+    shingles = {text[i:i + 3] for i in range(max(len(text) - 2, 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def estimate_similarity(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _replay(record):
+    start = 0
+    for end in record["bounds"]:
+        yield record["text"][start:end]
+        start = end
+
+
+class PromptCache:
+    """
+    Prompt-level response cache in front of the LLM helpers.
+
+    Keys are SHA-256 over the namespace, the whitespace-collapsed template and
+    the normalize_text()-canonicalized parameters. When a lookup names a
+    `fuzzy` parameter (usually the search keyword), an exact miss falls back
+    to a MinHash near-duplicate lookup over past values of that parameter for
+    the same namespace and other params.
+    """
+
+    def __init__(self, directory=PROMPT_CACHE_DIR, size_limit=PROMPT_CACHE_SIZE_LIMIT, ttls=None,
+                 near_duplicate_threshold=NEAR_DUPLICATE_THRESHOLD):
+        self.cache = Cache(directory, size_limit=size_limit, eviction_policy="least-recently-used")
+        self.ttls = dict(ENDPOINT_TTLS, **(ttls or {}))
+        self.near_duplicate_threshold = near_duplicate_threshold
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, namespace, outcome):
+        with self._lock:
+            counters = self._stats.setdefault(namespace, {"hits": 0, "near_hits": 0, "misses": 0, "sets": 0})
+            counters[outcome] += 1
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.ttls["default"])
+
+    def make_key(self, namespace, template="", **params):
+        payload = json.dumps(
+            {"t": " ".join(str(template).split()), "p": {k: _canonical(v) for k, v in sorted(params.items())}},
+            sort_keys=True, default=str,
+        )
+        return f"prompt:{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def _index_key(self, namespace, template, fuzzy, params):
+        rest = {k: v for k, v in params.items() if k != fuzzy}
+        return self.make_key(f"{namespace}:near:{fuzzy}", template, **rest)
+
+    def get(self, namespace, template="", fuzzy=None, **params):
+        """Return the cached value or None; `fuzzy` names the param eligible for near-duplicate matching"""
+        key = self.make_key(namespace, template, **params)
+        value = self.cache.get(key)
+        if value is not None:
+            self._count(namespace, "hits")
+            return value
+        if fuzzy and params.get(fuzzy):
+            signature = minhash_signature(params[fuzzy])
+            best_key, best_score = None, 0.0
+            for entry_key, entry_signature in self.cache.get(self._index_key(namespace, template, fuzzy, params), []):
+                score = estimate_similarity(signature, entry_signature)
+                if score > best_score:
+                    best_key, best_score = entry_key, score
+            if best_key and best_score >= self.near_duplicate_threshold:
+                value = self.cache.get(best_key)
+                if value is not None:
+                    self._count(namespace, "near_hits")
+                    return value
+        self._count(namespace, "misses")
+        return None
+
+    def set(self, namespace, value, template="", fuzzy=None, expire=None, **params):
+        key = self.make_key(namespace, template, **params)
+        self.cache.set(key, value, expire=expire or self.ttl_for(namespace))
+        self._count(namespace, "sets")
+        if fuzzy and params.get(fuzzy):
+            index_key = self._index_key(namespace, template, fuzzy, params)
+            with self.cache.transact():
+                index = [entry for entry in self.cache.get(index_key, []) if entry[0] != key]
+                index.append((key, minhash_signature(params[fuzzy])))
+                self.cache.set(index_key, index[-NEAR_DUPLICATE_INDEX_SIZE:])
+        return key
+
+    def record_stream(self, namespace, chunks, template="", fuzzy=None, expire=None, **params):
+        """
+        Tee a chunk iterator: every chunk is yielded unchanged and appended to a
+        log, and once the stream completes the log is stored as one compact
+        record (joined text plus chunk end offsets) for replay_stream().
+        Streams that raise, are abandoned or produce an error are not stored.
+        """
+        log = []
+        for chunk in chunks:
+            log.append(chunk)
+            yield chunk
+        text = "".join(log)
+        if text.strip() and not text.startswith("Error:"):
+            record = {"text": text, "bounds": list(itertools.accumulate(len(chunk) for chunk in log))}
+            self.set(f"{namespace}:stream", record, template, fuzzy=fuzzy,
+                     expire=expire or self.ttl_for(namespace), **params)
+
+    def replay_stream(self, namespace, template="", fuzzy=None, **params):
+        """Return a generator replaying a recorded stream with its original chunk boundaries, or None on a miss"""
+        record = self.get(f"{namespace}:stream", template, fuzzy=fuzzy, **params)
+        if record is None:
+            return None
+        return _replay(record)
+
+    def delete(self, namespace, template="", **params):
+        return self.cache.delete(self.make_key(namespace, template, **params))
+
+    def stats(self):
+        with self._lock:
+            stats = {namespace: dict(counters) for namespace, counters in self._stats.items()}
+        for counters in stats.values():
+            lookups = counters["hits"] + counters["near_hits"] + counters["misses"]
+            counters["hit_rate"] = round((counters["hits"] + counters["near_hits"]) / lookups, 3) if lookups else 0.0
+        return {"namespaces": stats, "entries": len(self.cache), "size_bytes": self.cache.volume()}
+
+
+# Create singleton instance
+prompt_cache = PromptCache()
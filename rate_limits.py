@@ -0,0 +1,257 @@
+import math
+import re
+import threading
+import time
+
+# Per-key defaults until the provider tells us otherwise (Groq free tier)
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 6000
+DEFAULT_RETRY_AFTER = 60  # used for a 429 that carries no retry/reset hint
+
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 8
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+
+
+def estimate_tokens(text):
+    """Cheap local token estimate (~4 characters per token) for a prompt"""
+    if not text:
+        return MESSAGE_OVERHEAD_TOKENS
+    return int(math.ceil(len(text) / CHARS_PER_TOKEN)) + MESSAGE_OVERHEAD_TOKENS
+
+
+def parse_reset_seconds(value):
+    """
+    Parse a rate-limit reset value into seconds.
+    Accepts Groq-style durations ("2m59.56s", "7.66s", "120ms"), plain seconds
+    ("30") and epoch timestamps in seconds or milliseconds (OpenRouter).
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        parts = _DURATION_PART.findall(value)
+        if not parts:
+            return None
+        seconds = 0.0
+        for amount, unit in parts:
+            amount = float(amount)
+            if unit == 'h':
+                seconds += amount * 3600
+            elif unit == 'm':
+                seconds += amount * 60
+            elif unit == 's':
+                seconds += amount
+            else:
+                seconds += amount / 1000
+        return seconds
+    now = time.time()
+    if number > 1e12:  # epoch milliseconds
+        return max(number / 1000 - now, 0.0)
+    if number > 1e9:  # epoch seconds
+        return max(number - now, 0.0)
+    return max(number, 0.0)
+
+
+def error_headers(e):
+    """Response headers carried by a provider SDK exception, if any"""
+    response = getattr(e, 'response', None)
+    return getattr(response, 'headers', None)
+
+
+def _header(headers, *names):
+    if not headers:
+        return None
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            return value
+    return None
+
+
+def _as_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket; capacity refills linearly over `window` seconds"""
+
+    def __init__(self, capacity, window=60.0):
+        self.capacity = float(capacity)
+        self.window = window
+        self.rate = self.capacity / window
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost, now):
+        """Seconds until `cost` tokens are available (cost is clamped to capacity)"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        cost = min(cost, self.capacity)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate if self.rate > 0 else self.window
+
+    def take(self, cost, now):
+        self._refill(now)
+        self.tokens -= min(cost, self.capacity)
+
+    def give_back(self, amount, now):
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, remaining, limit=None, reset_seconds=None, now=None, lower_only=False):
+        """
+        Adopt the provider's view of this bucket. With `lower_only` the
+        provider's figure can only shrink the local estimate (used when the
+        provider's window differs from the bucket's).
+        """
+        now = now or time.time()
+        self._refill(now)
+        if limit is not None and limit > 0:
+            self.capacity = float(limit)
+            self.rate = self.capacity / self.window
+        if remaining is not None:
+            remaining = min(float(remaining), self.capacity)
+            self.tokens = min(self.tokens, remaining) if lower_only else remaining
+            if remaining <= 0 and reset_seconds:
+                self.blocked_until = max(self.blocked_until, now + reset_seconds)
+
+    def block(self, until):
+        self.blocked_until = max(self.blocked_until, until)
+
+
+class KeyRateLimiter:
+    """
+    Per-key requests-per-minute and tokens-per-minute buckets.
+
+    Buckets start from configured defaults and are re-synced from the
+    x-ratelimit-* / retry-after headers on every response, so pacing follows
+    each key's real remaining quota instead of a fixed delay.
+    """
+
+    def __init__(self, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                 tokens_per_minute=DEFAULT_TOKENS_PER_MINUTE, sync_request_limit=False):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # Groq reports requests-per-day in x-ratelimit-limit-requests, so only
+        # adopt the provider's request limit when it is known to be per minute.
+        self.sync_request_limit = sync_request_limit
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._rate_limited = 0
+
+    def _get(self, key):
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = {
+                "requests": TokenBucket(self.requests_per_minute),
+                "tokens": TokenBucket(self.tokens_per_minute),
+            }
+            self._buckets[key] = buckets
+        return buckets
+
+    def reserve(self, key, token_cost):
+        """
+        Try to reserve one request and `token_cost` tokens on `key`.
+        Returns 0 on success, otherwise the number of seconds to wait.
+        """
+        with self._lock:
+            now = time.time()
+            buckets = self._get(key)
+            wait = max(buckets["requests"].wait_time(1, now), buckets["tokens"].wait_time(token_cost, now))
+            if wait > 0:
+                return wait
+            buckets["requests"].take(1, now)
+            buckets["tokens"].take(token_cost, now)
+            return 0.0
+
+    def ready_in(self, key, token_cost=0):
+        """Seconds until `key` could serve a request of `token_cost` tokens"""
+        with self._lock:
+            now = time.time()
+            buckets = self._get(key)
+            return max(buckets["requests"].wait_time(1, now), buckets["tokens"].wait_time(token_cost, now))
+
+    def observe(self, key, headers=None, reserved_tokens=0, used_tokens=None):
+        """Reconcile a key's buckets after a successful response"""
+        with self._lock:
+            now = time.time()
+            buckets = self._get(key)
+            if used_tokens is not None and reserved_tokens > used_tokens:
+                buckets["tokens"].give_back(reserved_tokens - used_tokens, now)
+            self._sync_headers(buckets, headers, now)
+
+    def observe_rate_limited(self, key, headers=None):
+        """
+        Record a 429 on `key`. Returns the number of seconds the key is benched for,
+        taken from retry-after, then the reset headers, then DEFAULT_RETRY_AFTER.
+        """
+        with self._lock:
+            now = time.time()
+            buckets = self._get(key)
+            self._rate_limited += 1
+            self._sync_headers(buckets, headers, now)
+            retry_after = parse_reset_seconds(_header(headers, 'retry-after', 'Retry-After'))
+            if retry_after is None:
+                resets = [parse_reset_seconds(_header(headers, name)) for name in (
+                    'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens', 'x-ratelimit-reset', 'X-RateLimit-Reset')]
+                resets = [r for r in resets if r]
+                retry_after = max(resets) if resets else DEFAULT_RETRY_AFTER
+            for bucket in buckets.values():
+                bucket.block(now + retry_after)
+            return retry_after
+
+    def _sync_headers(self, buckets, headers, now):
+        if not headers:
+            return
+        remaining = _as_number(_header(headers, 'x-ratelimit-remaining-tokens'))
+        if remaining is not None:
+            buckets["tokens"].sync(
+                remaining,
+                limit=_as_number(_header(headers, 'x-ratelimit-limit-tokens')),
+                reset_seconds=parse_reset_seconds(_header(headers, 'x-ratelimit-reset-tokens')),
+                now=now,
+            )
+        remaining = _as_number(_header(headers, 'x-ratelimit-remaining-requests', 'x-ratelimit-remaining', 'X-RateLimit-Remaining'))
+        if remaining is not None:
+            limit = _as_number(_header(headers, 'x-ratelimit-limit-requests', 'x-ratelimit-limit', 'X-RateLimit-Limit'))
+            buckets["requests"].sync(
+                remaining,
+                limit=limit if self.sync_request_limit else None,
+                reset_seconds=parse_reset_seconds(_header(
+                    headers, 'x-ratelimit-reset-requests', 'x-ratelimit-reset', 'X-RateLimit-Reset')),
+                now=now,
+                lower_only=not self.sync_request_limit,
+            )
+
+    def status(self):
+        with self._lock:
+            now = time.time()
+            keys = {}
+            for key, buckets in self._buckets.items():
+                for bucket in buckets.values():
+                    bucket._refill(now)
+                keys[f"{key[:6]}..."] = {
+                    "requests_available": round(buckets["requests"].tokens, 1),
+                    "requests_per_minute": round(buckets["requests"].capacity),
+                    "tokens_available": round(buckets["tokens"].tokens),
+                    "tokens_per_minute": round(buckets["tokens"].capacity),
+                    "blocked_for": round(max(max(b.blocked_until for b in buckets.values()) - now, 0), 1),
+                }
+            return {"rate_limited_responses": self._rate_limited, "keys": keys}
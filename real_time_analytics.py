@@ -12,9 +12,11 @@ from collections import Counter
 from textblob import TextBlob
 import requests
 from sqlalchemy import text
-import praw
 from dotenv import load_dotenv
 import logging
+from reddit_access import reddit_access, PRIORITY_BACKGROUND
+from stackexchange_client import stackexchange
+from corpus_store import corpus_store
 
 # Load environment variables
 load_dotenv()
@@ -23,12 +25,33 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s – %(levelname)s – %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize Reddit API
-reddit = praw.Reddit(
-    client_id=os.getenv("REDDIT_CLIENT_ID"),
-    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-    user_agent=os.getenv("REDDIT_USER_AGENT")
-)
+# Initialize Reddit API (shared client and request budget)
+reddit = reddit_access.client("real_time_analytics", priority=PRIORITY_BACKGROUND)
+
+def _to_corpus_item(result):
+    # Trend rows carry no source-specific payload, so the app's richer payload for the same URL is kept
+    return {
+        "url": result["url"],
+        "title": result["title"],
+        "text": result["text"],
+        "score": result["score"],
+        "published_at": result["timestamp"].timestamp()
+    }
+
+
+def _from_corpus_row(source):
+    def from_row(row):
+        return {
+            "source": source,
+            "title": row["title"],
+            "text": row["text"],
+            "url": row["url"],
+            # Only dated rows reach here (search_or_fetch(since=...)); fetch time would flatten the series
+            "timestamp": datetime.fromtimestamp(row["published_at"]),
+            "score": row["score"] or 0
+        }
+    return from_row
+
 
 class RealTimeAnalytics:
     """Class for real-time trend analysis and competitive intelligence"""
@@ -38,11 +61,8 @@ class RealTimeAnalytics:
         # (Optional) Initialize Reddit client (if credentials are available)
         self.reddit_client = None
         try:
-            client_id = os.getenv("REDDIT_CLIENT_ID")
-            client_secret = os.getenv("REDDIT_CLIENT_SECRET")
-            user_agent = os.getenv("REDDIT_USER_AGENT", "PainRadar Trending Bot (by /u/your_username)")
-            if client_id and client_secret:
-                 self.reddit_client = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
+            if reddit_access.configured():
+                 self.reddit_client = reddit
                  logger.info("Reddit client initialized.")
             else:
                  logger.warning("Reddit credentials (client_id, client_secret) not found in .env. Reddit trending topics will not be fetched.")
@@ -72,11 +92,17 @@ class RealTimeAnalytics:
         return combined_data
     
     def _get_reddit_data(self, keyword, days):
+        """Reddit data for a keyword, from the local corpus when it already holds enough matches"""
+        return corpus_store.search_or_fetch("reddit", keyword, lambda needed: self._fetch_reddit_data(keyword, needed),
+                                            _to_corpus_item, _from_corpus_row("reddit"), limit=100, min_results=50,
+                                            since=time.time() - days * 86400)
+
+    def _fetch_reddit_data(self, keyword, limit=100):
         """Get real-time data from Reddit"""
         results = []
         try:
             # Get submissions from Reddit
-            for submission in self.reddit_client.subreddit("all").search(keyword, sort="new", time_filter="month", limit=100):
+            for submission in self.reddit_client.subreddit("all").search(keyword, sort="new", time_filter="month", limit=limit):
                 created_date = datetime.fromtimestamp(submission.created_utc)
                 results.append({
                     "source": "reddit",
@@ -92,31 +118,26 @@ class RealTimeAnalytics:
         return results
     
     def _get_stackoverflow_data(self, keyword, days):
+        """Stack Overflow data for a keyword, from the local corpus when it already holds enough matches"""
+        return corpus_store.search_or_fetch("stackoverflow", keyword, lambda needed: self._fetch_stackoverflow_data(keyword, needed),
+                                            _to_corpus_item, _from_corpus_row("stackoverflow"), limit=100,
+                                            min_results=50, since=time.time() - days * 86400)
+
+    def _fetch_stackoverflow_data(self, keyword, limit=100):
         """Get real-time data from Stack Overflow"""
         results = []
         try:
             # Use Stack Exchange API
-            url = "https://api.stackexchange.com/2.3/search/advanced"
-            resp = requests.get(url, params={
-                "order": "desc",
-                "sort": "creation",
-                "q": keyword,
-                "site": "stackoverflow",
-                "pagesize": 100
-            })
-            
-            if resp.status_code == 200:
-                data = resp.json()
-                for item in data.get("items", []):
-                    created_date = datetime.fromtimestamp(item.get("creation_date", 0))
-                    results.append({
-                        "source": "stackoverflow",
-                        "title": item.get("title", ""),
-                        "text": "",  # API doesn't provide body in search
-                        "url": item.get("link", ""),
-                        "timestamp": created_date,
-                        "score": item.get("score", 0)
-                    })
+            for item in stackexchange.search(keyword, pagesize=min(limit, 100), sort="creation"):
+                created_date = datetime.fromtimestamp(item.get("creation_date", 0))
+                results.append({
+                    "source": "stackoverflow",
+                    "title": item.get("title", ""),
+                    "text": "",  # API doesn't provide body in search
+                    "url": item.get("link", ""),
+                    "timestamp": created_date,
+                    "score": item.get("score", 0)
+                })
             print(f"Found {len(results)} Stack Overflow results for {keyword}")
         except Exception as e:
             print(f"Error fetching Stack Overflow data: {e}")
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+import praw
+import requests
+from diskcache import Cache
+from requests.adapters import HTTPAdapter
+
+from rate_limits import parse_reset_seconds
+
+REDDIT_REQUESTS_PER_MINUTE = int(os.getenv("REDDIT_REQUESTS_PER_MINUTE", "90"))  # OAuth allows 100 QPM
+REDDIT_BUDGET_DIR = "radargpt_cache"  # shared by every gunicorn worker
+REDDIT_BUDGET_KEY = "reddit_request_budget"
+BACKGROUND_RESERVE = 0.25  # share of the bucket only interactive callers may spend
+MAX_SLEEP = 1.0
+
+PRIORITY_INTERACTIVE = "interactive"  # user-facing request paths
+PRIORITY_BACKGROUND = "background"  # analytics, trend refreshes, crawlers
+
+
+class _BudgetedSession:
+    """
+    requests.Session stand-in handed to PRAW: every HTTP call first takes a
+    token from the shared Reddit budget on behalf of `caller`, then goes out
+    over the one shared keep-alive session.
+    """
+
+    def __init__(self, access, caller, priority):
+        self._access = access
+        self._caller = caller
+        self._priority = priority
+
+    def request(self, *args, **kwargs):
+        self._access.acquire(self._caller, self._priority)
+        response = self._access.session.request(*args, **kwargs)
+        self._access.observe(response.headers)
+        return response
+
+    def close(self):
+        pass  # the shared session outlives any one PRAW client
+
+    def __getattr__(self, name):
+        return getattr(self._access.session, name)
+
+
+class RedditAccess:
+    """
+    Process-wide Reddit access layer.
+
+    Every PRAW client in the app comes from here and sends its HTTP traffic
+    through one keep-alive session. Each request takes a token from a single
+    requests-per-minute bucket whose state lives in the shared diskcache
+    directory, so all gunicorn workers spend one budget. Background callers
+    cannot dip into the last BACKGROUND_RESERVE of the bucket, which keeps
+    headroom for interactive searches. Reddit's x-ratelimit headers pause the
+    bucket when the real quota runs out.
+    """
+
+    def __init__(self, requests_per_minute=REDDIT_REQUESTS_PER_MINUTE, directory=REDDIT_BUDGET_DIR):
+        self.capacity = float(requests_per_minute)
+        self.rate = self.capacity / 60.0
+        self.cache = Cache(directory)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=32)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._clients = {}
+        self._calls = {}
+
+    @staticmethod
+    def configured():
+        return bool(os.getenv("REDDIT_CLIENT_ID") and os.getenv("REDDIT_CLIENT_SECRET"))
+
+    def new_client(self, caller, priority=PRIORITY_INTERACTIVE):
+        """A fresh PRAW client on the shared session and budget (one per thread for concurrent use)"""
+        return praw.Reddit(
+            client_id=os.getenv("REDDIT_CLIENT_ID"),
+            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+            user_agent=os.getenv("REDDIT_USER_AGENT", "PainRadar Trending Bot (by /u/your_username)"),
+            requestor_kwargs={"session": _BudgetedSession(self, caller, priority)},
+        )
+
+    def client(self, caller, priority=PRIORITY_INTERACTIVE):
+        """The shared PRAW client for `caller`, created on first use"""
+        with self._lock:
+            client = self._clients.get(caller)
+            if client is None:
+                client = self._clients[caller] = self.new_client(caller, priority)
+            return client
+
+    def _try_take(self, priority):
+        """Take one token from the shared bucket; returns 0 or the seconds to wait"""
+        need = 1 + (self.capacity * BACKGROUND_RESERVE if priority == PRIORITY_BACKGROUND else 0)
+        with self.cache.transact():
+            now = time.time()
+            state = self.cache.get(REDDIT_BUDGET_KEY) or {"tokens": self.capacity, "updated": now, "blocked_until": 0}
+            state["tokens"] = min(self.capacity, state["tokens"] + max(now - state["updated"], 0) * self.rate)
+            state["updated"] = now
+            if now < state["blocked_until"]:
+                wait = state["blocked_until"] - now
+            elif state["tokens"] >= need:
+                state["tokens"] -= 1
+                wait = 0.0
+            else:
+                wait = (need - state["tokens"]) / self.rate
+            self.cache.set(REDDIT_BUDGET_KEY, state)
+        return wait
+
+    def acquire(self, caller, priority=PRIORITY_INTERACTIVE):
+        """Block until the shared budget allows one more Reddit request for `caller`"""
+        start = time.time()
+        while True:
+            wait = self._try_take(priority)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, MAX_SLEEP))
+        with self._lock:
+            counters = self._calls.setdefault(caller, {"requests": 0, "wait_seconds": 0.0, "priority": priority})
+            counters["requests"] += 1
+            counters["wait_seconds"] += time.time() - start
+
+    def observe(self, headers):
+        """Pause the shared bucket until Reddit's reset when its x-ratelimit-remaining runs out"""
+        try:
+            remaining = float(headers.get("x-ratelimit-remaining", "inf"))
+        except (TypeError, ValueError):
+            return
+        if remaining >= 1:
+            return
+        reset = parse_reset_seconds(headers.get("x-ratelimit-reset")) or 60
+        with self.cache.transact():
+            state = self.cache.get(REDDIT_BUDGET_KEY)
+            if state is not None:
+                state["blocked_until"] = max(state["blocked_until"], time.time() + reset)
+                state["tokens"] = 0.0
+                self.cache.set(REDDIT_BUDGET_KEY, state)
+
+    def stats(self):
+        state = self.cache.get(REDDIT_BUDGET_KEY) or {}
+        with self._lock:
+            calls = {caller: dict(c, wait_seconds=round(c["wait_seconds"], 3)) for caller, c in self._calls.items()}
+        return {
+            "requests_per_minute": self.capacity,
+            "tokens_available": round(state.get("tokens", self.capacity), 1),
+            "blocked_for": round(max(state.get("blocked_until", 0) - time.time(), 0), 1),
+            "calls": calls,
+        }
+
+
+# Create singleton instance
+reddit_access = RedditAccess()
@@ -0,0 +1,102 @@
+import threading
+
+from bounded_executors import executors, remaining
+
+LISTING_PAGE_SIZE = 100  # Reddit's maximum listing page
+LISTING_LOCK_STRIPES = 64  # listing extensions of one search serialize on one of these locks
+COMMENTS_TIMEOUT = 30  # all comment trees of one fetch, on the shared page_fetch executor
+LISTING_TTL = 1800  # cached search cursors
+COMMENTS_TTL = 3600
+MAX_COMMENTS = 10
+
+
+class RedditFetcher:
+    """
+    Concurrent Reddit fetch engine behind get_reddit_posts_with_replies.
+
+    A search is read as whole listing pages (100 submissions per call) whose
+    post data and `after` cursor are cached per subreddit+keyword, so asking
+    for posts start..start+N extends the cached listing from its cursor
+    instead of re-reading pages 0..N-1. Comment trees for the requested posts
+    are then fetched concurrently on the shared page_fetch executor, so they
+    count against the process-wide concurrency caps.
+
+    PRAW clients are not thread-safe, so each worker thread gets its own
+    client from `client_factory`; clients from reddit_access share one
+    request budget, so the pool stays inside Reddit's OAuth limits.
+    """
+
+    def __init__(self, client_factory, cache):
+        self.client_factory = client_factory
+        self.cache = cache
+        self._local = threading.local()
+        # Striped rather than one lock per search, so the set stays bounded however many searches are seen
+        self._listing_locks = [threading.Lock() for _ in range(LISTING_LOCK_STRIPES)]
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+        return client
+
+    def _listing_lock(self, key):
+        return self._listing_locks[hash(key) % LISTING_LOCK_STRIPES]
+
+    def _search_page(self, subreddit, keyword, after):
+        params = {"after": after} if after else {}
+        submissions = list(self._client().subreddit(subreddit).search(keyword, limit=LISTING_PAGE_SIZE, params=params))
+        posts = [{
+            "id": s.id,
+            "title": s.title or "",
+            "selftext": s.selftext or "",
+            "url": s.url or "",
+            "created_utc": s.created_utc,
+        } for s in submissions]
+        next_after = submissions[-1].fullname if len(submissions) == LISTING_PAGE_SIZE else None
+        return posts, next_after
+
+    def _listing(self, subreddit, keyword, needed):
+        """Cached search listing extended page by page until it holds `needed` posts or runs out"""
+        key = f"reddit_listing_{subreddit}_{keyword}"
+        with self._listing_lock(key):
+            listing = self.cache.get(key) or {"posts": [], "after": None, "exhausted": False}
+            fetched = False
+            while len(listing["posts"]) < needed and not listing["exhausted"]:
+                posts, after = self._search_page(subreddit, keyword, listing["after"])
+                listing["posts"].extend(posts)
+                listing["after"] = after
+                listing["exhausted"] = after is None
+                fetched = True
+            if fetched:
+                self.cache.set(key, listing, expire=LISTING_TTL)
+            return listing["posts"]
+
+    def _comments(self, submission_id):
+        key = f"reddit_comments_{submission_id}"
+        comments = self.cache.get(key)
+        if comments is not None:
+            return comments
+        try:
+            submission = self._client().submission(id=submission_id)
+            submission.comments.replace_more(limit=0)
+            comments = [c.body or "" for c in submission.comments.list()[:MAX_COMMENTS]]
+        except Exception as e:
+            print(f"Reddit comments error for {submission_id}: {e}")
+            return []
+        self.cache.set(key, comments, expire=COMMENTS_TTL)
+        return comments
+
+    def fetch(self, keyword, start=0, count=5, subreddit="all"):
+        """Posts start..start+count for a search, each with up to MAX_COMMENTS comments"""
+        posts = self._listing(subreddit, keyword, start + count)[start:start + count]
+        left = remaining()
+        comments = executors.page_fetch.map(self._comments, [post["id"] for post in posts],
+                                            timeout=COMMENTS_TIMEOUT if left is None else min(COMMENTS_TIMEOUT, left),
+                                            default=[])
+        return [{
+            "title": post["title"],
+            "selftext": post["selftext"],
+            "url": post["url"],
+            "created_utc": post.get("created_utc"),  # listings cached before it was kept lack it
+            "comments": post_comments,
+        } for post, post_comments in zip(posts, comments)]
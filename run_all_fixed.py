@@ -18,7 +18,7 @@ sys.path.insert(0, os.path.abspath('.'))
 from app import app, multi_source_search, scrape_complaintsboard_full_text
 
 # Patch the multi_source_search function to use the fixed scrapers
-def patched_multi_source_search(keyword):
+def patched_multi_source_search(keyword, deadline=None):
     results = {}
     import time
     from concurrent.futures import ThreadPoolExecutor, TimeoutError
@@ -51,7 +51,7 @@ def patched_multi_source_search(keyword):
                 print(f"Error for {name}: {str(e)}")
                 results[name] = []
     
-    return results
+    return {"results": results, "partial": False, "missing": []}
 
 # Monkey patch the function in the app module
 import app as app_module
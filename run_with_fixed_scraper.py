@@ -12,17 +12,17 @@ os.makedirs('radargpt_cache', exist_ok=True)
 
 # Import the original app
 sys.path.insert(0, os.path.abspath('.'))
-from app import app, multi_source_search
+from app import app, multi_source_search, MULTI_SOURCE_TIMEOUT
 
 # Import the fixed scraper
 from fixed_complaintsboard import get_complaintsboard_results
 
 # Patch the multi_source_search function to use the fixed scraper
-def patched_multi_source_search(keyword):
-    results = multi_source_search(keyword)
+def patched_multi_source_search(keyword, deadline=MULTI_SOURCE_TIMEOUT):
+    search = multi_source_search(keyword, deadline)
     # Replace the complaintsboard results with results from the fixed scraper
-    results['complaintsboard'] = get_complaintsboard_results(keyword)
-    return results
+    search['results']['complaintsboard'] = get_complaintsboard_results(keyword)
+    return search
 
 # Monkey patch the function in the app module
 import app as app_module
@@ -1,19 +1,21 @@
-import praw
 import requests
 from bs4 import BeautifulSoup
 from pytrends.request import TrendReq
+import html
 import time
 import logging
 import os
 from datetime import datetime, timedelta
 from diskcache import Cache
+from browser_pool import browser_pool
+from reddit_access import reddit_access
+from stackexchange_client import stackexchange
+from incremental_crawler import incremental_crawler, reddit_feed
 from config import PERSONA_SOURCES, EMOTIONAL_KEYWORDS, CACHE_SETTINGS, RATE_LIMITS, SCRAPING_SETTINGS
 import google.generativeai as genai
 from dotenv import load_dotenv
 import re
 from urllib.parse import urljoin
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
@@ -30,14 +32,12 @@ logger = logging.getLogger(__name__)
 # Initialize cache
 cache = Cache('./cache')
 
+REDDIT_WINDOW = 30 * 86400  # matches the old top(time_filter='month') listing
+
 class ScraperManager:
     def __init__(self):
-        # Initialize Reddit client
-        self.reddit = praw.Reddit(
-            client_id=os.getenv('REDDIT_CLIENT_ID'),
-            client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-            user_agent=os.getenv('REDDIT_USER_AGENT')
-        )
+        # Shared Reddit client and request budget
+        self.reddit = reddit_access.client('scraper_manager')
         
         # Initialize Google Trends client
         self.trends = TrendReq(hl='en-US', tz=360)
@@ -53,17 +53,19 @@ class ScraperManager:
         })
         self.cache = Cache("scraper_cache")
         self.driver = None
+        self._driver_lease = None
 
     def _init_driver(self):
+        """Lease a warm browser from the shared pool; _release_driver() hands it back"""
         if not self.driver:
-            options = webdriver.ChromeOptions()
-            options.add_argument("--headless")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
-            self.driver = webdriver.Chrome(service=Service(webdriver.ChromeDriverManager().install()), options=options)
+            self._driver_lease = browser_pool.lease()
+            self.driver = self._driver_lease.driver
+
+    def _release_driver(self):
+        if self.driver:
+            browser_pool.release(self._driver_lease)
+            self._driver_lease = None
+            self.driver = None
 
     def _get_cache_key(self, source, query):
         """Generate a cache key for a source and query."""
@@ -103,34 +105,29 @@ class ScraperManager:
             subreddits = PERSONA_SOURCES[persona]['reddit']
             all_posts = []
             
+            # Last month's posts from the incremental crawler's local store, top-scored per subreddit
+            recent = incremental_crawler.recent_reddit(subreddits, REDDIT_WINDOW)
             for subreddit_name in subreddits:
-                try:
-                    subreddit = self.reddit.subreddit(subreddit_name)
-                    
-                    # Get top posts from last 6 months
-                    for post in subreddit.top(time_filter='month', limit=SCRAPING_SETTINGS['max_results']):
-                        if (post.score >= SCRAPING_SETTINGS['min_score'] and 
-                            post.num_comments >= SCRAPING_SETTINGS['min_comments']):
-                            
-                            emotional_score = self._calculate_emotional_score(post.title + ' ' + post.selftext)
-                            
-                            all_posts.append({
-                                'source': 'reddit',
-                                'subreddit': subreddit_name,
-                                'title': post.title,
-                                'text': post.selftext,
-                                'score': post.score,
-                                'comments': post.num_comments,
-                                'url': f"https://reddit.com{post.permalink}",
-                                'timestamp': post.created_utc,
-                                'emotional_score': emotional_score
-                            })
-                            
-                    time.sleep(RATE_LIMITS['reddit'])
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping subreddit {subreddit_name}: {str(e)}")
-                    continue
+                posts = [row for row in recent if row['feed'] == reddit_feed(subreddit_name)]
+                posts.sort(key=lambda row: row['score'] or 0, reverse=True)
+                for row in posts[:SCRAPING_SETTINGS['max_results']]:
+                    num_comments = row['extra'].get('num_comments', 0)
+                    if ((row['score'] or 0) >= SCRAPING_SETTINGS['min_score'] and 
+                        num_comments >= SCRAPING_SETTINGS['min_comments']):
+                        
+                        emotional_score = self._calculate_emotional_score(row['title'] + ' ' + row['text'])
+                        
+                        all_posts.append({
+                            'source': 'reddit',
+                            'subreddit': subreddit_name,
+                            'title': row['title'],
+                            'text': row['text'],
+                            'score': row['score'],
+                            'comments': num_comments,
+                            'url': row['url'],
+                            'timestamp': row['published_at'],
+                            'emotional_score': emotional_score
+                        })
             
             # Cache the results
             self._cache_data('reddit', persona, all_posts)
@@ -140,6 +137,33 @@ class ScraperManager:
             logger.error(f"Error in scrape_reddit: {str(e)}")
             return []
 
+    def _stackoverflow_questions(self, ids):
+        """Question records by id: cached per question, the rest fetched 100 ids per API call with bodies"""
+        records = {}
+        missing = []
+        for question_id in ids:
+            record = self.cache.get(f"stackoverflow_question_{question_id}")
+            if record is None:
+                missing.append(question_id)
+            else:
+                records[question_id] = record
+
+        for item in stackexchange.questions(missing, body=True):
+            title = html.unescape(item.get('title', ''))
+            body = BeautifulSoup(item.get('body', ''), 'html.parser').get_text(' ', strip=True)
+            record = {
+                'title': title,
+                'text': body,
+                'url': item.get('link', ''),
+                'score': item.get('score', 0),
+                'answers': item.get('answer_count', 0),
+                'emotional_score': self._calculate_emotional_score(title + ' ' + body)
+            }
+            ttl = CACHE_SETTINGS['stackoverflow_closed_question' if item.get('closed_date') else 'stackoverflow_question']
+            self.cache.set(f"stackoverflow_question_{item['question_id']}", record, expire=ttl)
+            records[item['question_id']] = record
+        return records
+
     def scrape_stackoverflow(self, persona):
         """Scrape Stack Overflow for a persona."""
         try:
@@ -149,65 +173,31 @@ class ScraperManager:
                 return cached_data
 
             tags = PERSONA_SOURCES[persona]['stackoverflow']
-            all_questions = []
             
+            # Top-voted question ids per tag, then all bodies in batched /questions/{ids} calls
+            tag_ids = {}
             for tag in tags:
-                try:
-                    url = f"https://stackoverflow.com/questions/tagged/{tag}?sort=votes"
-                    response = self.session.get(url)
-                    response.raise_for_status()
-                    
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    questions = soup.select('.s-post-summary')
-                    
-                    for question in questions[:SCRAPING_SETTINGS['max_results']]:
-                        try:
-                            title_elem = question.select_one('.s-post-summary--content-title')
-                            if not title_elem:
-                                continue
-                            
-                            title = title_elem.text.strip()
-                            link = title_elem.find('a')['href']
-                            if not link.startswith('http'):
-                                link = 'https://stackoverflow.com' + link
-                            
-                            # Get question details
-                            score_elem = question.select_one('.s-post-summary--stats-item-number')
-                            score = int(score_elem.text.strip()) if score_elem else 0
-                            
-                            answers_elem = question.select_one('.s-post-summary--stats-item.has-answers')
-                            answers = int(answers_elem.text.strip()) if answers_elem else 0
-                            
-                            # Get question body
-                            question_response = self.session.get(link)
-                            question_response.raise_for_status()
-                            question_soup = BeautifulSoup(question_response.text, 'html.parser')
-                            body_elem = question_soup.select_one('.s-prose')
-                            body = body_elem.text.strip() if body_elem else ''
-                            
-                            emotional_score = self._calculate_emotional_score(title + ' ' + body)
-                            
-                            all_questions.append({
-                                'source': 'stackoverflow',
-                                'tag': tag,
-                                'title': title,
-                                'text': body,
-                                'url': link,
-                                'score': score,
-                                'answers': answers,
-                                'timestamp': datetime.now().timestamp(),
-                                'emotional_score': emotional_score
-                            })
-                            
-                            time.sleep(RATE_LIMITS['stackoverflow'])
-                            
-                        except Exception as e:
-                            logger.error(f"Error scraping question {link}: {str(e)}")
-                            continue
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping Stack Overflow tag {tag}: {str(e)}")
-                    continue
+                listing = stackexchange.fetch('questions', {
+                    'tagged': tag,
+                    'sort': 'votes',
+                    'order': 'desc',
+                    'site': 'stackoverflow'
+                }, pagesize=SCRAPING_SETTINGS['max_results'])
+                tag_ids[tag] = [item['question_id'] for item in listing]
+
+            records = self._stackoverflow_questions([qid for ids in tag_ids.values() for qid in ids])
+
+            all_questions = []
+            for tag, ids in tag_ids.items():
+                for question_id in ids:
+                    record = records.get(question_id)
+                    if record:
+                        all_questions.append(dict(
+                            record,
+                            source='stackoverflow',
+                            tag=tag,
+                            timestamp=datetime.now().timestamp()
+                        ))
             
             # Cache the results
             self._cache_data('stackoverflow', persona, all_questions)
@@ -332,9 +322,7 @@ class ScraperManager:
             logger.error(f"Error in scrape_complaintsboard: {str(e)}")
             return []
         finally:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
+            self._release_driver()
 
     def get_google_trends(self, persona):
         """Get Google Trends data for a persona."""
@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from diskcache import Cache
+
+from bounded_executors import ExecutorSaturated, executors
+
+ORCHESTRATOR_STATE_DIR = "radargpt_cache"  # shared by every gunicorn worker
+LATENCY_SAMPLES = 50  # most recent latencies kept per source
+LATENCY_PERCENTILE = 0.9
+LATENCY_HEADROOM = 1.5  # budget = p90 latency x headroom, capped by what is left of the deadline
+MIN_SOURCE_BUDGET = 2.0
+LATE_GRACE = 120  # sources left behind at the deadline may keep filling caches this much longer
+
+
+def _percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class SearchOrchestrator:
+    """
+    Fans a search out to several sources under one end-to-end deadline.
+
+    Each source gets its own budget from the latency of its recent calls:
+    its p90 with some headroom, but never more than the deadline allows.
+    A source whose median latency already exceeds the deadline is still
+    started, but the response does not wait for it. Sources that miss their
+    budget are reported in `missing` and the result is flagged `partial`.
+    They are not cancelled: they run on for up to LATE_GRACE seconds, so
+    their results still reach the caches and corpus (and their latency is
+    still recorded) for the next request. Latency samples live in the shared
+    diskcache directory, so every gunicorn worker learns from every call.
+    """
+
+    def __init__(self, executor=None, directory=ORCHESTRATOR_STATE_DIR):
+        self.executor = executor or executors.source_fetch
+        self.cache = Cache(directory)
+        self._lock = threading.Lock()
+        self._sources = set()
+        self._stats = {"searches": 0, "partial": 0, "late_results": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _latency_key(self, source):
+        return f"search_latency_{source}"
+
+    def record(self, source, seconds):
+        key = self._latency_key(source)
+        with self.cache.transact():
+            samples = self.cache.get(key, [])
+            self.cache.set(key, (samples + [round(seconds, 3)])[-LATENCY_SAMPLES:])
+
+    def latencies(self, source):
+        return self.cache.get(self._latency_key(source), [])
+
+    def budget(self, source, remaining):
+        """Seconds to wait for `source` when `remaining` seconds are left (0: do not wait at all)"""
+        samples = self.latencies(source)
+        if not samples:
+            return remaining
+        if _percentile(samples, 0.5) > remaining:
+            return 0.0
+        return min(remaining, max(MIN_SOURCE_BUDGET, _percentile(samples, LATENCY_PERCENTILE) * LATENCY_HEADROOM))
+
+    def search(self, sources, deadline, default=list, on_late=None):
+        """
+        Run `sources` ({name: zero-arg callable}) within `deadline` seconds.
+        Returns {"results", "partial", "missing", "elapsed"}: results maps every
+        source to its value, or default() if it failed or missed its budget.
+        on_late(name, value) is called for sources that finish after that.
+        """
+        self._count("searches")
+        started = time.monotonic()
+        budgets = {name: self.budget(name, deadline) for name in sources}
+        with self._lock:
+            self._sources.update(sources)
+        late = set()
+        lock = threading.Lock()
+
+        def finished(name):
+            def callback(future):
+                if not future.cancelled() and isinstance(future.exception(), ExecutorSaturated):
+                    return  # never ran, so it says nothing about the source's latency
+                self.record(name, time.monotonic() - started)
+                with lock:
+                    was_late = name in late
+                if was_late and not future.cancelled() and future.exception() is None:
+                    self._count("late_results")
+                    if on_late is not None:
+                        on_late(name, future.result())
+            return callback
+
+        futures = {}
+        for name, call in sources.items():
+            future = self.executor.spawn(call, deadline=started + deadline + LATE_GRACE)
+            future.add_done_callback(finished(name))
+            futures[name] = future
+
+        pending = set(futures)
+        while pending:
+            now = time.monotonic()
+            expired = {name for name in pending if now - started >= budgets[name]}
+            if expired:
+                with lock:
+                    late.update(name for name in expired if not futures[name].done())
+                pending -= expired
+                if not pending:
+                    break
+            next_expiry = min(started + budgets[name] for name in pending)
+            done, _ = wait([futures[name] for name in pending], timeout=max(next_expiry - time.monotonic(), 0),
+                           return_when=FIRST_COMPLETED)
+            pending -= {name for name in pending if futures[name] in done}
+
+        results, missing = {}, []
+        for name, future in futures.items():
+            with lock:
+                is_late = name in late
+            if is_late:
+                missing.append(name)
+                print(f"⏱️ {name} missed its {budgets[name]:.1f}s budget; its results will warm the cache")
+                results[name] = default()
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"❌ {name} failed: {e}")
+                results[name] = default()
+        if missing:
+            self._count("partial")
+        return {
+            "results": results,
+            "partial": bool(missing),
+            "missing": missing,
+            "elapsed": round(time.monotonic() - started, 3),
+        }
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            sources = sorted(self._sources)
+        stats["latency"] = {}
+        for name in sources:
+            samples = self.latencies(name)
+            if samples:
+                stats["latency"][name] = {"samples": len(samples), "p50": _percentile(samples, 0.5),
+                                          "p90": _percentile(samples, LATENCY_PERCENTILE)}
+        return stats
+
+
+# Create singleton instance
+search_orchestrator = SearchOrchestrator()
@@ -57,7 +57,7 @@ sys.path.insert(0, os.path.abspath('.'))
 from app import app, multi_source_search
 
 # Patch the multi_source_search function to use the simplified ProductHunt scraper
-def patched_multi_source_search(keyword):
+def patched_multi_source_search(keyword, deadline=None):
     results = {}
     import time
     from concurrent.futures import ThreadPoolExecutor, TimeoutError
@@ -95,7 +95,7 @@ def patched_multi_source_search(keyword):
         results["producthunt"] = simple_producthunt_scraper(keyword)
         print(f"Added fallback ProductHunt results for {keyword}")
     
-    return results
+    return {"results": results, "partial": False, "missing": []}
 
 # Monkey patch the function in the app module
 import app as app_module
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+
+from diskcache import Cache
+
+from prompt_cache import normalize_text
+
+SINGLE_FLIGHT_DIR = "radargpt_cache"  # the app's cache directory, shared by every gunicorn worker
+LEASE_TTL = 180  # a crashed leader's lease lapses after this many seconds
+RESULT_TTL = 30  # how long a finished result stays visible to followers in other workers
+PARTIAL_RESULT_TTL = 2  # a deadline-truncated result only reaches followers already polling for it
+POLL_INTERVAL = 0.25
+
+_MISSING = object()
+
+
+def is_partial(result):
+    """True for a deadline-truncated result: a dict with a truthy "partial", or a tuple/list holding one"""
+    if isinstance(result, dict):
+        return bool(result.get("partial"))
+    if isinstance(result, (tuple, list)):
+        return any(isinstance(part, dict) and part.get("partial") for part in result)
+    return False
+
+
+class _Call:
+    """An in-flight call that same-process followers wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Request coalescing for identical concurrent work.
+
+    The first caller for a key (namespace + normalized params) becomes the
+    leader and runs the work. Concurrent callers in the same process wait on
+    the leader's in-memory call; callers in other gunicorn workers find the
+    leader's lease in the shared diskcache (SQLite) directory and poll for the
+    result it publishes there. If the leader fails its lease is dropped (or
+    lapses after LEASE_TTL if the worker died) and a waiting worker takes over.
+    Partial results (see is_partial) are published for partial_ttl only, so
+    later callers run the work again instead of reusing a truncated answer.
+    """
+
+    def __init__(self, directory=SINGLE_FLIGHT_DIR, lease_ttl=LEASE_TTL, result_ttl=RESULT_TTL,
+                 partial_ttl=PARTIAL_RESULT_TTL, poll_interval=POLL_INTERVAL):
+        self.cache = Cache(directory)
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.partial_ttl = partial_ttl
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {"leaders": 0, "local_followers": 0, "remote_followers": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def make_key(self, namespace, **params):
+        payload = json.dumps(
+            {k: normalize_text(v) if isinstance(v, str) else v for k, v in sorted(params.items())},
+            sort_keys=True, default=str,
+        )
+        return f"singleflight:{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def do(self, namespace, fn, timeout=None, **params):
+        """
+        Run fn() once for all concurrent callers with the same namespace and
+        params, and return its result (or raise its exception) to each of them.
+        Followers wait at most `timeout` seconds, then raise TimeoutError.
+        """
+        key = self.make_key(namespace, **params)
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self._stats["local_followers"] += 1
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Timed out waiting for an in-flight {namespace} request")
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = self._run_leased(key, namespace, fn, timeout)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_leased(self, key, namespace, fn, timeout):
+        """Run fn() under the cross-worker lease for `key`, or return another worker's result"""
+        lease_key, result_key = f"{key}:lease", f"{key}:result"
+        token = uuid.uuid4().hex
+        deadline = time.time() + timeout if timeout is not None else None
+        while True:
+            result = self.cache.get(result_key, default=_MISSING)
+            if result is not _MISSING:
+                self._count("remote_followers")
+                return result
+            if self.cache.add(lease_key, token, expire=self.lease_ttl):
+                # The previous leader may have published between our check and its lease release
+                result = self.cache.get(result_key, default=_MISSING)
+                if result is not _MISSING:
+                    self.cache.delete(lease_key)
+                    self._count("remote_followers")
+                    return result
+                break
+            if deadline is not None and time.time() >= deadline:
+                raise TimeoutError(f"Timed out waiting for an in-flight {namespace} request in another worker")
+            time.sleep(self.poll_interval)
+
+        self._count("leaders")
+        try:
+            result = fn()
+            self.cache.set(result_key, result, expire=self.partial_ttl if is_partial(result) else self.result_ttl)
+            return result
+        finally:
+            if self.cache.get(lease_key) == token:
+                self.cache.delete(lease_key)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, in_flight=len(self._calls))
+
+
+# Create singleton instance
+single_flight = SingleFlight()
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+from diskcache import Cache
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.stackexchange.com/2.3"
+STACKEXCHANGE_KEY = os.getenv("STACKEXCHANGE_KEY")  # app key: 10,000 requests/day instead of 300 per IP
+STACKEXCHANGE_STATE_DIR = "radargpt_cache"  # shared by every gunicorn worker
+QUOTA_KEY = "stackexchange_quota"
+QUOTA_RESERVE = 10  # stop spending before the daily quota is completely gone
+PAGE_TTL = 3600
+FILTER_TTL = 7 * 24 * 3600
+MAX_PAGESIZE = 100
+MAX_CONCURRENT_PAGES = 4
+MAX_BACKOFF_WAIT = 15  # longer backoffs skip the request instead of stalling the caller
+REQUEST_TIMEOUT = 10
+
+# Compact custom filters: only the wrapper and question fields the call sites read
+_WRAPPER_FIELDS = [".backoff", ".error_id", ".error_message", ".error_name", ".has_more",
+                   ".items", ".quota_max", ".quota_remaining", ".total"]
+_QUESTION_FIELDS = ["question.question_id", "question.title", "question.link", "question.score",
+                    "question.view_count", "question.answer_count", "question.is_answered",
+                    "question.creation_date", "question.closed_date", "question.tags"]
+FILTERS = {
+    "compact": _WRAPPER_FIELDS + _QUESTION_FIELDS,
+    "compact_body": _WRAPPER_FIELDS + _QUESTION_FIELDS + ["question.body"],
+}
+# Built-in filters used if a custom filter cannot be created
+FALLBACK_FILTERS = {"compact": "default", "compact_body": "withbody"}
+
+
+class StackExchangeError(RuntimeError):
+    """A Stack Exchange call failed (network error or API error response)"""
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+
+class StackExchangeClient:
+    """
+    Shared Stack Exchange API client for every Stack Overflow source.
+
+    One keep-alive session carries all calls. Multi-page searches fetch
+    page 1, work out the page count from its `total`, then fetch the rest
+    concurrently. Each page is cached per (method, params, filter, page).
+    Custom filters keep responses down to the fields the app actually reads.
+    Two kinds of limit are kept in the shared diskcache directory, so every
+    gunicorn worker sees them:
+    - a method's `backoff`, which later calls wait out;
+    - the daily `quota_remaining`, which stops requests near zero until
+      UTC midnight.
+    """
+
+    def __init__(self, key=STACKEXCHANGE_KEY, directory=STACKEXCHANGE_STATE_DIR,
+                 max_concurrent_pages=MAX_CONCURRENT_PAGES):
+        self.key = key
+        self.cache = Cache(directory)
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent_pages * 4))
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_pages, thread_name_prefix="stackexchange")
+        self._lock = threading.Lock()
+        self._filters = {}
+        self._stats = {"requests": 0, "cache_hits": 0, "backoffs": 0, "skipped": 0, "errors": 0}
+
+    def _count(self, outcome):
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def _filter(self, name):
+        """Resolve a FILTERS name to its API filter id, creating it once and caching it"""
+        if name not in FILTERS:
+            return name
+        with self._lock:
+            filter_id = self._filters.get(name)
+        if filter_id:
+            return filter_id
+        cache_key = f"stackexchange_filter_{name}_{hashlib.sha256(json.dumps(FILTERS[name]).encode()).hexdigest()[:12]}"
+        filter_id = self.cache.get(cache_key)
+        if filter_id is None:
+            try:
+                resp = self.session.get(f"{API_URL}/filters/create", params={
+                    "include": ";".join(FILTERS[name]),
+                    "base": "none",
+                    "unsafe": "false",
+                }, timeout=REQUEST_TIMEOUT)
+                resp.raise_for_status()
+                filter_id = resp.json()["items"][0]["filter"]
+                self.cache.set(cache_key, filter_id, expire=FILTER_TTL)
+            except Exception as e:
+                print(f"⚠️ Stack Exchange filter creation failed ({e}); using built-in filter")
+                filter_id = FALLBACK_FILTERS[name]
+        with self._lock:
+            self._filters[name] = filter_id
+        return filter_id
+
+    def quota(self):
+        state = self.cache.get(QUOTA_KEY)
+        if not state or state["day"] != _utc_day():
+            return None
+        return state
+
+    def _quota_exhausted(self):
+        state = self.quota()
+        return state is not None and state["remaining"] <= QUOTA_RESERVE
+
+    def _record(self, backoff_key, data):
+        if data.get("quota_remaining") is not None:
+            self.cache.set(QUOTA_KEY, {
+                "day": _utc_day(),
+                "remaining": data["quota_remaining"],
+                "max": data.get("quota_max"),
+                "updated": time.time(),
+            })
+        if data.get("backoff"):
+            self._count("backoffs")
+            self.cache.set(backoff_key, time.time() + data["backoff"], expire=data["backoff"] + 1)
+
+    def _get(self, method, params, timeout):
+        """
+        One API call that respects the shared backoff and quota. Returns the JSON
+        body, or None if the call was skipped; raises StackExchangeError if it failed.
+        """
+        site = params.get("site", "")
+        backoff_key = f"stackexchange_backoff_{site}_{re.sub(r'[0-9;]+', '{ids}', method)}"
+        wait = (self.cache.get(backoff_key) or 0) - time.time()
+        if wait > MAX_BACKOFF_WAIT or self._quota_exhausted():
+            self._count("skipped")
+            return None
+        if wait > 0:
+            time.sleep(wait)
+        if self.key:
+            params = dict(params, key=self.key)
+        try:
+            self._count("requests")
+            resp = self.session.get(f"{API_URL}/{method}", params=params, timeout=timeout)
+            data = resp.json()
+        except Exception as e:
+            self._count("errors")
+            print(f"❌ Stack Exchange {method} error: {e}")
+            raise StackExchangeError(f"{method}: {e}") from e
+        self._record(backoff_key, data)
+        if resp.status_code != 200 or data.get("error_id"):
+            self._count("errors")
+            print(f"❌ Stack Exchange {method} error {data.get('error_id')}: {data.get('error_message')}")
+            if data.get("error_name") == "throttle_violation":
+                self.cache.set(backoff_key, time.time() + 60, expire=61)
+            raise StackExchangeError(f"{method}: {data.get('error_id')} {data.get('error_message')}")
+        return data
+
+    def page(self, method, params, page=1, pagesize=MAX_PAGESIZE, filter="compact", timeout=REQUEST_TIMEOUT,
+             cache_ttl=PAGE_TTL, strict=False):
+        """
+        One cached page of `method`: {"items", "has_more", "total"}, or None on failure (cache_ttl=0 skips the cache).
+        With strict=True a failed call raises StackExchangeError instead; a skipped one still gives None.
+        """
+        params = dict(params, page=page, pagesize=min(pagesize, MAX_PAGESIZE), filter=self._filter(filter))
+        digest = hashlib.sha256(json.dumps([method, params], sort_keys=True).encode()).hexdigest()
+        cache_key = f"stackexchange_page_{digest}"
+        result = self.cache.get(cache_key) if cache_ttl else None
+        if result is not None:
+            self._count("cache_hits")
+            return result
+        try:
+            data = self._get(method, params, timeout)
+        except StackExchangeError:
+            if strict:
+                raise
+            return None
+        if data is None:
+            return None
+        result = {
+            "items": data.get("items", []),
+            "has_more": data.get("has_more", False),
+            "total": data.get("total"),
+        }
+        if cache_ttl:
+            self.cache.set(cache_key, result, expire=cache_ttl)
+        return result
+
+    def fetch(self, method, params, pages=1, pagesize=MAX_PAGESIZE, filter="compact", timeout=REQUEST_TIMEOUT,
+              cache_ttl=PAGE_TTL, strict=False):
+        """
+        Items from up to `pages` pages of `method`, pages 2..n fetched concurrently.
+        strict=True raises StackExchangeError when the first page fails, rather than returning [].
+        """
+        first = self.page(method, params, 1, pagesize, filter, timeout, cache_ttl, strict)
+        if not first:
+            return []
+        items = list(first["items"])
+        if pages <= 1 or not first["has_more"]:
+            return items
+        if first.get("total") is not None:
+            pages = min(pages, math.ceil(first["total"] / min(pagesize, MAX_PAGESIZE)))
+        futures = [self._executor.submit(self.page, method, params, page, pagesize, filter, timeout, cache_ttl)
+                   for page in range(2, pages + 1)]
+        for future in futures:
+            result = future.result()
+            if not result or not result["items"]:
+                break
+            items.extend(result["items"])
+            if not result["has_more"]:
+                break
+        return items
+
+    def search(self, query, pages=1, pagesize=50, sort="relevance", order="desc", site="stackoverflow",
+               body=False, timeout=REQUEST_TIMEOUT, strict=False):
+        """Questions from /search/advanced for `query`"""
+        params = {"order": order, "sort": sort, "q": query, "site": site}
+        return self.fetch("search/advanced", params, pages, pagesize,
+                          "compact_body" if body else "compact", timeout, strict=strict)
+
+    def questions(self, ids, site="stackoverflow", body=True, timeout=REQUEST_TIMEOUT):
+        """Questions by id via /questions/{ids}, 100 ids per call with the batches fetched concurrently"""
+        ids = list(dict.fromkeys(str(i) for i in ids))
+        filter = "compact_body" if body else "compact"
+        futures = [
+            self._executor.submit(self.page, f"questions/{';'.join(ids[i:i + MAX_PAGESIZE])}", {"site": site},
+                                  1, MAX_PAGESIZE, filter, timeout)
+            for i in range(0, len(ids), MAX_PAGESIZE)
+        ]
+        items = []
+        for future in futures:
+            result = future.result()
+            if result:
+                items.extend(result["items"])
+        return items
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["key_configured"] = bool(self.key)
+        stats["quota"] = self.quota()
+        return stats
+
+
+# Create singleton instance
+stackexchange = StackExchangeClient()
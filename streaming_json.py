@@ -0,0 +1,400 @@
+import json
+import re
+from collections import Counter
+
+ROOT = "$"  # schemas key for a completion whose top level is itself the array of items
+
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_LEADING_NUMBER = re.compile(r"-?\d+(\.\d+)?")
+_LITERALS = {"true": "true", "false": "false", "null": "null", "none": "null", "nan": "null", "undefined": "null"}
+_VALUE_END = set(",}]:")  # a quote followed by one of these, a comment, a line break or the end closes its string
+_BARE_KEY = re.compile(r"(?:[^,:{}\[\]\"'\n/]|/(?![/*]))+")
+_BARE_VALUE = re.compile(r"(?:[^,{}\[\]\"'\n/]|/(?![/*]))+")
+_ARRAY_START = set("{[\"'tfnTFN")  # what may follow the "[" of a JSON array, unlike "[1]"-style prose
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", '"': '"', "'": "'"}
+
+# Per-endpoint item schemas: items missing a required field are dropped, other fields get their default
+# and are coerced to its type (int / str / list)
+PAIN_CLOUD_POINT = {
+    "required": ("summary",),
+    "fields": {"summary": "", "reason": "", "market_gap": "", "trend": "", "severity": 7, "title": "",
+               "excerpt": "", "upvotes": 0, "source": "", "timestamp": "", "url": ""},
+}
+PAIN_SEARCH_POINT = {
+    "required": ("title",),
+    "fields": {"title": "", "description": "", "severity": 5, "user_segments": [], "frequency": "",
+               "business_impact": "", "emotional_intensity": 5, "quotes": []},
+}
+PAIN_SEARCH_OPPORTUNITY = {
+    "required": ("idea",),
+    "fields": {"idea": "", "value_proposition": "", "validation_score": 5, "target_users": [], "urgency": ""},
+}
+VERTICAL_PAIN_POINT = {
+    "required": ("title",),
+    "fields": {"title": "", "description": "", "severity": 5, "reason_unsolved": "", "user_segments": []},
+}
+VERTICAL_OPPORTUNITY = {
+    "required": ("product_concept",),
+    "fields": {"product_concept": "", "value_proposition": "", "target_users": [], "go_to_market": ""},
+}
+PAIN_CLOUD_COMPLAINT = {"required": ("text",), "fields": {"text": "", "severity": 5}}
+PAIN_CLOUD_KEYWORD = {"required": ("word",), "fields": {"word": "", "count": 1}}
+PAIN_CLOUD_ENRICHMENT = {"required": ("insight",), "fields": {"index": None, "keywords": [], "insight": ""}}
+TEXT_ITEM = str  # arrays of plain strings
+
+PAIN_CLOUD_SCHEMAS = {ROOT: PAIN_CLOUD_POINT}
+PAIN_SEARCH_SCHEMAS = {"pain_points": PAIN_SEARCH_POINT, "startup_opportunities": PAIN_SEARCH_OPPORTUNITY}
+VERTICAL_SCHEMAS = {"pain_points": VERTICAL_PAIN_POINT, "opportunities": VERTICAL_OPPORTUNITY}
+PAIN_CLOUD_ENRICHMENT_SCHEMAS = {ROOT: PAIN_CLOUD_ENRICHMENT}
+PAIN_CLOUD_API_SCHEMAS = {"complaints": PAIN_CLOUD_COMPLAINT, "keywords": PAIN_CLOUD_KEYWORD, "themes": TEXT_ITEM}
+
+
+def _coerce(value, default):
+    if isinstance(default, bool) or default is None:
+        return value
+    if isinstance(default, int):
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, (int, float)):
+            return int(round(value))
+        match = _LEADING_NUMBER.search(str(value))  # "8", "8/10", "severity 8"
+        return int(round(float(match.group(0)))) if match else default
+    if isinstance(default, list):
+        if isinstance(value, list):
+            return value
+        return [] if value in (None, "") else [value]
+    if isinstance(default, str):
+        if value is None:
+            return default
+        return value if isinstance(value, str) else json.dumps(value) if isinstance(value, (dict, list)) else str(value)
+    return value
+
+
+def validate(item, schema):
+    """`item` normalized to `schema`, or None when it is the wrong shape or lacks a required field"""
+    if schema is None:
+        return item
+    if schema is TEXT_ITEM:
+        if isinstance(item, (dict, list)) or item is None:
+            return None
+        return str(item).strip() or None
+    if not isinstance(item, dict):
+        return None
+    if any(item.get(field) in (None, "", [], {}) for field in schema["required"]):
+        return None
+    normalized = dict(item)
+    for field, default in schema["fields"].items():
+        normalized[field] = _coerce(item.get(field), default) if field in item else default
+    return normalized
+
+
+class StreamingJSONParser:
+    """
+    Incremental, tolerant parser for JSON written by an LLM.
+
+    feed() takes completion chunks as they stream in and returns the items
+    of the watched arrays that closed in that chunk, as (key, item) pairs.
+    Watched arrays are the keys of `schemas` on the top-level object, or
+    the top level itself under ROOT; each item is validated against its
+    schema and dropped if invalid. Nothing is parsed twice: the raw text
+    is tokenized once into normalized JSON, and each item is decoded from
+    its own slice of that.
+
+    The common LLM defects are repaired on the way: prose and code fences
+    around the JSON, // and /* */ comments, single-quoted strings, raw
+    newlines and unescaped inner quotes in strings, unquoted keys and
+    words, Python literals, missing and trailing commas, missing colons
+    and values, mismatched brackets, and output cut off mid-document
+    (close() balances whatever is still open). `repairs` counts them.
+    """
+
+    def __init__(self, schemas=None):
+        self.schemas = dict(schemas or {ROOT: None})
+        self.items = {key: [] for key in self.schemas}
+        self.repairs = Counter()
+        self._pending = ""
+        self._out = []
+        self._stack = []
+        self._started = False
+        self._done = False
+        self._closed = False
+
+    # --- tokenizer ---
+
+    def _string_end(self, text, start, final):
+        """Index of the quote closing the string opened at `start`, or None if more text is needed"""
+        quote = text[start]
+        i = start + 1
+        inner = 0
+        while True:
+            i = text.find(quote, i)
+            while i != -1 and _escaped(text, i):
+                i = text.find(quote, i + 1)
+            if i == -1:
+                end = len(text) if final else None
+                break
+            j = i + 1
+            while j < len(text) and text[j].isspace():
+                j += 1
+            if j == len(text):
+                end = i if final else None
+                break
+            if text[j] in _VALUE_END or text.startswith(("//", "/*"), j) or "\n" in text[i + 1:j]:
+                end = i
+                break
+            inner += 1
+            i += 1
+        if end is not None and inner:
+            self.repairs["inner_quote"] += inner
+        return end
+
+    def _tokens(self, final):
+        text = self._pending
+        i = 0
+        while i < len(text) and not self._done:
+            ch = text[i]
+            if not self._started:
+                if ch in "{[":
+                    j = i + 1
+                    while j < len(text) and text[j].isspace():
+                        j += 1
+                    if j == len(text) and not final:
+                        break
+                    if ch == "{" or j == len(text) or text[j] in _ARRAY_START:
+                        self._started = True
+                        continue
+                i += 1
+                continue
+            if ch.isspace() or ch == "`":
+                i += 1
+            elif ch == "/" and i + 1 == len(text) and not final:
+                break
+            elif text.startswith("//", i):
+                end = text.find("\n", i)
+                if end == -1 and not final:
+                    break
+                self.repairs["comment"] += 1
+                i = len(text) if end == -1 else end + 1
+            elif text.startswith("/*", i):
+                end = text.find("*/", i + 2)
+                if end == -1 and not final:
+                    break
+                self.repairs["comment"] += 1
+                i = len(text) if end == -1 else end + 2
+            elif ch in "{}[]:,":
+                yield ch, ch
+                i += 1
+            elif ch in "\"'":
+                end = self._string_end(text, i, final)
+                if end is None:
+                    break
+                if ch == "'":
+                    self.repairs["single_quote"] += 1
+                if end == len(text):
+                    self.repairs["unterminated_string"] += 1
+                yield "value", json.dumps(_unescape(text[i + 1:end]))
+                i = end + 1
+            else:
+                match = (_BARE_KEY if self._expecting_key() else _BARE_VALUE).match(text, i)
+                if match.end() == len(text) and not final:
+                    break
+                yield "value", self._bare(match.group(0).strip())
+                i = match.end()
+        self._pending = "" if self._done else text[i:]
+
+    def _expecting_key(self):
+        return bool(self._stack) and self._stack[-1]["type"] == "{" and self._stack[-1]["expect"] in ("key", "comma")
+
+    def _bare(self, word):
+        if _NUMBER.fullmatch(word):
+            return word
+        if word.lower() in _LITERALS:
+            if word not in _LITERALS:
+                self.repairs["literal"] += 1
+            return _LITERALS[word.lower()]
+        self.repairs["bare_word"] += 1
+        return json.dumps(word)
+
+    # --- emitter ---
+
+    def _emit(self, text):
+        self._out.append(text)
+
+    def _value_slot(self):
+        """Get the innermost container ready for a value; False if the value has nowhere to go"""
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            return False
+        if frame["type"] == "[":
+            if frame["expect"] == "comma":
+                self.repairs["missing_comma"] += 1
+            if frame["count"]:
+                self._emit(",")
+            frame["expect"] = "value"
+            if frame["watched"]:
+                frame["start"] = len(self._out)
+            return True
+        if frame["expect"] == "colon":
+            self.repairs["missing_colon"] += 1
+            self._emit(":")
+        elif frame["expect"] != "value":
+            return False
+        return True
+
+    def _value_done(self, events):
+        frame = self._stack[-1] if self._stack else None
+        if frame is None:
+            self._done = True
+            return
+        frame["expect"] = "comma"
+        frame["count"] += 1
+        if frame["type"] == "[" and frame["watched"]:
+            item = validate(json.loads("".join(self._out[frame["start"]:])), self.schemas[frame["key"]])
+            if item is None:
+                self.repairs["invalid_item"] += 1
+            else:
+                self.items[frame["key"]].append(item)
+                events.append((frame["key"], item))
+
+    def _key(self, frame, token):
+        if frame["expect"] == "comma":
+            self.repairs["missing_comma"] += 1
+        if frame["count"]:
+            self._emit(",")
+        self._emit(token)
+        frame["key"] = json.loads(token)
+        frame["expect"] = "colon"
+
+    def _open(self, kind, events):
+        parent = self._stack[-1] if self._stack else None
+        if parent is not None and parent["type"] == "{" and parent["expect"] in ("key", "comma"):
+            self._key(parent, json.dumps(f"field_{parent['count'] + 1}"))
+            self.repairs["missing_key"] += 1
+        if parent is not None and not self._value_slot():
+            return
+        if parent is None:
+            key = ROOT
+        elif parent["type"] == "{" and len(self._stack) == 1:
+            key = parent["key"]
+        else:
+            key = None
+        self._emit(kind)
+        self._stack.append({"type": kind, "expect": "key" if kind == "{" else "value", "count": 0, "key": key,
+                            "watched": kind == "[" and key in self.schemas, "start": None})
+
+    def _close(self, kind, events):
+        opener = "{" if kind == "}" else "["
+        if not any(frame["type"] == opener for frame in self._stack):
+            self.repairs["stray_bracket"] += 1
+            return
+        while True:
+            frame = self._stack.pop()
+            if frame["type"] == "{" and frame["expect"] == "colon":
+                self._emit(":null")
+                self.repairs["missing_value"] += 1
+            elif frame["type"] == "{" and frame["expect"] == "value":
+                self._emit("null")
+                self.repairs["missing_value"] += 1
+            self._emit("}" if frame["type"] == "{" else "]")
+            if frame["type"] == opener:
+                break
+            self.repairs["unbalanced_bracket"] += 1
+            self._value_done(events)
+        self._value_done(events)
+
+    def _consume(self, kind, token, events):
+        frame = self._stack[-1] if self._stack else None
+        if kind in "{[":
+            self._open(kind, events)
+        elif kind in "}]":
+            self._close(kind, events)
+        elif kind == ":":
+            if frame["type"] == "{" and frame["expect"] == "colon":
+                self._emit(":")
+                frame["expect"] = "value"
+        elif kind == ",":
+            if frame["type"] == "{" and frame["expect"] in ("colon", "value"):
+                self._emit(":null" if frame["expect"] == "colon" else "null")
+                self.repairs["missing_value"] += 1
+                self._value_done(events)
+            if frame["expect"] == "comma":
+                frame["expect"] = "key" if frame["type"] == "{" else "value"
+            else:
+                self.repairs["extra_comma"] += 1
+        elif frame["type"] == "{" and frame["expect"] in ("key", "comma"):
+            self._key(frame, token if token.startswith('"') else json.dumps(token))
+        elif self._value_slot():
+            self._emit(token)
+            self._value_done(events)
+
+    # --- public API ---
+
+    def feed(self, chunk):
+        """Add a chunk of the completion; returns the (key, item) pairs completed by it"""
+        events = []
+        if self._closed or self._done:
+            return events
+        self._pending += chunk
+        for kind, token in self._tokens(final=False):
+            self._consume(kind, token, events)
+        return events
+
+    def close(self):
+        """End of the completion: parse what is left and balance anything still open"""
+        events = []
+        if self._closed:
+            return events
+        self._closed = True
+        if not self._done:
+            for kind, token in self._tokens(final=True):
+                self._consume(kind, token, events)
+        if self._stack:
+            self.repairs["truncated"] += 1
+        while self._stack:
+            self._close("}" if self._stack[-1]["type"] == "{" else "]", events)
+        return events
+
+    def value(self):
+        """The repaired document, with watched arrays holding only their valid items; None if there was no JSON"""
+        if not self._out:
+            return None
+        document = json.loads("".join(self._out))
+        if isinstance(document, list) and ROOT in self.schemas:
+            return self.items[ROOT]
+        if isinstance(document, dict):
+            for key in self.schemas:
+                if key in document:
+                    document[key] = self.items[key]
+        return document
+
+
+def _escaped(text, i):
+    backslashes = 0
+    while i - backslashes - 1 >= 0 and text[i - backslashes - 1] == "\\":
+        backslashes += 1
+    return backslashes % 2 == 1
+
+
+def _unescape(raw):
+    """String contents as written by an LLM (JSON escapes, stray backslashes, raw newlines) to text"""
+    out, i = [], 0
+    while i < len(raw):
+        ch = raw[i]
+        if ch != "\\" or i + 1 == len(raw):
+            out.append(ch)
+            i += 1
+        elif raw[i + 1] == "u" and re.fullmatch(r"[0-9a-fA-F]{4}", raw[i + 2:i + 6]):
+            out.append(chr(int(raw[i + 2:i + 6], 16)))
+            i += 6
+        else:
+            out.append(_ESCAPES.get(raw[i + 1], raw[i + 1]))
+            i += 2
+    return "".join(out)
+
+
+def parse(text, schemas=None):
+    """Repair and parse a complete completion in one go; returns (document or None, parser)"""
+    parser = StreamingJSONParser(schemas)
+    parser.feed(text or "")
+    parser.close()
+    return parser.value(), parser
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test the bounded executors: saturation, gather deadlines and cooperative cancellation
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add the current directory to the path so we can import the executors
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bounded_executors import BoundedExecutor, ExecutorSaturated, cancelled, remaining
+
+
+def test_submit_rejects_once_saturated():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    futures = [executor.submit(release.wait, 5) for _ in range(3)]
+    assert isinstance(futures[2].exception(timeout=1), ExecutorSaturated)
+    release.set()
+    assert futures[0].result(timeout=1) and futures[1].result(timeout=1)
+    stats = executor.stats()
+    assert stats["submitted"] == 2 and stats["rejected"] == 1 and stats["completed"] == 2
+    assert stats["max_pending"] == 2 and stats["queued"] == 0 and stats["saturation"] == 0
+
+
+def test_gather_returns_defaults_for_failures_and_stragglers():
+    executor = BoundedExecutor("test", max_workers=4, max_queue=4)
+    started = time.monotonic()
+    results, missing = executor.gather({
+        "fast": lambda: ["ok"],
+        "broken": lambda: 1 / 0,
+        "slow": lambda: time.sleep(2) or ["late"],
+    }, timeout=0.2)
+    assert time.monotonic() - started < 1
+    assert results == {"fast": ["ok"], "broken": [], "slow": []}
+    assert missing == ["slow"]
+    assert executor.stats()["abandoned"] == 1
+
+
+def test_stragglers_see_cancelled_and_remaining():
+    executor = BoundedExecutor("test", max_workers=2, max_queue=2)
+    seen = {}
+    stopped = threading.Event()
+
+    def worker():
+        seen["remaining"] = remaining()
+        while not cancelled():
+            time.sleep(0.01)
+        stopped.set()
+        return "stopped"
+
+    executor.gather({"worker": worker}, timeout=0.1)
+    assert stopped.wait(1)
+    assert 0 < seen["remaining"] <= 0.1
+    # Outside a gather() there is no deadline
+    assert remaining() is None and not cancelled()
+
+
+def test_queued_stragglers_are_cancelled():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=4)
+    executor.gather({"busy": lambda: time.sleep(0.3), "queued": lambda: "never"}, timeout=0.05)
+    time.sleep(0.4)
+    stats = executor.stats()
+    assert stats["cancelled"] == 1
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_map_keeps_order():
+    executor = BoundedExecutor("test", max_workers=4, max_queue=4)
+    results = executor.map(lambda n: 10 // n, [5, 0, 2], timeout=1, default=-1)
+    assert results == [2, -1, 5]
+
+
+def main():
+    """Run all bounded executor tests"""
+    print("🚀 Starting bounded executor tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} bounded executor tests passed!")
+
+
+if __name__ == "__main__":
+    main()
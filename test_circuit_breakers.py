@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the per-source circuit breaker state machine: closed -> open -> half-open -> closed/open
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to the path so we can import the circuit breakers
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breakers import CLOSED, HALF_OPEN, MIN_CALLS, OPEN, OPEN_COOLDOWN, CircuitBreakers, CircuitOpen
+
+
+def make_breakers():
+    return CircuitBreakers(directory=tempfile.mkdtemp(prefix="circuit_breakers_test_"))
+
+
+def trip(breakers, source):
+    for _ in range(MIN_CALLS):
+        breakers.record(source, False)
+
+
+def end_cooldown(breakers, source):
+    """Backdate the circuit's opening so its cooldown is over"""
+    circuit = breakers.cache.get(breakers._key(source))
+    circuit["opened_at"] -= circuit["cooldown"]
+    breakers.cache.set(breakers._key(source), circuit)
+
+
+def test_opens_only_after_enough_failures():
+    breakers = make_breakers()
+    for _ in range(MIN_CALLS - 1):
+        breakers.record("reddit", False)
+    assert breakers.state("reddit") == CLOSED
+    breakers.record("reddit", False)
+    assert breakers.state("reddit") == OPEN
+    assert not breakers.allow("reddit")
+    # Failures below ERROR_THRESHOLD leave the circuit closed
+    for ok in [False, True, False, True, True, True]:
+        breakers.record("news", ok)
+    assert breakers.state("news") == CLOSED
+
+
+def test_slow_successes_count_as_failures():
+    breakers = make_breakers()
+    for _ in range(MIN_CALLS):
+        breakers.record("news", True, latency=25)
+    assert breakers.state("news") == OPEN
+    for _ in range(MIN_CALLS):
+        breakers.record("producthunt", True, latency=25)
+    assert breakers.state("producthunt") == CLOSED
+
+
+def test_half_open_admits_one_probe_and_closes_on_success():
+    breakers = make_breakers()
+    trip(breakers, "reddit")
+    end_cooldown(breakers, "reddit")
+    assert breakers.state("reddit") == HALF_OPEN
+    assert breakers.allow("reddit")
+    assert not breakers.allow("reddit")
+    breakers.record("reddit", True)
+    assert breakers.state("reddit") == CLOSED
+    assert breakers.health("reddit")["recent_calls"] == 0
+
+
+def test_failed_probe_reopens_with_double_cooldown():
+    breakers = make_breakers()
+    trip(breakers, "reddit")
+    end_cooldown(breakers, "reddit")
+    assert breakers.allow("reddit")
+    breakers.record("reddit", False)
+    assert breakers.state("reddit") == OPEN
+    health = breakers.health("reddit")
+    assert health["health"] == 0.0
+    assert OPEN_COOLDOWN * 2 - 5 < health["retry_in_seconds"] <= OPEN_COOLDOWN * 2
+    # The probe lease was released with the outcome
+    end_cooldown(breakers, "reddit")
+    assert breakers.allow("reddit")
+
+
+def test_call_uses_fallback_or_raises_when_open():
+    breakers = make_breakers()
+    assert breakers.call("reddit", lambda: ["post"]) == ["post"]
+    trip(breakers, "reddit")
+    assert breakers.call("reddit", lambda: ["post"], fallback=list) == []
+    try:
+        breakers.call("reddit", lambda: ["post"])
+    except CircuitOpen:
+        pass
+    else:
+        raise AssertionError("calling an open circuit without a fallback should raise")
+
+
+def test_call_records_exceptions():
+    breakers = make_breakers()
+    for _ in range(MIN_CALLS):
+        try:
+            breakers.call("news", lambda: 1 / 0)
+        except ZeroDivisionError:
+            pass
+    assert breakers.state("news") == OPEN
+
+
+def test_probe_once_closes_recovered_source():
+    breakers = make_breakers()
+    probes = []
+    breakers.register_probe("reddit", lambda: probes.append(1))
+    trip(breakers, "reddit")
+    breakers.probe_once()
+    assert probes == []
+    end_cooldown(breakers, "reddit")
+    breakers.probe_once()
+    assert probes == [1]
+    assert breakers.stats()["reddit"]["state"] == CLOSED
+
+
+def main():
+    """Run all circuit breaker tests"""
+    print("🚀 Starting circuit breaker tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} circuit breaker tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test the prompt context packer: BM25 ranking, near-duplicate removal and token budgets
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import the context packer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from context_packer import MIN_ITEM_TOKENS, count_tokens, pack, prompt_budget, request_budget, tokenize
+
+
+def render(n, item, text):
+    return f"[{n}] {item.get('title', '')}\n{text}\n"
+
+
+def post(title, text):
+    return {"title": title, "text": text}
+
+
+def test_tokenize_drops_stopwords():
+    assert tokenize("The CRM is TOO expensive for us") == ["crm", "too", "expensive", "us"]
+    assert tokenize(None) == []
+
+
+def test_prompt_budget():
+    assert request_budget("llama-3.3-70b-versatile") == 12000
+    assert request_budget("unknown-model") == 6000
+    assert prompt_budget("llama-3.3-70b-versatile", 1000) == 11000
+    assert prompt_budget("llama-3.3-70b-versatile", 1000, "x" * 4000) < 10000
+    assert prompt_budget("unknown-model", 10000) == 0
+
+
+def test_ranks_by_relevance_but_keeps_citation_numbers():
+    items = [
+        post("Gardening tips", "How to grow tomatoes on a balcony"),
+        post("Invoicing pain", "Our invoicing software keeps crashing during invoicing runs"),
+        post("Weather", "Rain all week"),
+    ]
+    # Room for the best match only
+    budget = count_tokens(render(2, items[1], items[1]["text"])) + MIN_ITEM_TOKENS - 1
+    packed = pack(items, "invoicing software", budget=budget, render=render)
+    assert [n for n, _, _, _ in packed] == [2]
+    packed = pack(items, "invoicing software", budget=1000, render=render)
+    # Every item fits, and they come back in citation order
+    assert [n for n, _, _, _ in packed] == [1, 2, 3]
+    assert packed[1][3] == render(2, items[1], items[1]["text"])
+
+
+def test_drops_near_duplicates():
+    text = "the onboarding flow for our crm asks for the same customer details three separate times before import"
+    items = [
+        post("Onboarding", text),
+        post("Other", "billing exports to csv silently drop every row that has a unicode customer name"),
+        post("Onboarding", text + " again"),
+        post("Short", "crm sucks"),
+        post("Short", "CRM sucks!"),
+    ]
+    packed = pack(items, "", budget=10000, render=render)
+    assert [n for n, _, _, _ in packed] == [1, 2, 4]
+
+
+def test_empty_items_are_never_duplicates():
+    items = [{"title": "", "text": ""}, {"title": "", "text": ""}, post("Real", "a real complaint")]
+    packed = pack(items, "", budget=10000, render=render)
+    assert [n for n, _, _, _ in packed] == [1, 2, 3]
+
+
+def test_stays_within_budget_and_truncates_last_item():
+    items = [post(f"Post {n}", " ".join(f"word{n}_{i}" for i in range(200))) for n in range(10)]
+    budget = 500
+    packed = pack(items, "", budget=budget, render=render, max_item_tokens=200)
+    assert sum(count_tokens(block) for _, _, _, block in packed) <= budget
+    assert len(packed) >= 2
+    assert packed[-1][2].endswith("…")
+    assert count_tokens(packed[-1][3]) >= MIN_ITEM_TOKENS
+    assert pack(items, "", budget=MIN_ITEM_TOKENS - 1, render=render) == []
+
+
+def main():
+    """Run all context packer tests"""
+    print("🚀 Starting context packer tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} context packer tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test the local SQLite/FTS5 corpus: URL canonicalization, upserts, search and search-or-fetch
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+# Add the current directory to the path so we can import the corpus store
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from corpus_store import CorpusStore, canonical_url, epoch_seconds, item_id, match_expression
+
+
+def make_store():
+    return CorpusStore(os.path.join(tempfile.mkdtemp(prefix="corpus_store_test_"), "corpus.db"))
+
+
+def post(n, text="crm tools are too expensive", **fields):
+    return dict({"url": f"https://example.com/post/{n}", "title": f"Post {n}", "text": text}, **fields)
+
+
+def test_canonical_url():
+    assert canonical_url("HTTPS://WWW.Example.com/a/b/?utm_source=x&id=3#top") == "https://example.com/a/b?id=3"
+    assert canonical_url("https://example.com") == "https://example.com/"
+    assert item_id("reddit", "https://www.example.com/a/") == item_id("news", "https://example.com/a")
+    assert item_id("reddit", "", "Same Title") != item_id("news", "", "Same Title")
+
+
+def test_epoch_seconds():
+    assert epoch_seconds(1700000000) == 1700000000.0
+    assert epoch_seconds("2025-05-19T08:00:00Z") == 1747641600.0
+    assert epoch_seconds("2025-05-19T08:00:00") == 1747641600.0
+    assert epoch_seconds(0) is None
+    assert epoch_seconds(True) is None
+    assert epoch_seconds("yesterday") is None
+
+
+def test_match_expression():
+    assert match_expression("CRM or ERP, crm!") == '"crm" "erp"'
+    assert match_expression("not and") == ""
+
+
+def test_upsert_refreshes_instead_of_duplicating():
+    store = make_store()
+    assert store.upsert("reddit", [post(1, text="short", extra={"comments": ["a"]})]) == 1
+    store.upsert("reddit", [post(1, text="a much longer body about crm pricing", score=5, extra={"flair": "x"})])
+    store.upsert("reddit", [post(1, text="tiny")])
+    rows = store.search("crm pricing", "reddit")
+    assert len(rows) == 1
+    # The longer text wins, the score sticks and extra fields are merged
+    assert rows[0]["text"] == "a much longer body about crm pricing"
+    assert rows[0]["score"] == 5
+    assert rows[0]["extra"] == {"comments": ["a"], "flair": "x"}
+    assert store.upsert("reddit", [{"text": "no url or title"}]) == 0
+
+
+def test_search_filters():
+    store = make_store()
+    now = time.time()
+    store.upsert("reddit", [post(1, published_at=now - 3600), post(2, published_at=now - 30 * 86400), post(3)])
+    store.upsert("news", [post(4)])
+    assert len(store.search("crm tools", "reddit")) == 3
+    assert len(store.search("crm tools")) == 4
+    assert [row["url"] for row in store.search("crm tools", "reddit", since=now - 86400)] == [post(1)["url"]]
+    assert store.search("crm tools", "reddit", max_age=-1) == []
+    assert store.search("accounting", "reddit") == []
+
+
+def test_search_or_fetch_answers_locally_when_enough():
+    store = make_store()
+    store.upsert("reddit", [post(n) for n in range(5)])
+    calls = []
+    results = store.search_or_fetch(
+        "reddit", "crm", fetch=lambda needed: calls.append(needed) or [], to_item=dict,
+        from_row=lambda row: row["url"], limit=5, min_results=3,
+    )
+    assert calls == [] and len(results) == 5
+    assert store.stats()["local_hits"] == 1
+
+
+def test_search_or_fetch_fetches_only_the_gap():
+    store = make_store()
+    store.upsert("reddit", [post(1), post(2)])
+    calls = []
+
+    def fetch(needed):
+        calls.append(needed)
+        return [post(2, text="crm tools refreshed"), post(3)]
+
+    results = store.search_or_fetch("reddit", "crm", fetch=fetch, to_item=dict,
+                                    from_row=dict, limit=10, min_results=5)
+    assert calls == [8]
+    # Fetched results first, then local matches that were not re-fetched
+    assert [result["url"] for result in results] == [post(2)["url"], post(3)["url"], post(1)["url"]]
+    assert store.stats()["items"] == {"reddit": 3}
+
+
+def test_search_or_fetch_skips_unusable_rows():
+    store = make_store()
+    store.upsert("reddit", [post(n) for n in range(5)])
+    calls = []
+    store.search_or_fetch("reddit", "crm", fetch=lambda needed: calls.append(needed) or [], to_item=dict,
+                          from_row=dict, limit=5, min_results=3, usable=lambda row: bool(row["extra"]))
+    assert calls == [5]
+
+
+def test_feeds_and_high_water():
+    store = make_store()
+    now = time.time()
+    assert store.high_water("reddit:startups") is None
+    store.upsert("reddit", [post(1, published_at=now - 60), post(2, published_at=now - 7200)], feed="reddit:startups")
+    store.upsert("reddit", [post(3, published_at=now - 120)], feed="reddit:saas")
+    store.set_high_water("reddit:startups", now - 60)
+    store.set_high_water("reddit:startups", now - 7200)
+    assert store.high_water("reddit:startups") == now - 60
+    recent = store.recent(["reddit:startups", "reddit:saas"], since=now - 3600)
+    assert [row["url"] for row in recent] == [post(1)["url"], post(3)["url"]]
+    assert len(store.recent(["reddit:startups"], since=0, per_feed_limit=1)) == 1
+    assert store.recent([], since=0) == []
+
+
+def main():
+    """Run all corpus store tests"""
+    print("🚀 Starting corpus store tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} corpus store tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test the Groq key scheduler: ready-order leasing, cooldowns, benching and wake-up notifications
+"""
+
+import os
+import sys
+import time
+
+# Add the current directory to the path so we can import the scheduler
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from groq_scheduler import GroqKeyScheduler
+from rate_limits import KeyRateLimiter
+
+
+def test_leases_each_ready_key_before_reusing_one():
+    """Every ready key is handed out once before any key comes back from its cooldown"""
+    scheduler = GroqKeyScheduler([["key-a", "key-b"], ["key-c"]], request_delay=10)
+    keys = [scheduler.try_acquire()[0].key for _ in range(3)]
+    assert sorted(keys) == ["key-a", "key-b", "key-c"]
+    lease, wait = scheduler.try_acquire()
+    assert lease is None
+    assert 9 < wait <= 10
+
+
+def test_lease_reports_org_and_in_flight():
+    scheduler = GroqKeyScheduler([["key-a"], ["key-b"]], request_delay=0)
+    leases = [scheduler.try_acquire()[0] for _ in range(2)]
+    assert {lease.org for lease in leases} == {"Org 1", "Org 2"}
+    assert scheduler.status()["in_flight"] == 2
+    for lease in leases:
+        scheduler.release(lease)
+    assert scheduler.status()["in_flight"] == 0
+
+
+def test_rate_limited_key_is_benched_until_deferred():
+    scheduler = GroqKeyScheduler([["key-a"]], request_delay=0, rate_limit_timeout=300)
+    scheduler.mark_failed("key-a", "rate_limit")
+    assert scheduler.status()["rate_limited"] == ["key-a... (Org 1)"]
+    lease, wait = scheduler.try_acquire()
+    assert lease is None and wait > 290
+    scheduler.defer("key-a", time.time())
+    lease, _ = scheduler.try_acquire()
+    assert lease is not None and lease.key == "key-a"
+
+
+def test_release_with_error_benches_the_key():
+    scheduler = GroqKeyScheduler([["key-a"]], request_delay=0, invalid_key_timeout=3600)
+    lease, _ = scheduler.try_acquire()
+    scheduler.release(lease, error_type="invalid_key")
+    assert scheduler.status()["failed"] == ["key-a... (Org 1)"]
+    assert scheduler.available() == 0
+
+
+def test_listeners_hear_releases_and_deferrals():
+    """The LLM gateway sleeps on these notifications instead of polling"""
+    scheduler = GroqKeyScheduler([["key-a"]], request_delay=0)
+    calls = []
+    scheduler.subscribe(lambda: calls.append(time.time()))
+    lease, _ = scheduler.try_acquire()
+    scheduler.release(lease)
+    scheduler.defer("key-a", time.time() + 5)
+    scheduler.mark_failed("key-a", "rate_limit")
+    assert len(calls) == 3
+
+
+def test_limiter_pushes_a_key_back_until_its_buckets_refill():
+    limiter = KeyRateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    scheduler = GroqKeyScheduler([["key-a"]], request_delay=0, limiter=limiter)
+    lease, _ = scheduler.try_acquire(cost=100)
+    assert lease is not None
+    lease, wait = scheduler.try_acquire(cost=100)
+    assert lease is None
+    assert 50 < wait <= 60
+
+
+def test_no_keys_configured():
+    scheduler = GroqKeyScheduler([[]])
+    try:
+        scheduler.try_acquire()
+    except RuntimeError as e:
+        assert "No Groq API keys" in str(e)
+    else:
+        raise AssertionError("try_acquire() without keys should raise")
+
+
+def main():
+    """Run all scheduler tests"""
+    print("🚀 Starting Groq key scheduler tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} scheduler tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio LLM gateway against a fake Groq client: key leasing, retries, streaming and wake-ups
+"""
+
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the current directory to the path so we can import the gateway
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from groq_scheduler import GroqKeyScheduler
+from llm_clients import client_pool
+from llm_gateway import PAYLOAD_TOO_LARGE_MESSAGE, LLMGateway
+from rate_limits import KeyRateLimiter
+
+
+class FakeGroqError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers={})
+
+
+class FakeGroq:
+    """Stands in for the async Groq client; `replies` are consumed one per create() call"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.keys = []
+        self.chat = self.completions = self.with_raw_response = self
+
+    def __call__(self, api_key):
+        self.keys.append(api_key)
+        return self
+
+    async def create(self, stream=False, **kwargs):
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(headers={}, parse=lambda: self._stream(reply) if stream else self._completion(reply))
+
+    def _completion(self, text):
+        choices = [] if text is None else [SimpleNamespace(message=SimpleNamespace(content=text))]
+        return SimpleNamespace(choices=choices, usage=SimpleNamespace(total_tokens=10))
+
+    async def _stream(self, chunks):
+        for chunk in chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))])
+
+
+def classify(e):
+    return {413: "payload_too_large", 429: "rate_limit", 401: "invalid_key"}.get(getattr(e, "status_code", None),
+                                                                              "unknown")
+
+
+def make_gateway(replies, keys=("key-a", "key-b"), max_retries=3):
+    fake = FakeGroq(replies)
+    client_pool.async_groq = fake
+    limiter = KeyRateLimiter()
+    scheduler = GroqKeyScheduler([list(keys)], request_delay=0, limiter=limiter)
+    gateway = LLMGateway()
+    gateway.configure(scheduler, limiter, classify,
+                      lambda key, error_type, headers=None: scheduler.mark_failed(key, error_type),
+                      max_retries=max_retries)
+    return gateway, scheduler, fake
+
+
+def test_generate_returns_completion_and_releases_key():
+    gateway, scheduler, _ = make_gateway(["hello"])
+    assert gateway.run(gateway.generate("prompt", max_tokens=10)) == "hello"
+    assert scheduler.status()["in_flight"] == 0
+    stats = gateway.stats()
+    assert stats["requests"] == 1 and stats["in_flight"] == 0 and stats["errors"] == 0
+
+
+def test_rate_limited_key_is_benched_and_retried():
+    gateway, scheduler, fake = make_gateway([FakeGroqError(429), "hello"])
+    assert gateway.run(gateway.generate("prompt", max_tokens=10)) == "hello"
+    assert fake.keys[0] != fake.keys[1]
+    assert len(scheduler.status()["rate_limited"]) == 1
+
+
+def test_payload_too_large_is_not_retried():
+    gateway, _, fake = make_gateway([FakeGroqError(413)])
+    assert gateway.run(gateway.generate("prompt", max_tokens=10)) == PAYLOAD_TOO_LARGE_MESSAGE
+    assert len(fake.keys) == 1
+
+
+def test_failures_and_empty_completions_stop_at_max_retries():
+    gateway, _, fake = make_gateway([FakeGroqError(500), None, FakeGroqError(500), "too late"])
+    try:
+        gateway.run(gateway.generate("prompt", max_tokens=10))
+    except FakeGroqError:
+        pass
+    else:
+        raise AssertionError("generate() should give up after max_retries attempts")
+    assert len(fake.keys) == 3
+    assert gateway.stats()["errors"] == 1
+
+
+def test_generate_many_times_out_each_request():
+    gateway, _, _ = make_gateway(["a", "b"])
+    results = gateway.run(gateway.generate_many([{"prompt": "1"}, {"prompt": "2"}], timeout=5))
+    assert sorted(results) == ["a", "b"]
+
+
+def test_stream_retries_only_before_first_chunk():
+    gateway, _, fake = make_gateway([FakeGroqError(500), ["Hel", "lo"]])
+
+    async def collect(**kwargs):
+        return [chunk async for chunk in gateway.stream("prompt", max_tokens=10, **kwargs)]
+
+    assert gateway.run(collect()) == ["Hel", "lo"]
+    assert len(fake.keys) == 2
+
+    gateway, _, fake = make_gateway([["Hel", FakeGroqError(500)], ["never"]])
+    chunks = []
+
+    async def consume():
+        async for chunk in gateway.stream("prompt", max_tokens=10):
+            chunks.append(chunk)
+
+    try:
+        gateway.run(consume())
+    except FakeGroqError:
+        pass
+    else:
+        raise AssertionError("a stream that already produced output should raise, not restart")
+    assert chunks == ["Hel"] and len(fake.keys) == 1
+
+
+def test_waiting_request_wakes_when_key_returns():
+    """A request waiting on a benched key resumes as soon as the key is deferred, not after its cooldown"""
+    gateway, scheduler, _ = make_gateway(["hello"], keys=("key-a",))
+    scheduler.mark_failed("key-a", "rate_limit")
+    future = gateway.submit(gateway.generate("prompt", max_tokens=10))
+    time.sleep(0.2)
+    assert not future.done()
+    assert gateway.stats()["waiting_for_key"] == 1
+    started = time.time()
+    threading.Thread(target=scheduler.defer, args=("key-a", time.time())).start()
+    assert future.result(timeout=2) == "hello"
+    assert time.time() - started < 1
+
+
+def main():
+    """Run all LLM gateway tests"""
+    print("🚀 Starting LLM gateway tests...")
+    original = client_pool.async_groq
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    try:
+        for test in tests:
+            test()
+            print(f"✅ {test.__name__}")
+    finally:
+        client_pool.async_groq = original
+    print(f"🎉 All {len(tests)} LLM gateway tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the map-reduce citation summarizer with the LLM gateway replaced by recording fakes
+"""
+
+import os
+import re
+import sys
+
+# Add the current directory to the path so we can import the summarizer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import context_packer
+import llm_gateway
+from groq_scheduler import GroqKeyScheduler
+from map_reduce_summarizer import MAP_MAX_TOKENS, MapReduceSummarizer, build_citation_prompt
+
+ORIGINAL_GATEWAY = (llm_gateway.generate, llm_gateway.generate_many)
+
+
+def fake_gateway(map_results=None):
+    """Route the summarizer's completions to fakes; returns the list of recorded calls"""
+    calls = []
+
+    def generate(prompt, timeout=None, **kwargs):
+        calls.append(("generate", prompt))
+        return "final summary"
+
+    def generate_many(requests, timeout=None):
+        calls.extend(("map", request["prompt"]) for request in requests)
+        if map_results is not None:
+            return map_results(requests)
+        return [f"- note {i} [{i + 1}]" for i in range(len(requests))]
+
+    llm_gateway.generate, llm_gateway.generate_many = generate, generate_many
+    return calls
+
+
+def restore_gateway():
+    llm_gateway.generate, llm_gateway.generate_many = ORIGINAL_GATEWAY
+
+
+def corpus(n, words=150):
+    return [{"title": f"Post {i}", "url": f"https://example.com/{i}",
+             "text": " ".join(f"complaint{i}_{w}" for w in range(words))} for i in range(n)]
+
+
+def make_summarizer(keys=0):
+    summarizer = MapReduceSummarizer()
+    if keys:
+        summarizer.configure(GroqKeyScheduler([[f"key-{i}" for i in range(keys)]], request_delay=0))
+    return summarizer
+
+
+def test_citation_prompt_keeps_positions_and_fits_budget():
+    items = corpus(200)
+    prompt = build_citation_prompt(items, "Summarize:", max_tokens=2000)
+    assert prompt.startswith("Summarize:\n")
+    assert "[1] Post 0 (https://example.com/0)" in prompt
+    assert context_packer.count_tokens(prompt) <= context_packer.request_budget("llama-3.1-8b-instant") - 2000
+
+
+def test_width_follows_free_keys():
+    assert make_summarizer().width("Summarize:") == 1
+    assert make_summarizer(keys=3).width("Summarize:") == 3
+    reduce_room = context_packer.prompt_budget("llama-3.1-8b-instant", 2000, "Summarize:")
+    assert make_summarizer(keys=40).width("Summarize:") <= reduce_room // MAP_MAX_TOKENS
+
+
+def test_small_corpus_uses_one_prompt():
+    calls = fake_gateway()
+    try:
+        summarizer = make_summarizer(keys=4)
+        assert summarizer.summarize(corpus(3), "Summarize:", "complaints") == "final summary"
+        assert [kind for kind, _ in calls] == ["generate"]
+        assert summarizer.stats()["single"] == 1
+    finally:
+        restore_gateway()
+
+
+def test_large_corpus_is_mapped_then_reduced():
+    calls = fake_gateway()
+    try:
+        summarizer = make_summarizer(keys=4)
+        assert summarizer.summarize(corpus(200), "Summarize:", "complaints", timeout=30) == "final summary"
+        kinds = [kind for kind, _ in calls]
+        assert kinds[-1] == "generate" and 2 <= kinds.count("map") <= 4
+        # Every map chunk keeps the sources' original [n] ids, and no source is cited twice
+        cited = [n for kind, prompt in calls if kind == "map" for n in re.findall(r"^\[(\d+)\]", prompt, re.M)]
+        assert len(cited) == len(set(cited))
+        reduce_prompt = calls[-1][1]
+        assert reduce_prompt.startswith("Summarize:\n") and "- note 0 [1]" in reduce_prompt
+        assert summarizer.stats()["map_reduce"] == 1
+    finally:
+        restore_gateway()
+
+
+def test_failed_chunks_are_skipped_or_fall_back_to_one_prompt():
+    calls = fake_gateway(lambda requests: [TimeoutError()] + ["- note [2]"] * (len(requests) - 1))
+    try:
+        summarizer = make_summarizer(keys=4)
+        summarizer.summarize(corpus(200), "Summarize:", "complaints")
+        assert summarizer.stats()["failed_chunks"] == 1
+        assert "- note [2]" in calls[-1][1]
+    finally:
+        restore_gateway()
+
+    calls = fake_gateway(lambda requests: ["Error: rate limited"] * len(requests))
+    try:
+        summarizer = make_summarizer(keys=4)
+        summarizer.summarize(corpus(200), "Summarize:", "complaints")
+        assert calls[-1][1].startswith("Summarize:\nAfter each fact")
+        assert summarizer.stats()["single"] == 1
+    finally:
+        restore_gateway()
+
+
+def main():
+    """Run all map-reduce summarizer tests"""
+    print("🚀 Starting map-reduce summarizer tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} map-reduce summarizer tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the prompt-level response cache: key normalization, near-duplicate lookups and stream replay
+"""
+
+import os
+import sys
+import tempfile
+
+# Add the current directory to the path so we can import the prompt cache
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from prompt_cache import PromptCache, estimate_similarity, minhash_signature, normalize_text
+
+
+def make_cache():
+    return PromptCache(directory=tempfile.mkdtemp(prefix="prompt_cache_test_"))
+
+
+def test_normalize_text():
+    assert normalize_text("  CRM   Tools! ") == "crm tool"
+    assert normalize_text("business") == "business"
+    # Symbols that change meaning survive
+    assert normalize_text("C++ and C#") == "c++ and c#"
+    assert normalize_text(".NET vs net") == ".net vs net"
+    assert normalize_text("node.js 2.0") == "node.js 2.0"
+
+
+def test_minhash_similarity():
+    base = minhash_signature("project management software")
+    assert estimate_similarity(base, minhash_signature("Project  Management Software")) == 1.0
+    assert estimate_similarity(base, minhash_signature("project management softwares")) > 0.8
+    assert estimate_similarity(base, minhash_signature("dog grooming salon")) < 0.3
+
+
+def test_exact_hit_ignores_formatting():
+    cache = make_cache()
+    cache.set("completion", "cached answer", template="Summarize  {keyword}", keyword="CRM tools", limit=10)
+    assert cache.get("completion", template="Summarize {keyword}", keyword="crm tool", limit=10) == "cached answer"
+    assert cache.get("completion", template="Summarize {keyword}", keyword="crm tool", limit=20) is None
+    counters = cache.stats()["namespaces"]["completion"]
+    assert counters["hits"] == 1 and counters["misses"] == 1 and counters["sets"] == 1
+
+
+def test_near_duplicate_hit_needs_fuzzy_param():
+    cache = make_cache()
+    cache.set("vertical_insights", {"insight": 1}, fuzzy="keyword", keyword="project management software", vertical="saas")
+    near = {"keyword": "project management softwares app", "vertical": "saas"}
+    assert cache.get("vertical_insights", **near) is None
+    assert cache.get("vertical_insights", fuzzy="keyword", **dict(near, keyword="project management softwar")) == {"insight": 1}
+    # Other params must still match exactly
+    assert cache.get("vertical_insights", fuzzy="keyword", keyword="project management softwar", vertical="health") is None
+    assert cache.stats()["namespaces"]["vertical_insights"]["near_hits"] == 1
+
+
+def test_stream_replays_original_chunks():
+    cache = make_cache()
+    chunks = ["Hel", "lo, ", "world"]
+    assert list(cache.record_stream("vertical_chat", iter(chunks), message="hi")) == chunks
+    assert list(cache.replay_stream("vertical_chat", message="hi")) == chunks
+    assert cache.replay_stream("vertical_chat", message="bye") is None
+
+
+def test_error_streams_are_not_stored():
+    cache = make_cache()
+    list(cache.record_stream("vertical_chat", iter(["Error: ", "rate limited"]), message="hi"))
+    list(cache.record_stream("vertical_chat", iter([" ", "\n"]), message="blank"))
+    assert cache.replay_stream("vertical_chat", message="hi") is None
+    assert cache.replay_stream("vertical_chat", message="blank") is None
+
+
+def test_ttl_tiers():
+    cache = PromptCache(directory=tempfile.mkdtemp(prefix="prompt_cache_test_"), ttls={"completion": 60})
+    assert cache.ttl_for("completion") == 60
+    assert cache.ttl_for("vertical_chat") == 1800
+    assert cache.ttl_for("unknown") == 3600
+
+
+def main():
+    """Run all prompt cache tests"""
+    print("🚀 Starting prompt cache tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} prompt cache tests passed!")
+
+
+if __name__ == "__main__":
+    main()
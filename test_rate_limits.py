@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test the header-driven token buckets that pace Groq and OpenRouter keys
+"""
+
+import os
+import sys
+import time
+
+# Add the current directory to the path so we can import the rate limiter
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limits import KeyRateLimiter, TokenBucket, estimate_tokens, parse_reset_seconds
+
+
+def test_parse_reset_seconds():
+    assert parse_reset_seconds("2m59.56s") == 179.56
+    assert parse_reset_seconds("7.66s") == 7.66
+    assert parse_reset_seconds("120ms") == 0.12
+    assert parse_reset_seconds("1h") == 3600
+    assert parse_reset_seconds("30") == 30
+    assert parse_reset_seconds(None) is None
+    assert parse_reset_seconds("soon") is None
+    # Epoch timestamps (seconds and milliseconds) become seconds from now
+    assert 55 < parse_reset_seconds(str(time.time() + 60)) <= 60
+    assert 55 < parse_reset_seconds(str((time.time() + 60) * 1000)) <= 60
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 8
+    assert estimate_tokens("a" * 400) == 108
+
+
+def test_token_bucket_refills_linearly():
+    bucket = TokenBucket(60, window=60)
+    now = time.time()
+    bucket.take(60, now)
+    assert bucket.wait_time(30, now) == 30
+    assert bucket.wait_time(30, now + 30) == 0
+    # A cost above capacity is clamped rather than waiting forever
+    assert bucket.wait_time(1000, now + 60) == 0
+
+
+def test_token_bucket_sync_blocks_until_reset():
+    bucket = TokenBucket(100)
+    now = time.time()
+    bucket.sync(0, limit=200, reset_seconds=20, now=now)
+    assert bucket.capacity == 200
+    assert bucket.wait_time(1, now) == 20
+
+
+def test_reserve_waits_once_requests_run_out():
+    limiter = KeyRateLimiter(requests_per_minute=2, tokens_per_minute=10 ** 6)
+    assert limiter.reserve("key-a", 10) == 0
+    assert limiter.reserve("key-a", 10) == 0
+    assert 25 < limiter.reserve("key-a", 10) <= 30
+    # Other keys have their own buckets
+    assert limiter.reserve("key-b", 10) == 0
+
+
+def test_observe_returns_unused_tokens_and_syncs_headers():
+    limiter = KeyRateLimiter(requests_per_minute=30, tokens_per_minute=6000)
+    assert limiter.reserve("key-a", 5000) == 0
+    assert limiter.ready_in("key-a", 5000) > 0
+    limiter.observe("key-a", reserved_tokens=5000, used_tokens=100)
+    assert limiter.ready_in("key-a", 5000) == 0
+    limiter.observe("key-a", headers={"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "12s"})
+    assert 11 < limiter.ready_in("key-a", 1) <= 12
+
+
+def test_observe_rate_limited_prefers_retry_after():
+    limiter = KeyRateLimiter()
+    assert limiter.observe_rate_limited("key-a", {"retry-after": "7", "x-ratelimit-reset-tokens": "50s"}) == 7
+    assert limiter.observe_rate_limited("key-b", {"x-ratelimit-reset-tokens": "50s"}) == 50
+    assert limiter.observe_rate_limited("key-c") == 60
+    assert limiter.status()["rate_limited_responses"] == 3
+
+
+def main():
+    """Run all rate limiter tests"""
+    print("🚀 Starting rate limiter tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} rate limiter tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the multi-source search deadline and its latency-based source budgets
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the current directory to the path so we can import the orchestrator
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bounded_executors import BoundedExecutor
+from search_orchestrator import MIN_SOURCE_BUDGET, SearchOrchestrator
+
+
+def make_orchestrator():
+    return SearchOrchestrator(executor=BoundedExecutor("test", max_workers=4, max_queue=4),
+                              directory=tempfile.mkdtemp(prefix="search_orchestrator_test_"))
+
+
+def test_budget_follows_recent_latency():
+    orchestrator = make_orchestrator()
+    assert orchestrator.budget("reddit", 10) == 10
+    for seconds in [1.0] * 9 + [2.0]:
+        orchestrator.record("reddit", seconds)
+    assert orchestrator.budget("reddit", 10) == 3.0
+    assert orchestrator.budget("reddit", 2.5) == 2.5
+    # A source whose median exceeds what is left is not waited for at all
+    assert orchestrator.budget("reddit", 0.5) == 0.0
+    orchestrator.record("news", 0.1)
+    assert orchestrator.budget("news", 10) == MIN_SOURCE_BUDGET
+
+
+def test_search_returns_partial_results_at_the_deadline():
+    orchestrator = make_orchestrator()
+    late, done = [], threading.Event()
+
+    def on_late(name, value):
+        late.append((name, value))
+        done.set()
+
+    started = time.monotonic()
+    outcome = orchestrator.search({
+        "fast": lambda: ["fast"],
+        "broken": lambda: 1 / 0,
+        "slow": lambda: time.sleep(0.5) or ["slow"],
+    }, deadline=0.2, on_late=on_late)
+    assert time.monotonic() - started < 0.45
+    assert outcome["results"] == {"fast": ["fast"], "broken": [], "slow": []}
+    assert outcome["partial"] and outcome["missing"] == ["slow"]
+    # The straggler is not cancelled: its result still arrives for the caches
+    assert done.wait(2)
+    assert late == [("slow", ["slow"])]
+    stats = orchestrator.stats()
+    assert stats["partial"] == 1 and stats["late_results"] == 1
+    assert stats["latency"]["slow"]["samples"] == 1
+
+
+def test_complete_search_is_not_partial():
+    orchestrator = make_orchestrator()
+    outcome = orchestrator.search({"a": lambda: [1], "b": lambda: [2]}, deadline=1)
+    assert outcome["results"] == {"a": [1], "b": [2]}
+    assert not outcome["partial"] and outcome["missing"] == []
+
+
+def main():
+    """Run all search orchestrator tests"""
+    print("🚀 Starting search orchestrator tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} search orchestrator tests passed!")
+
+
+if __name__ == "__main__":
+    main()
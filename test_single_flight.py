@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test single-flight request coalescing within a process and across workers sharing a cache directory
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the current directory to the path so we can import the single-flight layer
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from single_flight import SingleFlight, is_partial
+
+
+def make_flight(directory=None, **kwargs):
+    return SingleFlight(directory=directory or tempfile.mkdtemp(prefix="single_flight_test_"),
+                        poll_interval=0.01, **kwargs)
+
+
+def test_is_partial():
+    assert is_partial({"partial": True})
+    assert not is_partial({"partial": False, "results": []})
+    assert is_partial(([1, 2], {"partial": ["reddit"]}))
+    assert not is_partial(([1, 2], {}))
+    assert not is_partial("done")
+
+
+def test_make_key_normalizes_params():
+    flight = make_flight()
+    assert flight.make_key("search", keyword="CRM  Tools") == flight.make_key("search", keyword="crm tool")
+    assert flight.make_key("search", keyword="crm") != flight.make_key("analyze", keyword="crm")
+
+
+def test_concurrent_callers_share_one_run():
+    flight = make_flight()
+    runs, results = [], []
+    started = threading.Event()
+
+    def work():
+        runs.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "answer"
+
+    def caller():
+        results.append(flight.do("search", work, timeout=5, keyword="crm"))
+
+    threads = [threading.Thread(target=caller) for _ in range(5)]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(runs) == 1
+    assert results == ["answer"] * 5
+    stats = flight.stats()
+    assert stats["leaders"] == 1 and stats["local_followers"] == 4 and stats["in_flight"] == 0
+
+
+def test_errors_reach_followers_and_are_not_cached():
+    flight = make_flight()
+    try:
+        flight.do("search", lambda: 1 / 0, keyword="crm")
+    except ZeroDivisionError:
+        pass
+    else:
+        raise AssertionError("the leader's exception should propagate")
+    # The failed call left no result or lease behind
+    assert flight.do("search", lambda: "retry", keyword="crm") == "retry"
+
+
+def test_other_worker_reuses_published_result():
+    directory = tempfile.mkdtemp(prefix="single_flight_test_")
+    worker_a, worker_b = make_flight(directory), make_flight(directory)
+    assert worker_a.do("search", lambda: "from a", keyword="crm") == "from a"
+    assert worker_b.do("search", lambda: "from b", keyword="crm") == "from a"
+    assert worker_b.stats()["remote_followers"] == 1
+
+
+def test_other_worker_waits_for_lease_holder():
+    directory = tempfile.mkdtemp(prefix="single_flight_test_")
+    worker_a, worker_b = make_flight(directory), make_flight(directory)
+    started, results = threading.Event(), []
+
+    def slow():
+        started.set()
+        time.sleep(0.2)
+        return "from a"
+
+    leader = threading.Thread(target=lambda: results.append(worker_a.do("search", slow, keyword="crm")))
+    leader.start()
+    started.wait(1)
+    assert worker_b.do("search", lambda: "from b", timeout=5, keyword="crm") == "from a"
+    leader.join()
+    assert results == ["from a"]
+
+
+def test_held_lease_times_out_follower():
+    flight = make_flight()
+    flight.cache.add(flight.make_key("search", keyword="crm") + ":lease", "other-worker", expire=60)
+    try:
+        flight.do("search", lambda: "never", timeout=0.05, keyword="crm")
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError("waiting on a held lease should time out")
+
+
+def test_partial_results_expire_quickly():
+    directory = tempfile.mkdtemp(prefix="single_flight_test_")
+    worker_a, worker_b = make_flight(directory, partial_ttl=0.1), make_flight(directory)
+    worker_a.do("search", lambda: {"partial": True}, keyword="crm")
+    time.sleep(0.2)
+    assert worker_b.do("search", lambda: {"partial": False}, keyword="crm") == {"partial": False}
+
+
+def main():
+    """Run all single-flight tests"""
+    print("🚀 Starting single-flight tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} single-flight tests passed!")
+
+
+if __name__ == "__main__":
+    main()
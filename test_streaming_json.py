@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test the streaming JSON parser: LLM output repairs, schema validation and incremental items
+"""
+
+import os
+import sys
+
+# Add the current directory to the path so we can import the parser
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from streaming_json import (PAIN_CLOUD_API_SCHEMAS, PAIN_CLOUD_ENRICHMENT_SCHEMAS, PAIN_SEARCH_SCHEMAS, ROOT,
+                            StreamingJSONParser, parse, validate)
+
+
+def test_valid_json_needs_no_repairs():
+    doc, parser = parse('{"a": [1, 2.5, -3e2], "b": {"c": null, "d": true}, "e": "x\\"y"}')
+    assert doc == {"a": [1, 2.5, -300.0], "b": {"c": None, "d": True}, "e": 'x"y'}
+    assert not parser.repairs
+
+
+def test_repairs_common_llm_defects():
+    text = """Sure! Here is the JSON:
+```json
+{
+  // the findings
+  pain_points: [
+    {'title': 'Slow "sync"', severity: 8,},
+    {"title": "No export"
+     "severity": None}
+  ],
+}
+```
+Hope this helps."""
+    doc, parser = parse(text)
+    assert doc == {"pain_points": [{"title": 'Slow "sync"', "severity": 8},
+                                   {"title": "No export", "severity": None}]}
+    assert parser.repairs
+
+
+def test_truncated_output_is_balanced():
+    doc, parser = parse('{"themes": ["pricing", "onboard')
+    assert doc == {"themes": ["pricing", "onboard"]}
+    assert parser.repairs["truncated"] == 1
+
+
+def test_bracketed_prose_is_not_json():
+    doc, _ = parse("As noted in [1], users want exports. [\"a\", \"b\"]", {ROOT: None})
+    assert doc == ["a", "b"]
+    assert parse("No JSON here [1] at all")[0] is None
+    assert parse("")[0] is None
+
+
+def test_validate_coerces_to_schema():
+    schema = PAIN_SEARCH_SCHEMAS["pain_points"]
+    item = validate({"title": "Sync", "severity": "8/10", "quotes": "only one", "extra": 1}, schema)
+    assert item["severity"] == 8 and item["quotes"] == ["only one"] and item["extra"] == 1
+    assert item["description"] == "" and item["user_segments"] == []
+    assert validate({"title": "", "severity": 9}, schema) is None
+    assert validate(["not", "a", "dict"], schema) is None
+    assert validate(" pricing ", PAIN_CLOUD_API_SCHEMAS["themes"]) == "pricing"
+    assert validate({"word": "x"}, PAIN_CLOUD_API_SCHEMAS["themes"]) is None
+
+
+def test_invalid_items_are_dropped_from_watched_arrays():
+    doc, parser = parse('{"complaints": [{"text": "too slow", "severity": "9"}, {"severity": 3}], '
+                        '"keywords": [{"word": "slow"}], "themes": ["speed", {}], "summary": "ok"}',
+                        PAIN_CLOUD_API_SCHEMAS)
+    assert doc["complaints"] == [{"text": "too slow", "severity": 9}]
+    assert doc["keywords"] == [{"word": "slow", "count": 1}]
+    assert doc["themes"] == ["speed"]
+    assert doc["summary"] == "ok"
+    assert parser.items["complaints"] == doc["complaints"]
+
+
+def test_root_array_schema():
+    doc, parser = parse('[{"index": 0, "insight": "pricing", "keywords": "cost"}, {"index": 1}]',
+                        PAIN_CLOUD_ENRICHMENT_SCHEMAS)
+    assert doc == [{"index": 0, "insight": "pricing", "keywords": ["cost"]}]
+    assert parser.items[ROOT] == doc
+
+
+def test_feed_emits_items_as_they_close():
+    parser = StreamingJSONParser(PAIN_SEARCH_SCHEMAS)
+    chunks = ['{"pain_points": [{"title": "Sl', 'ow sync"}, {"tit', 'le": "No export"}', '], "startup_opportunities": [',
+              '{"idea": "Sync tool"}]}']
+    events = [parser.feed(chunk) for chunk in chunks]
+    assert events[0] == []
+    assert [(key, item["title"]) for key, item in events[1]] == [("pain_points", "Slow sync")]
+    assert [(key, item["title"]) for key, item in events[2]] == [("pain_points", "No export")]
+    assert events[3] == []
+    assert [(key, item["idea"]) for key, item in events[4]] == [("startup_opportunities", "Sync tool")]
+    assert parser.close() == []
+    assert len(parser.value()["pain_points"]) == 2
+
+
+def main():
+    """Run all streaming JSON tests"""
+    print("🚀 Starting streaming JSON parser tests...")
+    tests = [value for name, value in sorted(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
+    print(f"🎉 All {len(tests)} streaming JSON parser tests passed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,132 +6,201 @@ This avoids ChromeDriver compatibility issues on Windows
 
 import requests
 import re
+import threading
 import time
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from urllib.parse import urljoin, quote_plus
-import random
 
-def scrape_complaintsboard_working(keyword, max_pages=3):
-    """
-    Scrape ComplaintsBoard using requests and BeautifulSoup
-    Extracts real complaint data from the HTML structure shown
-    """
-    print(f"🔍 Scraping ComplaintsBoard for: {keyword}")
-    
+from bounded_executors import cancelled, executors, remaining
+from circuit_breakers import circuit_breakers
+
+BASE_URL = "https://www.complaintsboard.com"
+MAX_WORKERS = 4  # concurrent page fetches per search
+MIN_REQUEST_INTERVAL = 0.5  # seconds between request starts to complaintsboard.com, across all threads
+REQUEST_TIMEOUT = 15
+PAGE_BATCH_TIMEOUT = 60  # one batch of concurrent pages, session retries and pacing included
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class HostPacer:
+    """Spaces request starts to one host at least `interval` seconds apart, across threads"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.time()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_pacer = HostPacer(MIN_REQUEST_INTERVAL)
+
+
+def get_session():
+    """Shared keep-alive session for ComplaintsBoard, retrying 429/5xx with backoff"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.headers.update(HEADERS)
+                retry = Retry(total=2, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=frozenset(['GET']))
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS * 2, max_retries=retry)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def parse_search_page(soup, keyword):
+    """Extract complaint dicts from one ComplaintsBoard search results page"""
     results = []
-    seen_urls = set()
-    
-    # Search URL
-    search_url = f"https://www.complaintsboard.com/?search={quote_plus(keyword)}"
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
-    
-    for page in range(1, max_pages + 1):
+    for item in soup.find_all('div', class_='search__item'):
         try:
-            if page == 1:
-                url = search_url
-            else:
-                url = f"{search_url}&page={page}"
-            
-            print(f"📄 Scraping page {page}: {url}")
+            # Extract the link
+            link_elem = item.find('a', class_='search__item-link')
+            if not link_elem or not link_elem.get('href'):
+                continue
+            full_url = urljoin(BASE_URL, link_elem.get('href'))
             
-            # Add delay to be respectful
-            if page > 1:
-                time.sleep(random.uniform(1, 3))
+            # Extract title and complaint text, removing the highlight spans
+            title_elem = item.find('span', class_='search__item-title')
+            title = ""
+            if title_elem:
+                for highlight in title_elem.find_all('span', class_='highlight'):
+                    highlight.unwrap()
+                title = title_elem.get_text(strip=True)
             
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
+            text_elem = item.find('span', class_='search__item-text')
+            complaint_text = ""
+            if text_elem:
+                for highlight in text_elem.find_all('span', class_='highlight'):
+                    highlight.unwrap()
+                complaint_text = text_elem.get_text(strip=True)
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find complaint items using the structure you showed
-            complaint_items = soup.find_all('div', class_='search__item')
-            
-            if not complaint_items:
-                print(f"❌ No complaint items found on page {page}")
-                break
+            # Extract badge (Complaint, Review, etc.)
+            badge_elem = item.find('span', class_='search__item-badge')
+            badge = badge_elem.get_text(strip=True) if badge_elem else ""
             
-            print(f"✅ Found {len(complaint_items)} complaint items on page {page}")
-            
-            for item in complaint_items:
-                try:
-                    # Extract the link
-                    link_elem = item.find('a', class_='search__item-link')
-                    if not link_elem:
-                        continue
-                    
-                    href = link_elem.get('href')
-                    if not href:
-                        continue
-                    
-                    # Build full URL
-                    full_url = urljoin('https://www.complaintsboard.com', href)
-                    
-                    # Skip if we've seen this URL
-                    if full_url in seen_urls:
-                        continue
-                    seen_urls.add(full_url)
-                    
-                    # Extract title
-                    title_elem = item.find('span', class_='search__item-title')
-                    title = ""
-                    if title_elem:
-                        # Remove the highlight spans and get clean text
-                        for highlight in title_elem.find_all('span', class_='highlight'):
-                            highlight.unwrap()
-                        title = title_elem.get_text(strip=True)
-                    
-                    # Extract complaint text
-                    text_elem = item.find('span', class_='search__item-text')
-                    complaint_text = ""
-                    if text_elem:
-                        # Remove the highlight spans and get clean text
-                        for highlight in text_elem.find_all('span', class_='highlight'):
-                            highlight.unwrap()
-                        complaint_text = text_elem.get_text(strip=True)
-                    
-                    # Extract badge (Complaint, Review, etc.)
-                    badge_elem = item.find('span', class_='search__item-badge')
-                    badge = ""
-                    if badge_elem:
-                        badge = badge_elem.get_text(strip=True)
-                    
-                    # Only add if we have meaningful content
-                    if title and complaint_text:
-                        result = {
-                            "title": title,
-                            "url": full_url,
-                            "text": complaint_text,
-                            "badge": badge,
-                            "keyword": keyword
-                        }
-                        results.append(result)
-                        print(f"  📝 Added: {title[:50]}...")
-                
-                except Exception as e:
-                    print(f"  ❌ Error processing item: {e}")
-                    continue
-            
-            # Check if there are more pages
-            next_page = soup.find('a', string=re.compile(r'Next|next', re.I))
-            if not next_page and page < max_pages:
-                print(f"📄 No next page found, stopping at page {page}")
-                break
-                
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Network error on page {page}: {e}")
-            break
+            # Only add if we have meaningful content
+            if title and complaint_text:
+                results.append({
+                    "title": title,
+                    "url": full_url,
+                    "text": complaint_text,
+                    "badge": badge,
+                    "keyword": keyword
+                })
         except Exception as e:
-            print(f"❌ Error scraping page {page}: {e}")
-            break
-    
+            print(f"  ❌ Error processing item: {e}")
+    return results
+
+
+def fetch_search_page(search_url, page, keyword):
+    """Fetch and parse one results page; returns (complaints, has_next_page), complaints is None if the fetch failed"""
+    url = search_url if page == 1 else f"{search_url}&page={page}"
+    try:
+        _pacer.wait()
+        start = time.time()
+        response = get_session().get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        circuit_breakers.record("complaintsboard", False, time.time() - start)
+        print(f"❌ Network error on page {page}: {e}")
+        return None, False
+    circuit_breakers.record("complaintsboard", True, time.time() - start)
+    soup = BeautifulSoup(response.content, 'html.parser')
+    items = parse_search_page(soup, keyword)
+    has_next = soup.find('a', string=re.compile(r'Next|next', re.I)) is not None
+    print(f"📄 Page {page}: {len(items)} complaints")
+    return items, has_next
+
+
+def page_complaintsboard(keyword, max_pages=3, max_results=None, max_workers=MAX_WORKERS):
+    """
+    Concurrent ComplaintsBoard pager. Page 1 is fetched first; later pages are
+    fetched `max_workers` at a time on the shared page_fetch executor over
+    the shared session (paced per host), until a page comes back empty or without a Next link, `max_pages` is
+    reached, `max_results` unique complaints have been collected, or the
+    calling executor task is cancelled.
+    Returns (complaints, complete); complete is False when the search was
+    skipped (circuit open), a page failed to load, or the task was cancelled
+    before paging finished, so callers can avoid caching a truncated result.
+    """
+    if not circuit_breakers.allow("complaintsboard"):
+        print("⚠️ ComplaintsBoard circuit open; skipping")
+        return [], False
+    search_url = f"{BASE_URL}/?search={quote_plus(keyword)}"
+    results = []
+    seen_urls = set()
+
+    def add(items):
+        for item in items:
+            if item["url"] not in seen_urls:
+                seen_urls.add(item["url"])
+                results.append(item)
+
+    def enough():
+        return max_results is not None and len(results) >= max_results
+
+    items, has_next = fetch_search_page(search_url, 1, keyword)
+    complete = items is not None
+    add(items or [])
+    page = 2
+    if items and has_next and page <= max_pages and not enough():
+        # cancelled(): the request that asked for these pages has passed its deadline
+        while has_next and page <= max_pages and not enough():
+            if cancelled():
+                complete = False
+                break
+            batch = range(page, min(page + max_workers, max_pages + 1))
+            left = remaining()
+            timeout = PAGE_BATCH_TIMEOUT if left is None else min(PAGE_BATCH_TIMEOUT, left)
+            pages = executors.page_fetch.map(lambda p: fetch_search_page(search_url, p, keyword), batch,
+                                             timeout=timeout, default=(None, False))
+            for items, has_next in pages:
+                if items is None:
+                    complete = False
+                add(items or [])
+                if not items or not has_next:
+                    has_next = False
+                    break
+            page = batch.stop
+    return (results[:max_results] if max_results is not None else results), complete
+
+
+def scrape_complaintsboard_pages(keyword, max_pages=3, max_results=None, max_workers=MAX_WORKERS):
+    """page_complaintsboard() without the completeness flag"""
+    return page_complaintsboard(keyword, max_pages, max_results, max_workers)[0]
+
+
+def scrape_complaintsboard_working(keyword, max_pages=3):
+    """
+    Scrape ComplaintsBoard using requests and BeautifulSoup
+    Extracts real complaint data from the HTML structure shown
+    """
+    print(f"🔍 Scraping ComplaintsBoard for: {keyword}")
+    results = scrape_complaintsboard_pages(keyword, max_pages=max_pages)
     print(f"🎉 Scraping complete! Found {len(results)} complaints")
     return results
 